@@ -0,0 +1,84 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compares the time to first event of POST /chat/stream with the two-call flow it replaces
+(POST /submit_question, then GET /get_answer_stream/{chat_id}) against a running Jarvis server.
+
+Each round asks the same question through both flows, alternating which goes first, and reports the time
+from sending the first request to receiving the first SSE event and the end event. Without --token the
+requests authenticate with the USER_EMAIL header, which the server only accepts from 127.0.0.1.
+
+Usage:
+  python eval/benchmarks/chat_stream_first_event.py --url http://127.0.0.1:8000 --rounds 20 --question "hi"
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+
+import httpx
+from httpx_sse import aconnect_sse
+
+
+def _summary(latencies: list) -> str:
+  latencies = sorted(latencies)
+  p90 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+  return f"p50 {statistics.median(latencies) * 1000:8.1f}ms  p90 {p90 * 1000:8.1f}ms  max {latencies[-1] * 1000:8.1f}ms"
+
+
+async def _read_stream(event_source, start: float) -> tuple:
+  first_event = None
+  async for event in event_source.aiter_sse():
+    if first_event is None:
+      first_event = time.perf_counter() - start
+    if event.event in ("end", "error"):
+      break
+  return first_event, time.perf_counter() - start
+
+
+async def two_calls(client: httpx.AsyncClient, url: str, headers: dict, question: str) -> tuple:
+  chat_id = f"bench_{uuid.uuid4().hex}"
+  start = time.perf_counter()
+  response = await client.post(f"{url}/submit_question", json={"chat_id": chat_id, "question": question}, headers=headers)
+  response.raise_for_status()
+  async with aconnect_sse(client, "GET", f"{url}/get_answer_stream/{chat_id}", headers=headers) as event_source:
+    return await _read_stream(event_source, start)
+
+
+async def one_call(client: httpx.AsyncClient, url: str, headers: dict, question: str) -> tuple:
+  chat_id = f"bench_{uuid.uuid4().hex}"
+  start = time.perf_counter()
+  async with aconnect_sse(
+    client, "POST", f"{url}/chat/stream", json={"chat_id": chat_id, "question": question}, headers=headers
+  ) as event_source:
+    return await _read_stream(event_source, start)
+
+
+async def main(url: str, rounds: int, question: str, token: str, user_email: str):
+  headers = {"Authorization": f"Bearer {token}"} if token else {"USER_EMAIL": user_email}
+  results = {"submit + get_answer_stream": [], "chat/stream": []}
+  flows = [("submit + get_answer_stream", two_calls), ("chat/stream", one_call)]
+  async with httpx.AsyncClient(timeout=httpx.Timeout(600.0)) as client:
+    for i in range(rounds):
+      for name, flow in flows if i % 2 == 0 else reversed(flows):
+        results[name].append(await flow(client, url, headers, question))
+  print(f"{rounds} rounds against {url}")
+  for name, timings in results.items():
+    first_events = [first for first, _ in timings if first is not None]
+    print(f"{name:<28} first event {_summary(first_events)}")
+    print(f"{'':<28} end         {_summary([end for _, end in timings])}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--url", default="http://127.0.0.1:8000")
+  parser.add_argument("--rounds", type=int, default=20)
+  parser.add_argument("--question", default="What can you help me with?")
+  parser.add_argument("--token", default=os.getenv("JARVIS_TOKEN"), help="JWT to authenticate with")
+  parser.add_argument("--user-email", default=os.getenv("LOCAL_USER_EMAIL", "noone@cisco.com"))
+  args = parser.parse_args()
+  asyncio.run(main(args.url, args.rounds, args.question, args.token, args.user_email))
@@ -0,0 +1,104 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Load test of the /get_answer completion primitive with thousands of concurrent waiters.
+
+Each chat gets several waiters and is completed after a random run time. The benchmark reports how long
+waiters take to wake up after their run completes, next to the 0.5s polling loop it replaces, and how
+many event loop wakeups each approach needs.
+
+Usage:
+  python eval/benchmarks/get_answer_waiters.py --chats 2000 --waiters-per-chat 3 --max-run-seconds 5
+"""
+
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+from multi_agent_jarvis.chat_sessions import ChatSessionRegistry, COMPLETED
+
+POLL_INTERVAL = 0.5
+
+
+def _summary(latencies: list) -> str:
+  latencies = sorted(latencies)
+  p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+  return f"p50 {statistics.median(latencies) * 1000:8.2f}ms  p99 {p99 * 1000:8.2f}ms  max {latencies[-1] * 1000:8.2f}ms"
+
+
+async def run_futures(chats: int, waiters_per_chat: int, run_seconds: list, timeout: float):
+  registry = ChatSessionRegistry(max_sessions=chats)
+  completed_at = {}
+  latencies = []
+
+  async def waiter(chat_id: str):
+    status = await registry.wait(registry.get(chat_id), timeout)
+    assert status == COMPLETED
+    latencies.append(time.perf_counter() - completed_at[chat_id])
+
+  async def run(chat_id: str, seconds: float):
+    await asyncio.sleep(seconds)
+    completed_at[chat_id] = time.perf_counter()
+    registry.complete(registry.get(chat_id), COMPLETED)
+
+  for i in range(chats):
+    registry.start(f"chat-{i}")
+  await asyncio.gather(
+    *[waiter(f"chat-{i}") for i in range(chats) for _ in range(waiters_per_chat)],
+    *[run(f"chat-{i}", run_seconds[i]) for i in range(chats)],
+  )
+  return latencies, chats * waiters_per_chat
+
+
+async def run_polling(chats: int, waiters_per_chat: int, run_seconds: list, timeout: float):
+  task_status = {}
+  completed_at = {}
+  latencies = []
+  wakeups = 0
+
+  async def waiter(chat_id: str):
+    nonlocal wakeups
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+      wakeups += 1
+      if task_status.get(chat_id) == COMPLETED:
+        break
+      await asyncio.sleep(POLL_INTERVAL)
+    latencies.append(time.perf_counter() - completed_at[chat_id])
+
+  async def run(chat_id: str, seconds: float):
+    await asyncio.sleep(seconds)
+    completed_at[chat_id] = time.perf_counter()
+    task_status[chat_id] = COMPLETED
+
+  await asyncio.gather(
+    *[waiter(f"chat-{i}") for i in range(chats) for _ in range(waiters_per_chat)],
+    *[run(f"chat-{i}", run_seconds[i]) for i in range(chats)],
+  )
+  return latencies, wakeups
+
+
+async def main(chats: int, waiters_per_chat: int, max_run_seconds: float, timeout: float):
+  run_seconds = [random.uniform(0.1, max_run_seconds) for _ in range(chats)]
+  print(f"{chats} chats x {waiters_per_chat} waiters, runs of up to {max_run_seconds}s")
+
+  start = time.perf_counter()
+  latencies, wakeups = await run_futures(chats, waiters_per_chat, run_seconds, timeout)
+  print(f"futures: wall {time.perf_counter() - start:6.2f}s  wake latency {_summary(latencies)}  wakeups {wakeups}")
+
+  start = time.perf_counter()
+  latencies, wakeups = await run_polling(chats, waiters_per_chat, run_seconds, timeout)
+  print(f"polling: wall {time.perf_counter() - start:6.2f}s  wake latency {_summary(latencies)}  wakeups {wakeups}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--chats", type=int, default=2000)
+  parser.add_argument("--waiters-per-chat", type=int, default=3)
+  parser.add_argument("--max-run-seconds", type=float, default=5.0)
+  parser.add_argument("--timeout", type=float, default=600.0)
+  args = parser.parse_args()
+  asyncio.run(main(args.chats, args.waiters_per_chat, args.max_run_seconds, args.timeout))
@@ -0,0 +1,97 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Measures event-loop lag while many Jira tools run concurrently.
+
+A local aiohttp server stands in for Jira and answers every request after a fixed latency, so the benchmark
+runs offline. While the tools run, a probe task sleeps in a tight loop and records how late it wakes up:
+with the async client the lag stays flat no matter how many tools are in flight.
+
+Usage:
+  python eval/benchmarks/jira_event_loop_lag.py --concurrency 1 10 50 200 --latency-ms 100
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from aiohttp import web
+
+PROBE_INTERVAL = 0.005
+
+
+async def _fake_jira(latency: float) -> web.AppRunner:
+  async def user_search(request):
+    await asyncio.sleep(latency)
+    return web.json_response([{"accountId": "bench-account-id"}])
+
+  async def transitions(request):
+    await asyncio.sleep(latency)
+    return web.json_response({"transitions": [{"id": "11", "name": "In Progress", "fields": {}}]})
+
+  app = web.Application()
+  app.router.add_get("/rest/api/3/user/search", user_search)
+  app.router.add_get("/rest/api/3/issue/{issue_key}/transitions", transitions)
+  runner = web.AppRunner(app)
+  await runner.setup()
+  return runner
+
+
+async def _probe(lags: list, stop: asyncio.Event):
+  while not stop.is_set():
+    start = time.perf_counter()
+    await asyncio.sleep(PROBE_INTERVAL)
+    lags.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+def _percentile(values: list, percentile: float) -> float:
+  values = sorted(values)
+  return values[min(len(values) - 1, int(len(values) * percentile))]
+
+
+async def run(concurrency_levels: list, latency_ms: int, port: int):
+  runner = await _fake_jira(latency_ms / 1000)
+  await web.TCPSite(runner, "127.0.0.1", port).start()
+  os.environ["JIRA_SERVER"] = f"http://127.0.0.1:{port}"
+  os.environ.setdefault("JARVIS_JIRA_USER_EMAIL", "bench@example.com")
+  os.environ.setdefault("JARVIS_JIRA_ACCESS_TOKEN", "bench")
+
+  # Imported after JIRA_SERVER is set, as the instance manager reads it at import time
+  from multi_agent_jarvis.agents.jira_agent.tools._jira_instance import JiraInstanceManager
+  from multi_agent_jarvis.agents.jira_agent.tools.jira_user import _get_account_id_from_email
+  from multi_agent_jarvis.agents.jira_agent.tools.jira_transitions import _get_jira_transitions
+
+  print(f"{'concurrency':>12} {'wall (s)':>10} {'lag p50 (ms)':>14} {'lag p99 (ms)':>14} {'lag max (ms)':>14}")
+  try:
+    for concurrency in concurrency_levels:
+      lags, stop = [], asyncio.Event()
+      probe = asyncio.create_task(_probe(lags, stop))
+      start = time.perf_counter()
+      calls = []
+      for i in range(concurrency):
+        if i % 2:
+          calls.append(_get_jira_transitions(f"BENCH-{i}"))
+        else:
+          calls.append(_get_account_id_from_email(f"user{i}@example.com"))
+      await asyncio.gather(*calls)
+      wall = time.perf_counter() - start
+      stop.set()
+      await probe
+      print(
+        f"{concurrency:>12} {wall:>10.3f} {statistics.median(lags) * 1000:>14.2f} "
+        f"{_percentile(lags, 0.99) * 1000:>14.2f} {max(lags) * 1000:>14.2f}"
+      )
+  finally:
+    await JiraInstanceManager.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+  parser.add_argument("--latency-ms", type=int, default=100, help="Latency of every fake Jira response")
+  parser.add_argument("--port", type=int, default=18080)
+  args = parser.parse_args()
+  asyncio.run(run(args.concurrency, args.latency_ms, args.port))
@@ -0,0 +1,155 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Compares the processing latency of an issue_assigned Jira webhook event with its fixed steps (comment, label
+and transition) asked of the agent as three prompts, as the webhook used to do, and run directly by
+`_run_webhook_actions`.
+
+A local aiohttp server stands in for Jira and answers every request after a fixed latency, and counts them.
+Each round then asks the agent the issue's question, as the webhook does, unless --skip-question is given.
+The agent mode and the question need the LLM configuration of the agent; the direct mode with
+--skip-question runs offline.
+
+Usage:
+  python eval/benchmarks/jira_webhook_latency.py --rounds 5 --latency-ms 100
+  python eval/benchmarks/jira_webhook_latency.py --modes direct --skip-question --rounds 50
+"""
+
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from aiohttp import web
+
+ISSUE_QUESTION = "Summary: Pod crash looping in staging Description: The api pod restarts every few minutes."
+
+
+async def _fake_jira(latency: float, requests: list) -> web.AppRunner:
+  @web.middleware
+  async def delay(request, handler):
+    requests.append(f"{request.method} {request.path}")
+    await asyncio.sleep(latency)
+    return await handler(request)
+
+  async def issue(request):
+    key = request.match_info["issue_key"]
+    reporter = {"accountId": "bench-reporter", "displayName": "Bench Reporter"}
+    return web.json_response({"key": key, "fields": {"reporter": reporter, "assignee": None, "labels": []}})
+
+  async def user(request):
+    return web.json_response({"accountId": "bench-reporter", "emailAddress": "reporter@example.com"})
+
+  async def transitions(request):
+    names = [("11", "In Progress"), ("21", "Acknowledge"), ("31", "Done")]
+    return web.json_response({"transitions": [{"id": i, "name": n, "fields": {}} for i, n in names]})
+
+  async def created(request):
+    return web.json_response({}, status=201)
+
+  async def no_content(request):
+    return web.Response(status=204)
+
+  async def anything(request):
+    return web.json_response({})
+
+  app = web.Application(middlewares=[delay])
+  app.router.add_get("/rest/api/{version}/issue/{issue_key}", issue)
+  app.router.add_put("/rest/api/{version}/issue/{issue_key}", no_content)
+  app.router.add_get("/rest/api/{version}/user", user)
+  app.router.add_get("/rest/api/{version}/issue/{issue_key}/transitions", transitions)
+  app.router.add_post("/rest/api/{version}/issue/{issue_key}/transitions", no_content)
+  app.router.add_post("/rest/api/{version}/issue/{issue_key}/comment", created)
+  app.router.add_route("*", "/{tail:.*}", anything)
+  runner = web.AppRunner(app)
+  await runner.setup()
+  return runner
+
+
+def _summary(latencies: list) -> str:
+  latencies = sorted(latencies)
+  p90 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+  return f"p50 {statistics.median(latencies):7.2f}s  p90 {p90:7.2f}s  max {latencies[-1]:7.2f}s"
+
+
+async def run(modes: list, rounds: int, latency_ms: int, port: int, skip_question: bool):
+  requests = []
+  runner = await _fake_jira(latency_ms / 1000, requests)
+  await web.TCPSite(runner, "127.0.0.1", port).start()
+  os.environ["JIRA_SERVER"] = f"http://127.0.0.1:{port}"
+  os.environ.setdefault("JARVIS_JIRA_USER_EMAIL", "bench@example.com")
+  os.environ.setdefault("JARVIS_JIRA_ACCESS_TOKEN", "bench")
+
+  # Imported after JIRA_SERVER is set, as the instance manager reads it at import time
+  from multi_agent_jarvis.agents.jira_agent import _get_jira_reporter_email, _run_webhook_actions
+  from multi_agent_jarvis.agents.jira_agent.tools._jira_instance import JiraInstanceManager
+
+  jarvis_agent = None
+  if "agent" in modes or not skip_question:
+    from jarvis_agent.jarvis_agent import JarvisAgent
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.store.memory import InMemoryStore
+
+    jarvis_agent = JarvisAgent(MemorySaver(), InMemoryStore())
+
+  async def interact(prompt: str, thread_id: str, user_email: str):
+    async for _ in jarvis_agent.interact(human_message=prompt, thread_id=thread_id, user_email=user_email):
+      pass
+
+  async def agent_steps(issue_key: str) -> str:
+    reporter_email = await _get_jira_reporter_email(issue_key)
+    prompts = [
+      f"Add comment to Jira {issue_key} asked by user_email: {reporter_email}: ⏳ Jarvis AI Agent is processing...",
+      f"Add label to Jira {issue_key} asked by user_email: {reporter_email}: JARVIS_AGENT_AT_WORK",
+      f"Transition Jira {issue_key} asked by user_email: {reporter_email}: If Jira project key is OPENSD "
+      "transition to Acknowledge otherwise transition to In-Progress",
+    ]
+    for prompt in prompts:
+      await interact(prompt, issue_key, reporter_email)
+    return reporter_email
+
+  async def direct_steps(issue_key: str) -> str:
+    reporter_email, _ = await asyncio.gather(
+      _get_jira_reporter_email(issue_key), _run_webhook_actions("issue_assigned", issue_key)
+    )
+    return reporter_email
+
+  flows = {"agent": agent_steps, "direct": direct_steps}
+  results = {mode: {"steps": [], "total": [], "requests": []} for mode in modes}
+  try:
+    for i in range(rounds):
+      for mode in modes if i % 2 == 0 else reversed(modes):
+        issue_key = f"BENCH-{mode}-{i}"
+        del requests[:]
+        start = time.perf_counter()
+        reporter_email = await flows[mode](issue_key)
+        steps = time.perf_counter() - start
+        jira_requests = len(requests)
+        if not skip_question:
+          question = f"{ISSUE_QUESTION} (asked by user_email: {reporter_email} on Jira Issue ID: {issue_key})"
+          await interact(question, issue_key, reporter_email)
+        results[mode]["steps"].append(steps)
+        results[mode]["total"].append(time.perf_counter() - start)
+        results[mode]["requests"].append(jira_requests)
+  finally:
+    await JiraInstanceManager.close()
+    await runner.cleanup()
+
+  print(f"{rounds} rounds, fake Jira latency {latency_ms}ms")
+  for mode, timings in results.items():
+    jira_requests = statistics.mean(timings["requests"])
+    print(f"{mode:<8} fixed steps {_summary(timings['steps'])}  Jira requests {jira_requests:.1f}")
+    if not skip_question:
+      print(f"{'':<8} end to end  {_summary(timings['total'])}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--modes", nargs="+", choices=["agent", "direct"], default=["agent", "direct"])
+  parser.add_argument("--rounds", type=int, default=5)
+  parser.add_argument("--latency-ms", type=int, default=100, help="Latency of every fake Jira response")
+  parser.add_argument("--port", type=int, default=18081)
+  parser.add_argument("--skip-question", action="store_true", help="Only time the fixed steps of the event")
+  args = parser.parse_args()
+  asyncio.run(run(args.modes, args.rounds, args.latency_ms, args.port, args.skip_question))
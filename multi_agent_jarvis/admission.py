@@ -0,0 +1,221 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional
+from prometheus_client import Counter, Gauge, Histogram
+
+from multi_agent_jarvis.setup_logging import logging
+
+ADMISSION_IN_FLIGHT = Gauge("jarvis_admission_in_flight_runs", "Graph runs currently executing")
+ADMISSION_QUEUE_DEPTH = Gauge("jarvis_admission_queue_depth", "Admitted runs waiting for an execution slot")
+ADMISSION_REJECTIONS = Counter("jarvis_admission_rejections_total", "Rejected questions by reason", ["reason"])
+ADMISSION_QUEUE_WAIT = Histogram(
+  "jarvis_admission_queue_wait_seconds",
+  "Seconds an admitted run waited for an execution slot",
+  buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300),
+)
+
+
+class AdmissionRejected(Exception):
+  """Raised when a question can't be admitted. `retry_after` is a hint in seconds for the client."""
+
+  def __init__(self, reason: str, retry_after: float):
+    super().__init__(f"Question rejected ({reason}), retry after {retry_after:.0f}s")
+    self.reason = reason
+    self.retry_after = retry_after
+
+
+class TokenBucket:
+  """Refills `rate` tokens per second up to `burst`."""
+
+  def __init__(self, rate: float, burst: float):
+    self.rate = rate
+    self.burst = burst
+    self.tokens = burst
+    self.updated_at = time.monotonic()
+
+  def _refill(self):
+    now = time.monotonic()
+    self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+    self.updated_at = now
+
+  def take(self) -> bool:
+    self._refill()
+    if self.tokens >= 1:
+      self.tokens -= 1
+      return True
+    return False
+
+  def seconds_until_token(self) -> float:
+    self._refill()
+    return max(0.0, (1 - self.tokens) / self.rate) if self.rate > 0 else float("inf")
+
+
+class AdmissionTicket:
+  """
+  An admitted question, holding its place in the wait queue until an execution slot frees up.
+
+  Attributes:
+    user (str): The user the question was admitted for.
+    position (int): 0 once running, otherwise the 1-based position in the wait queue.
+    on_position (Callable[[int], None], optional): Called with the new position whenever it changes.
+  """
+
+  def __init__(self, user: str, on_position: Optional[Callable[[int], None]] = None):
+    self.user = user
+    self.position = 0
+    self.on_position = on_position
+    self.admitted_at = time.monotonic()
+    self._slot = asyncio.get_running_loop().create_future()
+
+  def _set_position(self, position: int):
+    if position != self.position:
+      self.position = position
+      if self.on_position:
+        try:
+          self.on_position(position)
+        except Exception as e:
+          logging.error(f"Error notifying queue position for {self.user}: {e}")
+
+
+class AdmissionController:
+  """
+  Admission control in front of the graph runs.
+
+  Each question first takes a token from its user's bucket and counts against the user's concurrency cap.
+  It then gets one of `max_in_flight` execution slots, or waits in a bounded FIFO queue. When the queue is
+  full the question is rejected with a Retry-After hint derived from the recent run durations.
+
+  Attributes:
+    max_in_flight (int): Maximum number of graph runs executing at once.
+    max_queue (int): Maximum number of admitted runs waiting for a slot.
+    user_rate (float): Questions per second refilled in each user's bucket.
+    user_burst (float): Size of each user's bucket.
+    user_max_concurrent (int): Maximum number of queued or running questions per user.
+  """
+
+  def __init__(
+    self,
+    max_in_flight: int = 32,
+    max_queue: int = 100,
+    user_rate: float = 10 / 60,
+    user_burst: float = 5,
+    user_max_concurrent: int = 2,
+    max_buckets: int = 10000,
+  ):
+    self.max_in_flight = max_in_flight
+    self.max_queue = max_queue
+    self.user_rate = user_rate
+    self.user_burst = user_burst
+    self.user_max_concurrent = user_max_concurrent
+    self.max_buckets = max_buckets
+    self._in_flight = 0
+    self._queue: deque[AdmissionTicket] = deque()
+    self._buckets: dict[str, TokenBucket] = {}
+    self._user_active: dict[str, int] = {}
+    # Moving average of run durations, used for the Retry-After hint
+    self._avg_run_seconds = 30.0
+
+  @classmethod
+  def from_env(cls) -> "AdmissionController":
+    return cls(
+      max_in_flight=int(os.getenv("JARVIS_MAX_IN_FLIGHT_RUNS", "32")),
+      max_queue=int(os.getenv("JARVIS_ADMISSION_QUEUE_SIZE", "100")),
+      user_rate=float(os.getenv("JARVIS_USER_QUESTIONS_PER_MINUTE", "10")) / 60,
+      user_burst=float(os.getenv("JARVIS_USER_QUESTIONS_BURST", "5")),
+      user_max_concurrent=int(os.getenv("JARVIS_USER_MAX_CONCURRENT_RUNS", "2")),
+    )
+
+  def _bucket(self, user: str) -> TokenBucket:
+    bucket = self._buckets.get(user)
+    if bucket is None:
+      if len(self._buckets) >= self.max_buckets:
+        # Full buckets carry no state worth keeping
+        full = [u for u, b in self._buckets.items() if b.seconds_until_token() == 0 and u not in self._user_active]
+        for idle_user in full:
+          del self._buckets[idle_user]
+      bucket = self._buckets[user] = TokenBucket(self.user_rate, self.user_burst)
+    return bucket
+
+  def _reject(self, reason: str, retry_after: float):
+    ADMISSION_REJECTIONS.labels(reason=reason).inc()
+    logging.warning(f"Rejecting question: {reason}, retry after {retry_after:.1f}s")
+    raise AdmissionRejected(reason, retry_after)
+
+  def _update_gauges(self):
+    ADMISSION_IN_FLIGHT.set(self._in_flight)
+    ADMISSION_QUEUE_DEPTH.set(len(self._queue))
+
+  def admit(self, user: str, on_position: Optional[Callable[[int], None]] = None) -> AdmissionTicket:
+    """
+    Admits a question, giving it an execution slot or a place in the wait queue.
+
+    Raises:
+      AdmissionRejected: If the user is over their rate or concurrency limit, or the wait queue is full.
+    """
+    if self._user_active.get(user, 0) >= self.user_max_concurrent:
+      self._reject("user_concurrency", self._avg_run_seconds)
+    bucket = self._bucket(user)
+    if not bucket.take():
+      self._reject("user_rate", bucket.seconds_until_token())
+    ticket = AdmissionTicket(user, on_position)
+    if self._in_flight < self.max_in_flight and not self._queue:
+      self._in_flight += 1
+      ticket._slot.set_result(None)
+    elif len(self._queue) < self.max_queue:
+      self._queue.append(ticket)
+      ticket._set_position(len(self._queue))
+    else:
+      # The token is not refunded, a client hammering a full queue still drains its own bucket
+      self._reject("queue_full", self._avg_run_seconds * (len(self._queue) + 1) / self.max_in_flight)
+    self._user_active[user] = self._user_active.get(user, 0) + 1
+    self._update_gauges()
+    return ticket
+
+  def _release(self, ticket: AdmissionTicket, held_slot: bool, run_seconds: Optional[float] = None):
+    active = self._user_active.get(ticket.user, 1) - 1
+    if active > 0:
+      self._user_active[ticket.user] = active
+    else:
+      self._user_active.pop(ticket.user, None)
+    if run_seconds is not None:
+      self._avg_run_seconds = 0.9 * self._avg_run_seconds + 0.1 * run_seconds
+    if held_slot:
+      self._in_flight -= 1
+      if self._queue:
+        # Hand the slot straight to the next ticket
+        next_ticket = self._queue.popleft()
+        self._in_flight += 1
+        next_ticket._set_position(0)
+        next_ticket._slot.set_result(None)
+        for position, waiting in enumerate(self._queue, start=1):
+          waiting._set_position(position)
+    self._update_gauges()
+
+  def cancel(self, ticket: AdmissionTicket):
+    """Gives up an admitted ticket that will never run, freeing its slot or its place in the wait queue."""
+    if ticket in self._queue:
+      self._queue.remove(ticket)
+      for position, waiting in enumerate(self._queue, start=1):
+        waiting._set_position(position)
+      self._release(ticket, held_slot=False)
+    else:
+      self._release(ticket, held_slot=True)
+
+  async def run(self, ticket: AdmissionTicket, run: Callable[[], Awaitable]):
+    """Waits for the ticket's execution slot, then runs it. The slot is released however the run ends."""
+    try:
+      await ticket._slot
+    except asyncio.CancelledError:
+      self.cancel(ticket)
+      raise
+    ADMISSION_QUEUE_WAIT.observe(time.monotonic() - ticket.admitted_at)
+    start_time = time.monotonic()
+    try:
+      return await run()
+    finally:
+      self._release(ticket, held_slot=True, run_seconds=time.monotonic() - start_time)
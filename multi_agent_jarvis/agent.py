@@ -2,12 +2,16 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+import time
 import datetime
+from functools import partial
 from pydantic import BaseModel, Field
 
 import traceback
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, ToolMessage, RemoveMessage
+from prometheus_client import Histogram
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, AIMessageChunk, ToolMessage
 from langgraph.graph import START, END, StateGraph
+from langgraph.types import Send
 from langgraph.prebuilt import ToolNode
 
 from multi_agent_jarvis.setup_logging import logging
@@ -15,6 +19,8 @@ from multi_agent_jarvis.setup_logging import logging
 from multi_agent_jarvis.globals import (
   SUPERVISOR_AGENT,
   REFLECTION_AGENT,
+  PARALLEL_AGENT,
+  MERGE_AGENT,
   WHAT_CAN_YOU_DO_AGENT,
   ARGOCD_AGENT,
   ARGOCD_TOOLS,
@@ -33,7 +39,14 @@ from multi_agent_jarvis.state import AgentState
 from multi_agent_jarvis.utils import custom_tools_condition
 from multi_agent_jarvis.prompts import sys_msg_supervisor, sys_msg_reflection
 
-from multi_agent_jarvis.llm_factory import JarvisLLMFactory
+from multi_agent_jarvis.llm_registry import JarvisLLMRegistry
+from multi_agent_jarvis.fast_router import FastRouter
+from multi_agent_jarvis.answer_cache import AnswerCache, READ_ONLY_TOOLS
+from multi_agent_jarvis.json_answer_stream import AnswerFieldStream
+from multi_agent_jarvis.context_window import ContextWindow, build_prompt
+from multi_agent_jarvis.graph_metrics import GraphMetricsCallbackHandler
+from multi_agent_jarvis.tracing import TraceCallbackHandler, TraceSink, end_trace, start_trace
+from multi_agent_jarvis.reflection_rules import ReflectionDecision, evaluate_reflection_rules, record_reflection_decision
 from langchain_core.runnables.config import RunnableConfig
 
 from multi_agent_jarvis.agents.argocd_agent.agent import argocd_agent
@@ -51,6 +64,20 @@ from multi_agent_jarvis.agents.jira_agent.tools import tools as jira_tools
 from multi_agent_jarvis.agents.pagerduty_agent.agent import pagerduty_agent
 from multi_agent_jarvis.agents.pagerduty_agent.tools import tools as pagerduty_tools
 
+TIME_TO_FIRST_TOKEN = Histogram(
+  "jarvis_time_to_first_token_seconds",
+  "Seconds from the start of an interaction to the first answer text sent to the user",
+  ["mode"],
+  buckets=(0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 34, 60),
+)
+
+# Nodes whose LLM output carries the answer meant for the user. They reply with a structured JarvisResponse, so
+# only the text of its "answer" field is forwarded. The supervisor and reflection agents reply with routing
+# decisions, the "what can you do" agent's answer follows in one piece, and tool nodes return raw API output.
+TOKEN_STREAMING_NODES = frozenset({ARGOCD_AGENT, BACKSTAGE_AGENT, GITHUB_AGENT, JIRA_AGENT, PAGERDUTY_AGENT})
+TOOL_NODES = frozenset({ARGOCD_TOOLS, BACKSTAGE_TOOLS, GITHUB_TOOLS, JIRA_TOOLS, PAGERDUTY_TOOLS})
+
+
 class JarvisMultiAgentSystem:
   """
   JarvisMultiAgentSystem orchestrates a modular, multi-agent architecture inspired by the design described in
@@ -74,7 +101,8 @@ class JarvisMultiAgentSystem:
   Methods:
     get_state(thread_id: str): Retrieve the current state for a conversation thread.
     get_state_history(thread_id: str): Retrieve the full state history for a thread.
-    interact(human_message: str, thread_id: str, user_email: str): Process a user message through the multi-agent system.
+    interact(human_message: str, thread_id: str, user_email: str, stream_tokens: bool): Process a user message through
+      the multi-agent system, optionally streaming LLM token deltas as they are generated.
     create_graph_image(): Generate and save a visual representation of the agent state graph.
     get_graph(): Access the underlying state graph object.
 
@@ -89,48 +117,113 @@ class JarvisMultiAgentSystem:
   """
 
   def __init__(self, checkpointer, store):
-    # Initialize JarvisLLMFactory with the desired model name
+    # Build every LLM connection and tool binding once, sharing a single pooled HTTP client
     model_name = os.getenv("JARVIS_LLM_MODEL_NAME", "gpt-4o-mini")
-    llm_factory = JarvisLLMFactory(model_name)
+    self.llm_registry = JarvisLLMRegistry(model_name)
 
-    llm_supervisor = llm_factory.get_llm_connection().with_structured_output(SupervisorAction, strict=True)
-    llm_what_can_you_do = llm_factory.get_llm_connection(response_format=JarvisResponse)
+    llm_supervisor = self.llm_registry.register_structured_output(SUPERVISOR_AGENT, SupervisorAction)
+    llm_what_can_you_do = self.llm_registry.register_llm(WHAT_CAN_YOU_DO_AGENT, response_format=JarvisResponse)
 
     class ShouldContinue(BaseModel):
       should_continue: bool = Field(description="Whether to continue processing the request.")
       reason: str = Field(description="Reason for decision whether to continue the request.")
 
-    llm_reflection = llm_factory.get_llm_connection().with_structured_output(ShouldContinue, strict=True)
+    llm_reflection = self.llm_registry.register_structured_output(REFLECTION_AGENT, ShouldContinue)
+
+    self.llm_registry.register_tools(ARGOCD_AGENT, argocd_tools)
+    self.llm_registry.register_tools(BACKSTAGE_AGENT, backstage_tools)
+    self.llm_registry.register_tools(GITHUB_AGENT, github_tools)
+    self.llm_registry.register_tools(JIRA_AGENT, jira_tools)
+    self.llm_registry.register_tools(PAGERDUTY_AGENT, pagerduty_tools)
+    self.llm_registry.log_build_timings()
+
+    # Optional local classifier that routes obvious questions without a supervisor LLM call
+    fast_router = FastRouter.from_env()
+    # Token-budgeted message window shared by every node
+    context_window = ContextWindow.from_env()
+    # Optional semantic cache of answers to read-only questions, checked before running the graph
+    self.answer_cache = AnswerCache.from_env()
+    # Optional local sink of per-interaction span trees, analysed offline with multi_agent_jarvis.trace_report
+    self.trace_sink = TraceSink.from_env()
+    # Prometheus metrics of every node, tool and LLM call, passed to each run with its config
+    self.graph_metrics = GraphMetricsCallbackHandler()
 
     # Node
     async def supervisor_agent(state: AgentState, config: RunnableConfig):
       try:
         logging.info("Entering supervisor agent")
         logging.debug(f"sys_msg_supervisor: {sys_msg_supervisor.content}")
-        response = await llm_supervisor.ainvoke(
-          [sys_msg_supervisor] + state["messages"]
-        )
-        logging.info("*" * 50)
-        logging.info(response)
-        logging.info("*" * 50)
-        # Generate the list of messages to delete
-        max_messages = int(os.getenv("JARVIS_MAX_MESSAGES", "20"))
-        # Check if the last message exists and if it is a tool message
-        if len(state["messages"]) >= max_messages and isinstance(state["messages"][-max_messages], ToolMessage):
-          # Keep one more as it's the message with tool_calls
-          max_messages += 1
-        delete_messages = [RemoveMessage(id=m.id) for m in state["messages"][:-max_messages]]
-        return {"next": response.action, "messages": delete_messages}
+        # Fold older turns into the rolling summary once the window is over its token budget
+        window_update, window = context_window.trim(state)
+        action = fast_router.route(window) if fast_router else None
+        actions = [action] if action else []
+        if action is None:
+          response = await llm_supervisor.ainvoke(
+            build_prompt(SUPERVISOR_AGENT, sys_msg_supervisor, {**state, **window_update}, window)
+          )
+          logging.info("*" * 50)
+          logging.info(response)
+          logging.info("*" * 50)
+          # Drop duplicates while keeping the order chosen by the LLM
+          actions = list(dict.fromkeys(response.actions)) or ["what can you do"]
+        return {"next": actions[0], "parallel_actions": actions, **window_update}
       except Exception:
         logging.error(f"Error during supervisor agent invoke: {traceback.format_exc()}")
-        return {"next": "what can you do"}
+        return {"next": "what can you do", "parallel_actions": []}
+
+    # Edge
+    def route_supervisor(state: AgentState):
+      """Routes to a single task agent, or fans out to the parallel agent when several independent actions were chosen."""
+      task_actions = [
+        a for a in state.get("parallel_actions") or [] if a in GRAPH_STATE_TO_NEXT_ACTIONS and a != "what can you do"
+      ]
+      if len(task_actions) <= 1:
+        return GRAPH_STATE_TO_NEXT_ACTIONS.get(task_actions[0] if task_actions else state["next"], WHAT_CAN_YOU_DO_AGENT)
+      logging.info(f"Fanning out to agents: {task_actions}")
+      return [
+        Send(PARALLEL_AGENT, {"messages": state["messages"], "summary": state.get("summary", ""), "next": a})
+        for a in task_actions
+      ]
 
     # Node
-    async def what_can_you_do_agent(state: AgentState, config: RunnableConfig):
+    async def parallel_agent(branch: dict, config: RunnableConfig):
+      """Runs one task agent and its tool loop on a private copy of the messages, returning only its answer."""
+      node = GRAPH_STATE_TO_NEXT_ACTIONS[branch["next"]]
+      input_messages = branch["messages"]
       try:
-        response = await llm_what_can_you_do.ainvoke(
-          [sys_msg_supervisor] + state["messages"]
+        result = await agent_subgraphs[node].ainvoke(
+          {"messages": input_messages, "summary": branch.get("summary", "")}, config
         )
+        new_messages = result["messages"][len(input_messages):]
+        answers = [m for m in new_messages if isinstance(m, AIMessage) and not m.tool_calls] or new_messages[-1:]
+        metadata = (result.get("metadata") or [JarvisResponseMetadata(user_input=False, input_fields=[])])[-1]
+        tools_used = sorted({m.name for m in new_messages if isinstance(m, ToolMessage)})
+      except Exception as e:
+        logging.error(f"Error during parallel agent invoke of {node}: {traceback.format_exc()}")
+        answers = [AIMessage(f"{type(e).__name__}: {e}")]
+        metadata = JarvisResponseMetadata(user_input=False, input_fields=[])
+        tools_used = []
+      return {
+        "messages": answers,
+        "metadata": [metadata],
+        "branch_results": [{"node": node, "metadata": metadata, "tools_used": tools_used}],
+      }
+
+    # Node
+    async def merge_agent(state: AgentState, config: RunnableConfig):
+      """Merges the metadata of the parallel branches so reflection sees every pending user input at once."""
+      results = state.get("branch_results") or []
+      logging.info(f"Merging results from agents: {[r['node'] for r in results]}")
+      metadata = JarvisResponseMetadata(
+        user_input=any(r["metadata"].user_input for r in results),
+        input_fields=[field for r in results for field in r["metadata"].input_fields],
+      )
+      return {"metadata": [metadata], "branch_results": None}
+
+    # Node
+    async def what_can_you_do_agent(state: AgentState, config: RunnableConfig):
+      try:
+        response = await llm_what_can_you_do.ainvoke(build_prompt(WHAT_CAN_YOU_DO_AGENT, sys_msg_supervisor, state))
         response = response.additional_kwargs["parsed"]
         logging.info({"messages": [AIMessage(response.answer)], "metadata": [response.metadata]})
         return {"messages": [AIMessage(response.answer)], "metadata": [response.metadata]}
@@ -144,21 +237,21 @@ class JarvisMultiAgentSystem:
     # Node
     async def reflection_agent(state: AgentState, config: RunnableConfig):
       try:
-        response = await llm_reflection.ainvoke(
-          [sys_msg_reflection] + state["messages"]
-        )
-        logging.info(f"Reflection agent response: {response}")
-        is_duplicate_message = (
-          len(state["messages"]) > 2 and state["messages"][-1].content == state["messages"][-3].content
-        )
-        is_user_input_required = state["metadata"][-1].user_input
-        should_continue = response.should_continue and not is_user_input_required and not is_duplicate_message
+        # Deterministic stop rules first, only ask the LLM when they can't decide
+        decision = evaluate_reflection_rules(state)
+        if decision is None:
+          response = await llm_reflection.ainvoke(build_prompt(REFLECTION_AGENT, sys_msg_reflection, state))
+          logging.info(f"Reflection agent response: {response}")
+          decision = ReflectionDecision("llm", response.should_continue, response.reason)
+          record_reflection_decision(decision)
+        should_continue = decision.should_continue
         logging.info(f"Should continue: {should_continue}")
         next_node = SUPERVISOR_AGENT if should_continue else END
         logging.info(f"Next node: {next_node}")
         return {
           "next": next_node,
-          "messages": [SystemMessage(content=response.reason)],
+          "reflection_loops": (state.get("reflection_loops") or 0) + int(should_continue),
+          "messages": [SystemMessage(content=decision.reason)],
           "metadata": [JarvisResponseMetadata(user_input=False, input_fields=[])],
         }
       except Exception:
@@ -172,27 +265,29 @@ class JarvisMultiAgentSystem:
     self.builder.add_node(SUPERVISOR_AGENT, supervisor_agent)
     self.builder.add_node(WHAT_CAN_YOU_DO_AGENT, what_can_you_do_agent)
     self.builder.add_node(REFLECTION_AGENT, reflection_agent)
+    self.builder.add_node(PARALLEL_AGENT, parallel_agent)
+    self.builder.add_node(MERGE_AGENT, merge_agent)
 
     # Task Agent Nodes and Tools
 
     ## ArgoCD
-    self.builder.add_node(ARGOCD_AGENT, argocd_agent)
+    self.builder.add_node(ARGOCD_AGENT, partial(argocd_agent, llm=self.llm_registry.get(ARGOCD_AGENT)))
     self.builder.add_node(ARGOCD_TOOLS, ToolNode(argocd_tools))
 
     ## Backstage
-    self.builder.add_node(BACKSTAGE_AGENT, backstage_agent)
+    self.builder.add_node(BACKSTAGE_AGENT, partial(backstage_agent, llm=self.llm_registry.get(BACKSTAGE_AGENT)))
     self.builder.add_node(BACKSTAGE_TOOLS, ToolNode(backstage_tools))
 
     ## GitHub
-    self.builder.add_node(GITHUB_AGENT, github_agent)
+    self.builder.add_node(GITHUB_AGENT, partial(github_agent, llm=self.llm_registry.get(GITHUB_AGENT)))
     self.builder.add_node(GITHUB_TOOLS, ToolNode(github_tools))
 
     ## Jira
-    self.builder.add_node(JIRA_AGENT, jira_agent)
+    self.builder.add_node(JIRA_AGENT, partial(jira_agent, llm=self.llm_registry.get(JIRA_AGENT)))
     self.builder.add_node(JIRA_TOOLS, ToolNode(jira_tools))
 
     ## PagerDuty
-    self.builder.add_node(PAGERDUTY_AGENT, pagerduty_agent)
+    self.builder.add_node(PAGERDUTY_AGENT, partial(pagerduty_agent, llm=self.llm_registry.get(PAGERDUTY_AGENT)))
     self.builder.add_node(PAGERDUTY_TOOLS, ToolNode(pagerduty_tools))
 
     #######################################
@@ -201,14 +296,23 @@ class JarvisMultiAgentSystem:
     self.builder.add_edge(START, SUPERVISOR_AGENT)
     self.builder.add_conditional_edges(
       SUPERVISOR_AGENT,
-      lambda state: state["next"],
-      GRAPH_STATE_TO_NEXT_ACTIONS,
+      route_supervisor,
+      list(GRAPH_STATE_TO_NEXT_ACTIONS.values()) + [PARALLEL_AGENT],
     )
 
+    # Parallel Agent Transitions
+    # parallel_agent (one branch per action) ==> merge_agent ==> reflection_agent
+    self.builder.add_edge(PARALLEL_AGENT, MERGE_AGENT)
+    self.builder.add_edge(MERGE_AGENT, REFLECTION_AGENT)
+
     # What Can You Do Agent Transitions
     # what_can_you_do_agent ==> END
     self.builder.add_edge(WHAT_CAN_YOU_DO_AGENT, END)
 
+    # Reflection Agent Transitions
+    # reflection_agent ==> supervisor_agent | END
+    self.builder.add_conditional_edges(REFLECTION_AGENT, lambda state: state["next"], [SUPERVISOR_AGENT, END])
+
     # ArgoCD Agent Transitions
     self.builder.add_conditional_edges(ARGOCD_AGENT, custom_tools_condition(ARGOCD_TOOLS, REFLECTION_AGENT))
     # argocd_tools ==> argocd_agent
@@ -234,9 +338,32 @@ class JarvisMultiAgentSystem:
     # pagerduty_tools ==> pagerduty_agent
     self.builder.add_edge(PAGERDUTY_TOOLS, PAGERDUTY_AGENT)
 
+    # Standalone agent + tools loops used by the parallel agent
+    agent_subgraphs = {
+      ARGOCD_AGENT: self._build_agent_subgraph(ARGOCD_AGENT, ARGOCD_TOOLS, argocd_agent, argocd_tools),
+      BACKSTAGE_AGENT: self._build_agent_subgraph(BACKSTAGE_AGENT, BACKSTAGE_TOOLS, backstage_agent, backstage_tools),
+      GITHUB_AGENT: self._build_agent_subgraph(GITHUB_AGENT, GITHUB_TOOLS, github_agent, github_tools),
+      JIRA_AGENT: self._build_agent_subgraph(JIRA_AGENT, JIRA_TOOLS, jira_agent, jira_tools),
+      PAGERDUTY_AGENT: self._build_agent_subgraph(PAGERDUTY_AGENT, PAGERDUTY_TOOLS, pagerduty_agent, pagerduty_tools),
+    }
+
     # Compile Graph
     self.react_graph_memory = self.builder.compile(checkpointer=checkpointer, store=store)
 
+  def _build_agent_subgraph(self, agent_name: str, tools_name: str, agent_fn, tools):
+    """Compiles a task agent and its tools into a graph that loops until the agent stops calling tools."""
+    builder = StateGraph(AgentState)
+    builder.add_node(agent_name, partial(agent_fn, llm=self.llm_registry.get(agent_name)))
+    builder.add_node(tools_name, ToolNode(tools))
+    builder.add_edge(START, agent_name)
+    builder.add_conditional_edges(agent_name, custom_tools_condition(tools_name, END))
+    builder.add_edge(tools_name, agent_name)
+    return builder.compile()
+
+  async def aclose(self):
+    """Releases the resources shared across interactions."""
+    await self.llm_registry.aclose()
+
   async def get_state(self, thread_id: str):
     """Retrieves the state for a given thread ID."""
     config = {"configurable": {"thread_id": thread_id}}
@@ -247,9 +374,21 @@ class JarvisMultiAgentSystem:
     config = {"configurable": {"thread_id": thread_id}}
     return self.react_graph_memory.get_state_history(config=config)
 
-  async def interact(self, human_message: str, thread_id: str, user_email: str):
+  async def interact(self, human_message: str, thread_id: str, user_email: str, stream_tokens: bool = None):
+    """
+    Processes a user message through the graph and yields the answers as they are produced.
+
+    Every node answer is yielded as `{"answer": str, "metadata": dict}`, followed by an empty dict once the run
+    is complete. With `stream_tokens` (default: JARVIS_STREAM_TOKENS), LLM token deltas of the task agents are
+    also yielded as `{"delta": str, "node": str}` before the full answer of their node. Deltas are the partial
+    text of the answer field of the structured response: the full answer that follows supersedes them.
+    """
     # Log the arguments
     logging.info(f"Arguments - human_message: {human_message}, thread_id: {thread_id}, user_email: {user_email}")
+    if stream_tokens is None:
+      stream_tokens = os.getenv("JARVIS_STREAM_TOKENS", "false").lower() == "true"
+    start_time = time.perf_counter()
+    trace = None
     try:
       # Specify a thread
       config = {
@@ -257,7 +396,11 @@ class JarvisMultiAgentSystem:
         "configurable": {
           "thread_id": thread_id,
         },
+        "callbacks": [self.graph_metrics],
       }
+      if self.trace_sink:
+        trace = start_trace(thread_id)
+        config["callbacks"].append(TraceCallbackHandler(trace))
 
       # Specify an input
       messages = [HumanMessage(content=human_message)]
@@ -267,39 +410,98 @@ class JarvisMultiAgentSystem:
       # Log the initial messages
       logging.debug(f"Initial messages: {messages}")
 
+      if self.answer_cache:
+        cached_answers = self.answer_cache.lookup(human_message, user_email)
+        if cached_answers is not None:
+          if trace:
+            trace.attributes["answer_cache"] = "hit"
+          await self._record_cached_turn(config, human_message, cached_answers)
+          for answer in cached_answers:
+            yield answer
+          yield {}
+          return
+
       all_messages = []
-      async for chunk in self.react_graph_memory.astream({"messages": messages}, config=config, stream_mode="updates"):
+      answers = []
+      tools_used = set()
+      # Every action the supervisor chose during the run, including after reflection loops back to it
+      intents = set()
+      first_token_seen = False
+      # One incremental parser of the structured response per LLM call, keyed by message ID
+      answer_streams = {}
+      stream_mode = ["updates", "messages"] if stream_tokens else ["updates"]
+      # The reflection loop budget is per turn
+      graph_input = {"messages": messages, "reflection_loops": 0}
+      async for mode, chunk in self.react_graph_memory.astream(graph_input, config=config, stream_mode=stream_mode):
+        if mode == "messages":
+          message_chunk, chunk_metadata = chunk
+          node = chunk_metadata.get("langgraph_node")
+          if isinstance(message_chunk, AIMessageChunk) and node in TOKEN_STREAMING_NODES:
+            answer_stream = answer_streams.setdefault(message_chunk.id, AnswerFieldStream())
+            delta = answer_stream.feed(message_chunk.content) if isinstance(message_chunk.content, str) else ""
+            if delta:
+              if not first_token_seen:
+                first_token_seen = True
+                TIME_TO_FIRST_TOKEN.labels(mode="tokens").observe(time.perf_counter() - start_time)
+              yield {"delta": delta, "node": node}
+          continue
         for node, values in chunk.items():
           logging.debug(f"Receiving update from node: '{node}'")
           logging.debug(values)
+          if node == SUPERVISOR_AGENT:
+            intents.update(values.get("parallel_actions") or [])
+          if node == PARALLEL_AGENT:
+            tools_used.update(t for r in values.get("branch_results", []) for t in r["tools_used"])
           if "messages" in values:
             all_messages.extend(values["messages"])
+            tools_used.update(m.name for m in values["messages"] if isinstance(m, ToolMessage))
             message = "\n".join(
               m.content
               for m in values["messages"]
               if not isinstance(m, SystemMessage)
-              and (
-                node
-                not in [
-                  ARGOCD_TOOLS,
-                  BACKSTAGE_TOOLS,
-                  GITHUB_TOOLS,
-                  JIRA_TOOLS,
-                  PAGERDUTY_TOOLS,
-                ]
-              )
+              and node not in TOOL_NODES
             )
             if "metadata" in values and len(values["metadata"]) > 0:
               metadata = values["metadata"][-1].model_dump()
             else:
               metadata = {}
             if message:
-              yield {"answer": message, "metadata": metadata}
+              if not first_token_seen:
+                first_token_seen = True
+                TIME_TO_FIRST_TOKEN.labels(mode="updates").observe(time.perf_counter() - start_time)
+              answers.append({"answer": message, "metadata": metadata})
+              yield answers[-1]
+      if self.answer_cache:
+        if tools_used <= READ_ONLY_TOOLS:
+          self.answer_cache.store(human_message, user_email, intents, tools_used, answers)
+        else:
+          # Something was written through these intents, the answers they gave any user may be stale
+          for intent in intents:
+            self.answer_cache.invalidate(intent=intent)
       yield {}
     except Exception as e:
       logging.error(f"Error in interact method: {traceback.format_exc()}")
       logging.error(f"{type(e).__name__}: {e}")
       yield {"answer": "Jarvis Agent is not available right now. Please try again later!"}
+    finally:
+      if trace:
+        end_trace()
+        self.trace_sink.write(trace)
+
+  async def _record_cached_turn(self, config: dict, human_message: str, answers: list):
+    """Appends a turn served from the answer cache to the thread so follow-up questions keep their context."""
+    try:
+      metadata = answers[-1].get("metadata") or {"user_input": False, "input_fields": []}
+      await self.react_graph_memory.aupdate_state(
+        config,
+        {
+          "messages": [HumanMessage(content=human_message), AIMessage("\n".join(a["answer"] for a in answers))],
+          "metadata": [JarvisResponseMetadata(**metadata)],
+        },
+        as_node=WHAT_CAN_YOU_DO_AGENT,
+      )
+    except Exception:
+      logging.error(f"Error recording cached answer in thread state: {traceback.format_exc()}")
 
   def create_graph_image(self):
     graph_image = self.react_graph_memory.get_graph(xray=1).draw_mermaid_png()
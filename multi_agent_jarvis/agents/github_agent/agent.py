@@ -8,14 +8,16 @@ from multi_agent_jarvis.setup_logging import logging
 from multi_agent_jarvis.llm_factory import get_llm_connection_with_tools
 from multi_agent_jarvis.state import AgentState
 from multi_agent_jarvis.utils import process_llm_response
+from multi_agent_jarvis.context_window import build_prompt
+from multi_agent_jarvis.globals import GITHUB_AGENT
 from multi_agent_jarvis.agents.github_agent.sys_msg import sys_msg
 from multi_agent_jarvis.agents.github_agent.tools import tools
 
 
-async def github_agent(state: AgentState):
+async def github_agent(state: AgentState, llm=None):
   try:
-    llm = await get_llm_connection_with_tools(tools)
-    response = await llm.ainvoke([sys_msg] + state["messages"])
+    llm = llm or await get_llm_connection_with_tools(tools)
+    response = await llm.ainvoke(build_prompt(GITHUB_AGENT, sys_msg, state))
     return process_llm_response(response, tools)
   except Exception as e:
     logging.error(f"Error during github agent invoke: {traceback.format_exc()}")
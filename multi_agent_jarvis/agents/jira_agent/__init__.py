@@ -13,6 +13,7 @@ from multi_agent_jarvis.agents.jira_agent.tools.jira_issue import (
 
 # Jira User
 from multi_agent_jarvis.agents.jira_agent.tools.jira_user import _get_jira_reporter_email
+from multi_agent_jarvis.agents.jira_agent.tools.jira_user_directory import JiraUserDirectory
 
 
 # Outshift SRE Jira Utils
@@ -21,7 +22,11 @@ from multi_agent_jarvis.agents.jira_agent.tools.outshift_sre_jira_utils import (
 )
 
 # Utils
-from multi_agent_jarvis.agents.jira_agent.tools.jira_webhook_utils import process_jira_webhook
+from multi_agent_jarvis.agents.jira_agent.tools.jira_webhook_utils import (
+  process_jira_webhook,
+  process_jira_comments,
+  _run_webhook_actions,
+)
 from multi_agent_jarvis.agents.jira_agent.tools.jira_comment import jira_comment_body_adf
 
 
@@ -29,7 +34,10 @@ __all__ = [
   "_add_jira_comment",
   "_add_new_label_to_issue",
   "_get_jira_reporter_email",
+  "JiraUserDirectory",
   "_create_outshift_service_desk_ticket",
   "process_jira_webhook",
+  "process_jira_comments",
+  "_run_webhook_actions",
   "jira_comment_body_adf",
 ]
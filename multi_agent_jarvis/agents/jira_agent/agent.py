@@ -4,11 +4,12 @@
 import os
 import traceback
 from langchain_core.messages import AIMessage
-from multi_agent_jarvis.globals import SUPERVISOR_AGENT
+from multi_agent_jarvis.globals import SUPERVISOR_AGENT, JIRA_AGENT
 from multi_agent_jarvis.llm_factory import JarvisLLMFactory
 
 from multi_agent_jarvis.state import AgentState
 from multi_agent_jarvis.utils import tool_call_response
+from multi_agent_jarvis.context_window import build_prompt
 from multi_agent_jarvis.models import JarvisResponse
 from multi_agent_jarvis.agents.jira_agent.jira_sys_msg import jira_sys_msg
 from multi_agent_jarvis.setup_logging import logging
@@ -21,10 +22,10 @@ async def get_llm_connection():
   return llm_factory.get_llm_connection(response_format=JarvisResponse).bind_tools(tools, strict=True)
 
 
-async def jira_agent(state: AgentState):
+async def jira_agent(state: AgentState, llm=None):
   try:
-    llm_jira = await get_llm_connection()
-    response = await llm_jira.ainvoke([jira_sys_msg] + state["messages"])
+    llm_jira = llm or await get_llm_connection()
+    response = await llm_jira.ainvoke(build_prompt(JIRA_AGENT, jira_sys_msg, state))
     structured_response = response.additional_kwargs["parsed"]
     if response.tool_calls:
       return tool_call_response(structured_response, response, tools, SUPERVISOR_AGENT)
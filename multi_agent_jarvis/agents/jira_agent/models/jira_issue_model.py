@@ -33,6 +33,9 @@ class Priority(BaseModel):
 class Status(BaseModel):
   name: str
 
+class IssueType(BaseModel):
+  name: str
+
 class Comment(BaseModel):
   self: HttpUrl
   id: str
@@ -55,6 +58,7 @@ class Fields(BaseModel):
   description: Optional[str] = None
   priority: Optional[Priority]
   status: Optional[Status]
+  issuetype: Optional[IssueType] = None
   creator: Optional[Creator] = None
 
 class Issue(BaseModel):
@@ -106,3 +110,9 @@ class JiraPayload(BaseModel):
 
   def get_labels(self):
     return self.issue.fields.labels
+
+  def get_workflow_step(self):
+    fields = self.issue.fields
+    if fields.issuetype and fields.status:
+      return (fields.project.key, fields.issuetype.name, fields.status.name)
+    return None
@@ -44,7 +44,8 @@ from .outshift_sre_jira_utils import (
 )
 # Utils
 from .jira_webhook_utils import (
-  process_jira_webhook
+  process_jira_webhook,
+  process_jira_comments
 )
 from .jira_comment import (
   jira_comment_body_adf
@@ -102,5 +103,6 @@ __all__ = [
   '_create_outshift_service_desk_ticket',
   'retrieve_outshift_service_desk_tickets',
   'process_jira_webhook',
+  'process_jira_comments',
   'jira_comment_body_adf',
 ]
\ No newline at end of file
@@ -2,42 +2,94 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
-from requests.auth import HTTPBasicAuth
+import json
+from aiohttp import BasicAuth, ClientSession, ClientTimeout, TCPConnector
 from multi_agent_jarvis.setup_logging import logging
-from jira import JIRA
+from multi_agent_jarvis.tracing import aiohttp_trace_config
 
-class JiraInstanceManager:
-  """Singleton class to manage the JIRA instance and HTTPBasicAuth."""
-
-  _jira_instance = None
-  _auth_instance = None
-  _jira_server_url = os.getenv('JIRA_SERVER')
-  _jira_headers =   headers = {
-    'Accept': 'application/json',
-    'Content-Type': 'application/json'
-  }
 
-  @classmethod
-  def get_jira_instance(cls):
-    if cls._jira_instance is None:
-      jira_token = os.getenv("JARVIS_JIRA_ACCESS_TOKEN")
-      jira_user = os.getenv("JARVIS_JIRA_USER_EMAIL")
-      jira_server = os.getenv("JIRA_SERVER")
+class JiraResponse:
+  """Response of an AsyncJiraClient request, mirroring the parts of `requests.Response` used by the Jira tools."""
+
+  def __init__(self, status_code: int, text: str):
+    self.status_code = status_code
+    self.text = text
+
+  def json(self):
+    return json.loads(self.text) if self.text else None
+
+
+class AsyncJiraClient:
+  """
+  Native async client for the Jira REST API.
+
+  Every request goes through one shared `aiohttp.ClientSession`, so connections to Jira are kept alive and
+  pooled across tools instead of being opened for each call.
+
+  Attributes:
+    server_url (str): Base URL of the Jira server.
+    session (ClientSession): Shared session used for every request.
+  """
 
-      logging.info(f"Creating new JIRA instance with server: {jira_server}, user: {jira_user}")
-      cls._jira_instance = JIRA(server=jira_server, basic_auth=(jira_user, jira_token))
+  def __init__(self, server_url: str, session: ClientSession):
+    self.server_url = server_url
+    self.session = session
 
-    logging.info("Returning JIRA instance")
-    return cls._jira_instance
+  async def request(self, method: str, path: str, params: dict = None, json_body=None) -> JiraResponse:
+    url = path if path.startswith("http") else f"{self.server_url}{path}"
+    async with self.session.request(method, url, params=params, json=json_body) as response:
+      return JiraResponse(response.status, await response.text())
+
+  async def get(self, path: str, params: dict = None) -> JiraResponse:
+    return await self.request("GET", path, params=params)
+
+  async def post(self, path: str, json_body=None) -> JiraResponse:
+    return await self.request("POST", path, json_body=json_body)
+
+  async def put(self, path: str, json_body=None) -> JiraResponse:
+    return await self.request("PUT", path, json_body=json_body)
+
+
+class JiraInstanceManager:
+  """Singleton class to manage the async Jira client and its pooled HTTP session."""
+
+  _client = None
+  _jira_server_url = os.getenv("JIRA_SERVER")
+  _jira_headers = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+  }
 
   @classmethod
-  def get_auth_instance(cls):
-    if cls._auth_instance is None:
-      user_email = os.getenv('JARVIS_JIRA_USER_EMAIL')
-      access_token = os.getenv('JARVIS_JIRA_ACCESS_TOKEN')
+  async def get_async_client(cls) -> AsyncJiraClient:
+    """Get or create the async Jira client. This function has to be async so that it shares the same event loop as FastAPI."""
+    if cls._client is None or cls._client.session.closed:
+      user_email = os.getenv("JARVIS_JIRA_USER_EMAIL")
+      access_token = os.getenv("JARVIS_JIRA_ACCESS_TOKEN")
+      connector = TCPConnector(
+        limit=int(os.getenv("JARVIS_JIRA_MAX_CONNECTIONS", "100")),
+        limit_per_host=int(os.getenv("JARVIS_JIRA_MAX_CONNECTIONS_PER_HOST", "20")),
+        keepalive_timeout=float(os.getenv("JARVIS_JIRA_KEEPALIVE_TIMEOUT", "30")),
+      )
+      session_timeout = int(os.getenv("JARVIS_JIRA_TIMEOUT", os.getenv("JARVIS_GLOBAL_SESSION_TIMEOUT", "30")))
 
-      logging.info(f"Creating new HTTPBasicAuth instance for server: {cls._jira_server_url}, user: {user_email}")
-      cls._auth_instance = HTTPBasicAuth(user_email, access_token)
+      logging.info(f"Creating new async Jira client for server: {cls._jira_server_url}, user: {user_email}")
+      session = ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(session_timeout),
+        auth=BasicAuth(user_email, access_token),
+        headers=cls._jira_headers,
+        trace_configs=[aiohttp_trace_config()],
+      )
+      cls._client = AsyncJiraClient(cls._jira_server_url, session)
+    return cls._client
 
-    logging.info("Returning HTTPBasicAuth instance")
-    return cls._jira_server_url, cls._auth_instance, cls._jira_headers
+  @classmethod
+  async def close(cls):
+    """Close the pooled Jira HTTP session."""
+    if cls._client is None:
+      logging.info("Async Jira client was never created, nothing to close")
+    else:
+      logging.info("Closing async Jira client")
+      await cls._client.session.close()
+      cls._client = None
@@ -1,7 +1,6 @@
 # Copyright 2025 CNOE
 # SPDX-License-Identifier: Apache-2.0
 
-import requests
 import json
 from multi_agent_jarvis.setup_logging import logging
 from multi_agent_jarvis.agents.jira_agent.tools._jira_instance import JiraInstanceManager
@@ -32,13 +31,13 @@ async def _add_jira_comment(issue_key: str, input: Union[str, JiraADFModel]):
   Raises:
     ValueError: If the input is neither a string nor an instance of JiraADFModel.
   """
-  jira_server_url, auth, headers = JiraInstanceManager.get_auth_instance()
+  jira_client = await JiraInstanceManager.get_async_client()
 
-  comment_url = f'{jira_server_url}/rest/api/3/issue/{issue_key}/comment'
+  comment_url = f'/rest/api/3/issue/{issue_key}/comment'
 
   if isinstance(input, str):
     logging.info("Input is a string.")
-    payload = json.dumps({
+    payload = {
       'body': {
         'version': 1,
         'type': 'doc',
@@ -54,22 +53,17 @@ async def _add_jira_comment(issue_key: str, input: Union[str, JiraADFModel]):
           }
         ]
       }
-    })
+    }
   elif isinstance(input, JiraADFModel):
     logging.info("Input is an instance of JiraADFModel.")
-    payload = json.dumps({'body': json.loads(input.model_dump_json(exclude_none=True))})
+    payload = {'body': json.loads(input.model_dump_json(exclude_none=True))}
   else:
     logging.error("Input must be either a string or an instance of JiraADFModel.")
     raise ValueError("Input must be either a string or an instance of JiraADFModel")
 
   logging.info(f"comment_url: {comment_url}")
   logging.info(f"payload: {payload}")
-  logging.info(f"headers: {headers}")
-  logging.info(f"auth: {auth}")
-  comment_response = requests.post(comment_url,
-                   data=payload,
-                   headers=headers,
-                   auth=auth)
+  comment_response = await jira_client.post(comment_url, json_body=payload)
   if comment_response.status_code == 201:
     logging.info('Comment added to JIRA ticket successfully.')
   else:
@@ -119,12 +113,12 @@ async def get_last_jira_comment(issue_key: str):
   Returns:
     dict: The last comment on the JIRA issue.
   """
-  jira_server_url, auth, headers = JiraInstanceManager.get_auth_instance()
+  jira_client = await JiraInstanceManager.get_async_client()
 
-  comment_url = f'{jira_server_url}/rest/api/3/issue/{issue_key}/comment'
+  comment_url = f'/rest/api/3/issue/{issue_key}/comment'
   logging.info(f"Fetching comments from: {comment_url}")
 
-  response = requests.get(comment_url, headers=headers, auth=auth)
+  response = await jira_client.get(comment_url)
   if response.status_code == 200:
     comments = response.json().get('comments', [])
     if comments:
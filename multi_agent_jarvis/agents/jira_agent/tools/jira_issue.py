@@ -1,10 +1,6 @@
 # Copyright 2025 CNOE
 # SPDX-License-Identifier: Apache-2.0
 
-import os
-import requests
-import json
-from requests.auth import HTTPBasicAuth
 from multi_agent_jarvis.setup_logging import logging
 from langchain_core.tools import tool
 
@@ -32,7 +28,7 @@ async def create_jira_issue(
   """
   logging.info(f"Creating a new Jira issue in project: {project_key}")
   try:
-    jira_api = JiraInstanceManager.get_jira_instance()
+    jira_client = await JiraInstanceManager.get_async_client()
     reporter_id = await _get_account_id_from_email(reporter_email)
     issue_dict = {
       "project": {"key": project_key},
@@ -41,8 +37,10 @@ async def create_jira_issue(
       "issuetype": {"name": issue_type},
       "reporter": {"id": reporter_id},
     }
-    new_issue = jira_api.create_issue(fields=issue_dict)
-    urlify_jira_issue_id = await _urlify_jira_issue_id(new_issue.key)
+    response = await jira_client.post("/rest/api/2/issue", json_body={"fields": issue_dict})
+    if response.status_code != 201:
+      raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
+    urlify_jira_issue_id = await _urlify_jira_issue_id(response.json()["key"])
     logging.info(f"Created new Jira issue: {urlify_jira_issue_id}")
     return urlify_jira_issue_id
   except Exception as e:
@@ -66,20 +64,16 @@ async def assign_jira(issue_key: str, assignee_email: str) -> str:
     Exception: If the JIRA API request fails or encounters an error.  The exception will contain details about the failure, including the HTTP status code and response text (if available).
   """
 
-  jira_server_url = os.getenv("JIRA_SERVER")
-  user_email = os.getenv("JARVIS_JIRA_USER_EMAIL")
-  access_token = os.getenv("JARVIS_JIRA_ACCESS_TOKEN")
-  auth = HTTPBasicAuth(user_email, access_token)
-  headers = {"Accept": "application/json", "Content-Type": "application/json"}
   #####################################
   ### Assign the ticket to the user ###
   #####################################
   try:
-    assignee_url = f"{jira_server_url}/rest/api/3/issue/{issue_key}/assignee"
+    jira_client = await JiraInstanceManager.get_async_client()
+    assignee_url = f"/rest/api/3/issue/{issue_key}/assignee"
 
-    payload = json.dumps({"accountId": await _get_account_id_from_email(assignee_email)})
+    payload = {"accountId": await _get_account_id_from_email(assignee_email)}
 
-    response = requests.put(assignee_url, headers=headers, data=payload, auth=auth)
+    response = await jira_client.put(assignee_url, json_body=payload)
 
     if response.status_code == 204:
       urlify_jira_issue_id = await _urlify_jira_issue_id(issue_key)
@@ -109,10 +103,11 @@ async def update_issue_reporter(issue_key: str, reporter_email: str) -> str:
   """
   logging.info(f"Updating reporter of ticket: {issue_key}")
   try:
-    jira_api = JiraInstanceManager.get_jira_instance()
+    jira_client = await JiraInstanceManager.get_async_client()
     reporter_id = await _get_account_id_from_email(reporter_email)
-    issue = jira_api.issue(issue_key)
-    issue.update(reporter={"id": reporter_id})
+    response = await jira_client.put(f"/rest/api/2/issue/{issue_key}", json_body={"fields": {"reporter": {"id": reporter_id}}})
+    if response.status_code != 204:
+      raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
     logging.info("Reporter updated successfully.")
     urlify_jira_issue_id = await _urlify_jira_issue_id(issue_key)
     return f"Reporter updated successfully on Jira {urlify_jira_issue_id}."
@@ -134,10 +129,11 @@ async def _add_new_label_to_issue(issue_key: str, label: str) -> str:
   """
   logging.info(f"Adding label '{label}' to ticket: {issue_key}")
   try:
-    jira_api = JiraInstanceManager.get_jira_instance()
-    issue = jira_api.issue(issue_key)
-    issue.fields.labels.append(label)
-    issue.update(fields={"labels": issue.fields.labels})
+    jira_client = await JiraInstanceManager.get_async_client()
+    # The "add" verb appends server-side, so the issue does not have to be fetched first
+    response = await jira_client.put(f"/rest/api/2/issue/{issue_key}", json_body={"update": {"labels": [{"add": label}]}})
+    if response.status_code != 204:
+      raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
     logging.info("Label added successfully.")
     urlify_jira_issue_id = await _urlify_jira_issue_id(issue_key)
     return f"Label added successfully on Jira {urlify_jira_issue_id}."
@@ -174,19 +170,23 @@ async def get_jira_issue_details(issue_key: str) -> dict:
   """
   logging.info(f"Retrieving details for ticket: {issue_key}")
   try:
-    jira_api = JiraInstanceManager.get_jira_instance()
-    issue = jira_api.issue(issue_key)
-    urlify_jira_issue_id = await _urlify_jira_issue_id(issue.key)
+    jira_client = await JiraInstanceManager.get_async_client()
+    response = await jira_client.get(f"/rest/api/2/issue/{issue_key}")
+    if response.status_code != 200:
+      raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
+    issue = response.json()
+    fields = issue["fields"]
+    urlify_jira_issue_id = await _urlify_jira_issue_id(issue["key"])
     ticket_details = {
       "key": urlify_jira_issue_id,
-      "summary": issue.fields.summary,
-      "description": issue.fields.description,
-      "status": issue.fields.status.name,
-      "priority": issue.fields.priority.name,
-      "reporter": issue.fields.reporter.displayName,
-      "assignee": issue.fields.assignee.displayName if issue.fields.assignee else None,
-      "created": issue.fields.created,
-      "updated": issue.fields.updated,
+      "summary": fields.get("summary"),
+      "description": fields.get("description"),
+      "status": fields["status"]["name"],
+      "priority": fields["priority"]["name"],
+      "reporter": fields["reporter"]["displayName"],
+      "assignee": fields["assignee"]["displayName"] if fields.get("assignee") else None,
+      "created": fields.get("created"),
+      "updated": fields.get("updated"),
     }
     logging.info(f"Ticket details: {ticket_details}")
     return ticket_details
@@ -11,6 +11,26 @@ from multi_agent_jarvis.dryrun_utils import dryrun_response
 from multi_agent_jarvis.agents.jira_agent.tools.dryrun.mock_responses import JIRA_RETRIEVE_MULTIPLE_ISSUES_MOCK_RESPONSE
 
 
+async def _search_issues(jql_query: str, max_results: int = 50) -> List[dict]:
+  """
+  Run a JQL search and return the matching issues with their summaries.
+
+  Args:
+    jql_query (str): The JQL query string.
+    max_results (int, optional): The maximum number of issues to return.
+
+  Returns:
+    List[dict]: The issues as returned by the Jira search API.
+  """
+  jira_client = await JiraInstanceManager.get_async_client()
+  response = await jira_client.get(
+    "/rest/api/2/search", params={"jql": jql_query, "maxResults": max_results, "fields": "summary"}
+  )
+  if response.status_code != 200:
+    raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
+  return response.json().get("issues", [])
+
+
 @dryrun_response(JIRA_RETRIEVE_MULTIPLE_ISSUES_MOCK_RESPONSE)
 async def _retrieve_multiple_jira_issues(user_email: str, project: str, num_jira_issues_to_retrieve: int) -> List:
   """
@@ -31,12 +51,11 @@ async def _retrieve_multiple_jira_issues(user_email: str, project: str, num_jira
     return "Invalid email address."
 
   try:
-    jira_api = JiraInstanceManager.get_jira_instance()
     account_id = await _get_account_id_from_email(user_email)
     logging.info(f"Account ID for user {user_email}: {account_id}")
-    issues = jira_api.search_issues(
+    issues = await _search_issues(
       f"project={project} AND (reporter='{account_id}' OR assignee='{account_id}') ORDER BY created DESC",
-      maxResults=num_jira_issues_to_retrieve,
+      max_results=num_jira_issues_to_retrieve,
     )
     issues_md_list = await _create_jira_urlified_list(issues)
     logging.info(f"Issues found: {issues_md_list}")
@@ -78,8 +97,7 @@ async def _search_jira_using_jql(jql_query: str, user_email: str) -> str:
   """
   logging.info(f"Searching tickets with JQL: {jql_query} for user: {user_email}")
   try:
-    jira_api = JiraInstanceManager.get_jira_instance()
-    issues = jira_api.search_issues(jql_query)
+    issues = await _search_issues(jql_query)
     logging.info(f"Issues found: {issues}")
     if not issues:
       return "Seems like there are no tickets to display with your query."
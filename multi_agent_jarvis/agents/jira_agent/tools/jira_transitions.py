@@ -1,12 +1,104 @@
 # Copyright 2025 CNOE
 # SPDX-License-Identifier: Apache-2.0
 
-import requests
+import os
 import json
+import time
+from collections import OrderedDict
+from typing import Optional
+from prometheus_client import Counter
 from multi_agent_jarvis.setup_logging import logging
 from langchain_core.tools import tool
 from multi_agent_jarvis.agents.jira_agent.tools._jira_instance import JiraInstanceManager
 
+JIRA_TRANSITION_CACHE = Counter(
+  "jarvis_jira_transition_cache_total", "Jira transition metadata cache lookups and invalidations", ["result"]
+)
+
+
+class TransitionMetadataCache:
+  """
+  Expanded transitions of JIRA issues, keyed by (project, issue type, status).
+
+  Issues of one project and type in one status follow the same workflow step, so they offer the same
+  transitions. A transition that fails with cached metadata invalidates the entry, since workflow conditions
+  can still make an issue differ from its peers, or the workflow may have changed.
+
+  Attributes:
+    ttl (float): Seconds an entry stays cached.
+    max_entries (int): Maximum number of cached entries; the least recently used are evicted first.
+  """
+
+  _instance = None
+
+  def __init__(self, ttl: float = 3600, max_entries: int = 1000):
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self._entries: OrderedDict[tuple, tuple[float, list]] = OrderedDict()
+
+  @classmethod
+  def get_instance(cls) -> "TransitionMetadataCache":
+    if cls._instance is None:
+      cls._instance = cls(
+        ttl=float(os.getenv("JARVIS_JIRA_TRANSITION_CACHE_TTL", "3600")),
+        max_entries=int(os.getenv("JARVIS_JIRA_TRANSITION_CACHE_SIZE", "1000")),
+      )
+    return cls._instance
+
+  def get(self, key: tuple) -> Optional[list]:
+    entry = self._entries.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+      self._entries.pop(key, None)
+      JIRA_TRANSITION_CACHE.labels(result="miss").inc()
+      return None
+    self._entries.move_to_end(key)
+    JIRA_TRANSITION_CACHE.labels(result="hit").inc()
+    return entry[1]
+
+  def put(self, key: tuple, transitions: list):
+    self._entries[key] = (time.monotonic() + self.ttl, transitions)
+    self._entries.move_to_end(key)
+    while len(self._entries) > self.max_entries:
+      self._entries.popitem(last=False)
+
+  def invalidate(self, key: tuple):
+    if self._entries.pop(key, None) is not None:
+      JIRA_TRANSITION_CACHE.labels(result="invalidated").inc()
+
+
+def _normalize_transition_name(name: str) -> str:
+  # "In-Progress", "In Progress" and "in_progress" all name the same transition
+  return "".join(c for c in name.lower() if c not in " -_")
+
+
+def _find_transition(transitions: list, transition_name: str) -> Optional[dict]:
+  for transition in transitions:
+    if _normalize_transition_name(transition["name"]) == _normalize_transition_name(transition_name):
+      return transition
+  return None
+
+
+def _required_fields(transition: dict) -> list:
+  fields = transition.get("fields", {})
+  return [field_name for field_name, field_data in fields.items() if field_data.get("required")]
+
+
+async def _get_expanded_transitions(issue_key: str) -> list:
+  """
+  Retrieves the available transitions of a JIRA issue along with their fields.
+
+  Raises:
+    Exception: If the JIRA API request fails.
+  """
+  jira_client = await JiraInstanceManager.get_async_client()
+  transition_url = f"/rest/api/3/issue/{issue_key}/transitions"
+  transition_response = await jira_client.get(transition_url, params={"expand": "transitions.fields"})
+  if transition_response.status_code != 200:
+    raise Exception(
+      f"Failed to retrieve transitions for JIRA ticket {issue_key}. Status code: {transition_response.status_code}, Response: {transition_response.text}"
+    )
+  return transition_response.json().get("transitions", [])
+
 
 async def _get_required_fields_for_transition(issue_key: str, transition_name: str) -> list:
   """
@@ -20,32 +112,14 @@ async def _get_required_fields_for_transition(issue_key: str, transition_name: s
     list: A list of required fields for the transition.
           Returns None if an error occurs or if the transition is not found.
   """
-  jira_server_url, auth, headers = JiraInstanceManager.get_auth_instance()
-
   try:
-    transition_url = f"{jira_server_url}/rest/api/3/issue/{issue_key}/transitions?expand=transitions.fields"
-    transition_response = requests.get(transition_url, headers=headers, auth=auth)
-
-    if transition_response.status_code == 200:
-      transitions_data = transition_response.json()
-      transitions = transitions_data.get("transitions", [])
-
-      for transition in transitions:
-        if transition["name"].lower().replace("-", "") == transition_name.lower().replace("-", ""):
-          fields = transition.get("fields", {})
-          required_fields = [field_name for field_name, field_data in fields.items() if field_data.get("required")]
-          logging.info(
-            f"Required fields for transition {transition_name} on JIRA ticket {issue_key}: {required_fields}"
-          )
-          return required_fields
-
+    transition = _find_transition(await _get_expanded_transitions(issue_key), transition_name)
+    if transition is None:
       logging.warning(f"Transition '{transition_name}' not found for JIRA ticket {issue_key}.")
       return None
-    else:
-      logging.error(
-        f"Failed to retrieve transitions for JIRA ticket {issue_key}. Status code: {transition_response.status_code}, Response: {transition_response.text}"
-      )
-      return None
+    required_fields = _required_fields(transition)
+    logging.info(f"Required fields for transition {transition_name} on JIRA ticket {issue_key}: {required_fields}")
+    return required_fields
   except Exception as e:
     logging.error(f"Failed to retrieve transitions for JIRA ticket {issue_key}. Error: {e}")
     return None
@@ -63,11 +137,10 @@ async def _get_jira_transitions(issue_key: str) -> list:
           and contains the 'id' and 'name' of the transition.
           Returns None if an error occurs or if no transitions are found.
   """
-  jira_server_url, auth, headers = JiraInstanceManager.get_auth_instance()
-
   try:
-    transition_url = f"{jira_server_url}/rest/api/3/issue/{issue_key}/transitions"
-    transition_response = requests.get(transition_url, headers=headers, auth=auth)
+    jira_client = await JiraInstanceManager.get_async_client()
+    transition_url = f"/rest/api/3/issue/{issue_key}/transitions"
+    transition_response = await jira_client.get(transition_url)
 
     if transition_response.status_code == 200:
       transitions_data = transition_response.json()
@@ -101,15 +174,21 @@ async def get_jira_transitions(issue_key: str) -> list:
   return await _get_jira_transitions(issue_key)
 
 
-@tool
-async def perform_jira_transition(issue_key: str, resolution_id: str, transition_name: str):
+async def _perform_jira_transition(
+  issue_key: str, transition_name: str, resolution_id: str = None, workflow_step: tuple = None
+) -> str:
   """
   Transitions a JIRA ticket to a specified state.
 
+  The issue's transitions and their fields are fetched in one request. When the issue's workflow step is known,
+  they come from the TransitionMetadataCache instead, and are fetched again if the transition then fails.
+
   Args:
     issue_key (str): The key of the JIRA issue to transition.
     transition_name (str): The name of the transition to perform.
     resolution_id (str, optional): The ID of the resolution to set when transitioning to a resolved state. Defaults to None.
+    workflow_step (tuple, optional): The issue's (project key, issue type name, status name), e.g. from a webhook
+      payload. Defaults to None, which skips the cache.
 
   Returns:
     str: A message indicating the result of the transition.
@@ -120,53 +199,79 @@ async def perform_jira_transition(issue_key: str, resolution_id: str, transition
   logging.info(
     f"Attempting to transition JIRA ticket {issue_key} to state {transition_name} with resolution ID {resolution_id}."
   )
-  jira_server_url, auth, headers = JiraInstanceManager.get_auth_instance()
-
+  cache = TransitionMetadataCache.get_instance()
+  cached_transitions = cache.get(workflow_step) if workflow_step else None
   try:
-    transition_url = f"{jira_server_url}/rest/api/3/issue/{issue_key}/transitions"
-    available_transitions = await _get_jira_transitions(issue_key)
-    if not available_transitions:
-      raise Exception(f"No transitions found for JIRA ticket {issue_key}.")
-
-    transition_id = None
-    for transition in available_transitions:
-      if transition["name"].lower().replace("-", "") == transition_name.lower().replace("-", ""):
-        transition_id = transition["id"]
-        break
-
-    if not transition_id:
-      raise Exception(f"Transition '{transition_name}' not found for JIRA ticket {issue_key}.")
-
-    payload = {"transition": {"id": str(transition_id)}}
-
-    required_fields = await _get_required_fields_for_transition(issue_key, transition_name)
-    fields = {}
-    logging.info(
-      f"Required fields for transition {transition_name} on JIRA ticket {issue_key}: {json.dumps(required_fields, indent=2)}"
-    )
-    if required_fields:
-      for field_name in required_fields:
-        field_value = None
-        if field_name == "resolution":
-          field_value = {"id": str(resolution_id)}
-          if resolution_id:
-            fields["resolution"] = field_value
-
-    if fields:
-      payload["fields"] = fields
-
-    payload = json.dumps(payload)
-
-    transition_response = requests.post(transition_url, data=payload, headers=headers, auth=auth)
-
-    if transition_response.status_code == 204:
-      logging.info(f"JIRA ticket {issue_key} transitioned to state {transition_name} successfully.")
-      return f"JIRA ticket transitioned to {transition_name} successfully."
-    else:
+    jira_client = await JiraInstanceManager.get_async_client()
+    transition_url = f"/rest/api/3/issue/{issue_key}/transitions"
+    for available_transitions in (cached_transitions, None):
+      from_cache = available_transitions is not None
+      if not from_cache:
+        available_transitions = await _get_expanded_transitions(issue_key)
+        if workflow_step:
+          cache.put(workflow_step, available_transitions)
+      if not available_transitions and not from_cache:
+        raise Exception(f"No transitions found for JIRA ticket {issue_key}.")
+
+      transition = _find_transition(available_transitions, transition_name)
+      if transition is None:
+        if from_cache:
+          cache.invalidate(workflow_step)
+          continue
+        raise Exception(f"Transition '{transition_name}' not found for JIRA ticket {issue_key}.")
+
+      payload = {"transition": {"id": str(transition["id"])}}
+
+      required_fields = _required_fields(transition)
+      fields = {}
+      logging.info(
+        f"Required fields for transition {transition_name} on JIRA ticket {issue_key}: {json.dumps(required_fields, indent=2)}"
+      )
+      if required_fields:
+        for field_name in required_fields:
+          field_value = None
+          if field_name == "resolution":
+            field_value = {"id": str(resolution_id)}
+            if resolution_id:
+              fields["resolution"] = field_value
+
+      if fields:
+        payload["fields"] = fields
+
+      transition_response = await jira_client.post(transition_url, json_body=payload)
+
+      if transition_response.status_code == 204:
+        logging.info(f"JIRA ticket {issue_key} transitioned to state {transition_name} successfully.")
+        return f"JIRA ticket transitioned to {transition_name} successfully."
       logging.error(
         f"Failed to transition JIRA ticket {issue_key} to state {transition_name}. Status code: {transition_response.status_code}, Response: {transition_response.text}"
       )
+      # The metadata may be stale or not apply to this issue; after a cache hit, a second attempt is made with
+      # the issue's own transitions
+      if workflow_step:
+        cache.invalidate(workflow_step)
+      if not from_cache:
+        break
   except Exception as e:
     logging.error(f"Failed to transition JIRA ticket {issue_key} to state {transition_name}. Error: {e}")
     raise e
   return f"Failed to transition JIRA ticket to {transition_name}."
+
+
+@tool
+async def perform_jira_transition(issue_key: str, resolution_id: str, transition_name: str):
+  """
+  Transitions a JIRA ticket to a specified state.
+
+  Args:
+    issue_key (str): The key of the JIRA issue to transition.
+    transition_name (str): The name of the transition to perform.
+    resolution_id (str, optional): The ID of the resolution to set when transitioning to a resolved state. Defaults to None.
+
+  Returns:
+    str: A message indicating the result of the transition.
+
+  Raises:
+    Exception: If the JIRA API request fails or encounters an error. The exception will contain details about the failure, including the HTTP status code and response text (if available).
+  """
+  return await _perform_jira_transition(issue_key, transition_name, resolution_id)
@@ -1,40 +1,45 @@
 # Copyright 2025 CNOE
 # SPDX-License-Identifier: Apache-2.0
 
-import os
-import requests
-from requests.auth import HTTPBasicAuth
 from multi_agent_jarvis.setup_logging import logging
 from multi_agent_jarvis.agents.jira_agent.tools._jira_instance import JiraInstanceManager
+from multi_agent_jarvis.agents.jira_agent.tools.jira_user_directory import JiraUserDirectory
 from langchain_core.tools import tool
 from multi_agent_jarvis.dryrun_utils import dryrun_response
 from multi_agent_jarvis.agents.jira_agent.tools.dryrun.mock_responses import JIRA_GET_ACCOUNT_ID_FROM_EMAIL_MOCK_RESPONSE
 
 
-async def _get_jira_assignee(issue_key: str) -> str:
+async def _get_jira_assignee(issue_key: str, assignee_account_id: str = None) -> str:
   """Retrieves the assignee's display name from a Jira issue.
   Args:
     issue_key (str): The key of the Jira issue to retrieve the assignee from.
+    assignee_account_id (str, optional): The assignee's account ID when already known, e.g. from a webhook
+      payload, in which case the user directory resolves it without fetching the issue.
   Returns:
     str: The display name of the assignee, or None if the issue does not exist,
        the assignee is not set, or if there was an error retrieving the issue details.
   """
-  jira_server_url = os.getenv("JIRA_SERVER")
-  logging.debug(f"JIRA_SERVER: {jira_server_url}")
-  user_email = os.getenv("JARVIS_JIRA_USER_EMAIL")
-  logging.debug(f"JARVIS_JIRA_USER_EMAIL: {user_email}")
-  access_token = os.getenv("JARVIS_JIRA_ACCESS_TOKEN")
-  auth = HTTPBasicAuth(user_email, access_token)
-  headers = {"Accept": "application/json", "Content-Type": "application/json"}
-  issue_url = f"{jira_server_url}/rest/api/3/issue/{issue_key}"
+  if assignee_account_id:
+    try:
+      assignee = await JiraUserDirectory.get_instance().by_account_id(assignee_account_id)
+    except Exception as e:
+      logging.error(f"Failed to retrieve user details. {e}")
+      assignee = None
+    if assignee is not None and assignee.display_name:
+      logging.info(f"assignee: {assignee.display_name}")
+      return assignee.display_name
+  jira_client = await JiraInstanceManager.get_async_client()
+  issue_url = f"/rest/api/3/issue/{issue_key}"
   logging.info(f"issue_url: {issue_url}")
-  issue_response = requests.get(issue_url, headers=headers, auth=auth)
+  # Only the assignee is needed, not the whole issue
+  issue_response = await jira_client.get(issue_url, params={"fields": "assignee"})
   if issue_response.status_code == 200:
     issue_data = issue_response.json()
     assignee_field = issue_data.get("fields", {}).get("assignee")
     if assignee_field is None:
       logging.info("Assignee is None")
       return None
+    JiraUserDirectory.get_instance().remember(assignee_field)
     assignee = assignee_field.get("displayName")
     logging.info(f"assignee: {assignee}")
     return assignee
@@ -58,27 +63,23 @@ async def get_jira_assignee(issue_key: str) -> str:
   return await _get_jira_assignee(issue_key)
 
 
-@tool
-async def get_jira_reporter_displayname(issue_key: str) -> str:
+async def _get_jira_reporter(issue_key: str) -> dict:
   """
-  Retrieves the display name of the reporter of a JIRA issue.
+  Retrieves the reporter of a JIRA issue, and adds them to the user directory.
 
   Args:
     issue_key (str): JIRA Issue ID.
 
   Returns:
-    str: The display name of the reporter, or None if not found.
+    dict: The reporter's Jira user object, or None if not found or an error occurs.
   """
-  jira_server_url = os.getenv("JIRA_SERVER")
-  user_email = os.getenv("JARVIS_JIRA_USER_EMAIL")
-  access_token = os.getenv("JARVIS_JIRA_ACCESS_TOKEN")
-  auth = HTTPBasicAuth(user_email, access_token)
-  headers = {"Accept": "application/json", "Content-Type": "application/json"}
-  issue_url = f"{jira_server_url}/rest/api/3/issue/{issue_key}"
-  issue_response = requests.get(issue_url, headers=headers, auth=auth)
+  jira_client = await JiraInstanceManager.get_async_client()
+  issue_response = await jira_client.get(f"/rest/api/3/issue/{issue_key}", params={"fields": "reporter"})
   if issue_response.status_code == 200:
     issue_data = issue_response.json()
-    reporter = issue_data.get("fields", {}).get("reporter", {}).get("displayName")
+    reporter = issue_data.get("fields", {}).get("reporter")
+    if reporter:
+      JiraUserDirectory.get_instance().remember(reporter)
     return reporter
   else:
     logging.error(
@@ -87,6 +88,21 @@ async def get_jira_reporter_displayname(issue_key: str) -> str:
     return None
 
 
+@tool
+async def get_jira_reporter_displayname(issue_key: str) -> str:
+  """
+  Retrieves the display name of the reporter of a JIRA issue.
+
+  Args:
+    issue_key (str): JIRA Issue ID.
+
+  Returns:
+    str: The display name of the reporter, or None if not found.
+  """
+  reporter = await _get_jira_reporter(issue_key)
+  return reporter.get("displayName") if reporter is not None else None
+
+
 async def get_jira_reporter_account_id(issue_key: str) -> str:
   """
   Retrieves the account ID of the reporter of a JIRA issue.
@@ -97,19 +113,8 @@ async def get_jira_reporter_account_id(issue_key: str) -> str:
   Returns:
     str: The account ID of the reporter, or None if not found or an error occurs.
   """
-  jira_server_url, auth, headers = JiraInstanceManager.get_auth_instance()
-
-  issue_url = f"{jira_server_url}/rest/api/3/issue/{issue_key}"
-  issue_response = requests.get(issue_url, headers=headers, auth=auth)
-  if issue_response.status_code == 200:
-    issue_data = issue_response.json()
-    reporter_account_id = issue_data.get("fields", {}).get("reporter", {}).get("accountId")
-    return reporter_account_id
-  else:
-    logging.error(
-      f"Failed to retrieve issue details. Status code: {issue_response.status_code}, Response: {issue_response.text}"
-    )
-    return None
+  reporter = await _get_jira_reporter(issue_key)
+  return reporter.get("accountId") if reporter is not None else None
 
 
 @dryrun_response(JIRA_GET_ACCOUNT_ID_FROM_EMAIL_MOCK_RESPONSE)
@@ -126,29 +131,12 @@ async def _get_account_id_from_email(email: str) -> str:
   Raises:
     Exception: If the JIRA API request fails or encounters an error. The exception will contain details about the failure, including the HTTP status code and response text (if available).
   """
-  jira_server_url, auth, headers = JiraInstanceManager.get_auth_instance()
-
   try:
-    search_url = f"{jira_server_url}/rest/api/3/user/search"
-
-    query = {"query": email}
-
-    user_search_response = requests.get(search_url, headers=headers, params=query, auth=auth)
-
-    if user_search_response.status_code == 200:
-      users_data = user_search_response.json()
-      if users_data:
-        account_id = users_data[0].get("accountId")
-        logging.info(f"Account ID found for email {email}: {account_id}")
-        return account_id
-      else:
-        logging.warning(f"No users found with email {email}.")
-        return None
-    else:
-      logging.error(
-        f"Failed to retrieve user details for email {email}. Status code: {user_search_response.status_code}, Response: {user_search_response.text}"
-      )
+    user = await JiraUserDirectory.get_instance().by_email(email)
+    if user is None:
       return None
+    logging.info(f"Account ID found for email {email}: {user.account_id}")
+    return user.account_id
   except Exception as e:
     logging.error(f"Failed to get account ID for email {email}. Error: {e}")
     return None
@@ -171,39 +159,32 @@ async def get_account_id_from_email(email: str) -> str:
   return await _get_account_id_from_email(email)
 
 
-async def _get_jira_reporter_email(issue_key: str) -> str:
+async def _get_jira_reporter_email(issue_key: str, reporter_account_id: str = None) -> str:
   """
   Retrieves the email address of the reporter of a JIRA issue.
 
   Args:
     issue_key (str): JIRA Issue ID.
+    reporter_account_id (str, optional): The reporter's account ID when already known, e.g. from a webhook
+      payload, which saves fetching the issue.
 
   Returns:
     str: The email address of the reporter, or None if not found or an error occurs.
   """
-  reporter_account_id = await get_jira_reporter_account_id(issue_key)
+  reporter_account_id = reporter_account_id or await get_jira_reporter_account_id(issue_key)
   if not reporter_account_id:
     logging.error("Reporter account ID not found.")
     return None
 
-  jira_server_url = os.getenv("JIRA_SERVER")
-  user_email = os.getenv("JARVIS_JIRA_USER_EMAIL")
-  access_token = os.getenv("JARVIS_JIRA_ACCESS_TOKEN")
-  auth = HTTPBasicAuth(user_email, access_token)
-  headers = {"Accept": "application/json", "Content-Type": "application/json"}
-  user_url = f"{jira_server_url}/rest/api/2/user?accountId={reporter_account_id}"
-  user_response = requests.get(user_url, headers=headers, auth=auth)
-  if user_response.status_code == 200:
-    user_data = user_response.json()
-    reporter_email = user_data.get("emailAddress")
-    if reporter_email and "|" in reporter_email:
-      reporter_email = reporter_email.split("|")[0].strip("[]")
-    return reporter_email
-  else:
-    logging.error(
-      f"Failed to retrieve user details. Status code: {user_response.status_code}, Response: {user_response.text}"
-    )
+  try:
+    reporter = await JiraUserDirectory.get_instance().by_account_id(reporter_account_id, with_email=True)
+  except Exception as e:
+    logging.error(f"Failed to retrieve user details. {e}")
     return None
+  reporter_email = reporter.email if reporter is not None else None
+  if reporter_email and "|" in reporter_email:
+    reporter_email = reporter_email.split("|")[0].strip("[]")
+  return reporter_email
 
 
 @tool
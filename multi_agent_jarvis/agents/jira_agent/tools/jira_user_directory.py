@@ -0,0 +1,235 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from prometheus_client import Counter, Gauge
+
+from multi_agent_jarvis.setup_logging import logging
+from multi_agent_jarvis.agents.jira_agent.tools._jira_instance import JiraInstanceManager
+
+JIRA_USER_LOOKUPS = Counter(
+  "jarvis_jira_user_directory_lookups_total", "Jira user directory lookups by key and result", ["key", "result"]
+)
+JIRA_USER_ENTRIES = Gauge("jarvis_jira_user_directory_entries", "Jira users held in the user directory")
+
+
+class _LookupAbandoned(Exception):
+  """Set on a shared lookup whose owning task was cancelled, so the tasks waiting on it make their own."""
+
+
+class JiraUser:
+  """
+  A Jira user known to the directory.
+
+  Attributes:
+    account_id (str): The user's account ID.
+    display_name (str): The user's display name.
+    email (str, optional): The user's email address, None when unknown or hidden by the user's privacy settings.
+    complete (bool): Whether the entry comes from the user API, so a missing email is really hidden and not just
+      absent from a webhook payload.
+    expires_at (float): Monotonic time after which the entry is refetched.
+  """
+
+  def __init__(self, account_id: str, display_name: str, email: Optional[str], complete: bool, expires_at: float):
+    self.account_id = account_id
+    self.display_name = display_name
+    self.email = email
+    self.complete = complete
+    self.expires_at = expires_at
+
+
+class JiraUserDirectory:
+  """
+  Cache of Jira users keyed by account ID, with a secondary index by email.
+
+  Lookups that find nobody are cached for `negative_ttl`, so unknown emails don't hit the user search on every
+  call, and concurrent lookups of the same key share one request. Users embedded in webhook payloads can be
+  added with `warm`; those entries carry no email, which Jira leaves out of webhooks.
+
+  Attributes:
+    ttl (float): Seconds a user stays cached.
+    negative_ttl (float): Seconds a lookup that found nobody is remembered.
+    max_entries (int): Maximum number of cached users; the least recently used are evicted first.
+  """
+
+  _instance = None
+
+  def __init__(self, ttl: float = 3600, negative_ttl: float = 300, max_entries: int = 10000):
+    self.ttl = ttl
+    self.negative_ttl = negative_ttl
+    self.max_entries = max_entries
+    self._users: OrderedDict[str, JiraUser] = OrderedDict()
+    self._emails: dict[str, str] = {}
+    self._not_found: dict[tuple, float] = {}
+    self._inflight: dict[tuple, asyncio.Future] = {}
+
+  @classmethod
+  def get_instance(cls) -> "JiraUserDirectory":
+    if cls._instance is None:
+      cls._instance = cls(
+        ttl=float(os.getenv("JARVIS_JIRA_USER_CACHE_TTL", "3600")),
+        negative_ttl=float(os.getenv("JARVIS_JIRA_USER_CACHE_NEGATIVE_TTL", "300")),
+        max_entries=int(os.getenv("JARVIS_JIRA_USER_CACHE_SIZE", "10000")),
+      )
+    return cls._instance
+
+  @staticmethod
+  def _normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+  def remember(self, user: dict, email: Optional[str] = None, complete: bool = False) -> Optional[JiraUser]:
+    """
+    Adds a user from a Jira API user object, without overwriting what a complete entry knows.
+
+    Args:
+      user (dict): A Jira user object, with at least `accountId`.
+      email (str, optional): The email the user was looked up by, when the object doesn't carry it.
+      complete (bool): Whether the object comes from the user API.
+    """
+    account_id = user.get("accountId")
+    if not account_id:
+      return None
+    email = user.get("emailAddress") or email
+    display_name = user.get("displayName")
+    current = self._users.get(account_id)
+    now = time.monotonic()
+    if current is not None and current.expires_at > now:
+      email = email or current.email
+      display_name = display_name or current.display_name
+      complete = complete or current.complete
+      if current.email and current.email != email:
+        self._emails.pop(self._normalize_email(current.email), None)
+    entry = JiraUser(account_id, display_name, email, complete, now + self.ttl)
+    self._users[account_id] = entry
+    self._users.move_to_end(account_id)
+    self._not_found.pop(("account_id", account_id), None)
+    if email:
+      self._emails[self._normalize_email(email)] = account_id
+      self._not_found.pop(("email", self._normalize_email(email)), None)
+    while len(self._users) > self.max_entries:
+      _, evicted = self._users.popitem(last=False)
+      if evicted.email:
+        self._emails.pop(self._normalize_email(evicted.email), None)
+    JIRA_USER_ENTRIES.set(len(self._users))
+    return entry
+
+  def warm(self, payload):
+    """Adds every user object embedded in a webhook payload, e.g. the issue's reporter and assignee."""
+    if isinstance(payload, dict):
+      if payload.get("accountId") and payload.get("displayName"):
+        self.remember(payload)
+      for value in payload.values():
+        self.warm(value)
+    elif isinstance(payload, list):
+      for value in payload:
+        self.warm(value)
+
+  def _cached(self, account_id: Optional[str], with_email: bool) -> Optional[JiraUser]:
+    entry = self._users.get(account_id) if account_id else None
+    if entry is None:
+      return None
+    if entry.expires_at <= time.monotonic():
+      del self._users[account_id]
+      if entry.email:
+        self._emails.pop(self._normalize_email(entry.email), None)
+      JIRA_USER_ENTRIES.set(len(self._users))
+      return None
+    if with_email and not (entry.email or entry.complete):
+      return None
+    self._users.move_to_end(account_id)
+    return entry
+
+  async def _lookup(self, key: tuple, cached: Callable[[], Optional[JiraUser]], fetch: Callable[[], Awaitable]):
+    entry = cached()
+    if entry is not None:
+      JIRA_USER_LOOKUPS.labels(key=key[0], result="hit").inc()
+      return entry
+    not_found_until = self._not_found.get(key)
+    if not_found_until is not None:
+      if not_found_until > time.monotonic():
+        JIRA_USER_LOOKUPS.labels(key=key[0], result="negative_hit").inc()
+        return None
+      del self._not_found[key]
+    # Concurrent lookups of the same key share one request
+    inflight = self._inflight.get(key)
+    if inflight is not None:
+      JIRA_USER_LOOKUPS.labels(key=key[0], result="coalesced").inc()
+      try:
+        return await asyncio.shield(inflight)
+      except _LookupAbandoned:
+        # Only the task that made the request was cancelled, this one still wants the user
+        return await self._lookup(key, cached, fetch)
+    JIRA_USER_LOOKUPS.labels(key=key[0], result="miss").inc()
+    inflight = self._inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+      entry = await fetch()
+      if entry is None:
+        now = time.monotonic()
+        if len(self._not_found) >= self.max_entries:
+          self._not_found = {k: until for k, until in self._not_found.items() if until > now}
+        self._not_found[key] = now + self.negative_ttl
+      inflight.set_result(entry)
+      return entry
+    except asyncio.CancelledError:
+      # Cancelling the shared future would cancel every waiter with it, although their tasks go on
+      inflight.set_exception(_LookupAbandoned())
+      inflight.exception()
+      raise
+    except Exception as e:
+      # Errors are not cached, the next lookup tries again
+      inflight.set_exception(e)
+      # Marks the exception as retrieved when nobody else was waiting
+      inflight.exception()
+      raise
+    finally:
+      del self._inflight[key]
+
+  async def by_email(self, email: str) -> Optional[JiraUser]:
+    """
+    Finds a user by email with the user search API.
+
+    Raises:
+      Exception: If the Jira request fails.
+    """
+    normalized = self._normalize_email(email)
+
+    async def fetch():
+      jira_client = await JiraInstanceManager.get_async_client()
+      response = await jira_client.get("/rest/api/3/user/search", params={"query": email})
+      if response.status_code != 200:
+        raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
+      users = response.json()
+      if not users:
+        logging.warning(f"No users found with email {email}.")
+        return None
+      return self.remember(users[0], email=email)
+
+    return await self._lookup(("email", normalized), lambda: self._cached(self._emails.get(normalized), False), fetch)
+
+  async def by_account_id(self, account_id: str, with_email: bool = False) -> Optional[JiraUser]:
+    """
+    Finds a user by account ID with the user API.
+
+    Args:
+      account_id (str): The user's account ID.
+      with_email (bool): Whether the email is needed, in which case entries added from webhook payloads, which
+        have none, are refetched.
+
+    Raises:
+      Exception: If the Jira request fails.
+    """
+
+    async def fetch():
+      jira_client = await JiraInstanceManager.get_async_client()
+      response = await jira_client.get("/rest/api/2/user", params={"accountId": account_id})
+      if response.status_code == 404:
+        return None
+      if response.status_code != 200:
+        raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
+      return self.remember(response.json(), complete=True)
+
+    return await self._lookup(("account_id", account_id), lambda: self._cached(account_id, with_email), fetch)
@@ -2,11 +2,87 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import os
+import time
+import asyncio
+from typing import Awaitable, Callable, Optional
 from multi_agent_jarvis.setup_logging import logging
+from multi_agent_jarvis.agents.jira_agent.models.jira_issue_model import JiraPayload
+from multi_agent_jarvis.agents.jira_agent.tools.jira_comment import _add_jira_comment
+from multi_agent_jarvis.agents.jira_agent.tools.jira_issue import _add_new_label_to_issue
+from multi_agent_jarvis.agents.jira_agent.tools.jira_transitions import _perform_jira_transition
 from multi_agent_jarvis.agents.jira_agent.tools.jira_user import _get_jira_assignee
 
 JARVIS_JIRA_USER_DISPLAYNAME = os.getenv("JARVIS_JIRA_USER_DISPLAYNAME")
 
+
+class WebhookAction:
+  """
+  A fixed Jira operation run for a webhook event, called directly instead of being asked of the agent.
+
+  Attributes:
+    name (str): Name of the action, used in the logs.
+    run (Callable[[str, JiraPayload], Awaitable]): Performs the action on the issue with the given key, given the
+      event's payload when there is one.
+  """
+
+  def __init__(self, name: str, run: Callable[[str, Optional[JiraPayload]], Awaitable]):
+    self.name = name
+    self.run = run
+
+
+def _acknowledge_transition_name(issue_key: str) -> str:
+  # OPENSD tickets are acknowledged, every other project's move to In-Progress
+  return "Acknowledge" if issue_key.split("-")[0].upper() == "OPENSD" else "In-Progress"
+
+
+# Actions of each webhook event, run concurrently before the agent is asked about the issue
+WEBHOOK_ACTIONS = {
+  "issue_assigned": [
+    WebhookAction("comment", lambda issue_key, _: _add_jira_comment(issue_key, "⏳ Jarvis AI Agent is processing...")),
+    WebhookAction("label", lambda issue_key, _: _add_new_label_to_issue(issue_key, "JARVIS_AGENT_AT_WORK")),
+    WebhookAction(
+      "transition",
+      lambda issue_key, jira_payload: _perform_jira_transition(
+        issue_key,
+        _acknowledge_transition_name(issue_key),
+        workflow_step=jira_payload.get_workflow_step() if jira_payload else None,
+      ),
+    ),
+  ],
+}
+
+
+async def _run_webhook_actions(
+  issue_event_type_name: str, issue_key: str, jira_payload: Optional[JiraPayload] = None
+) -> dict:
+  """
+  Runs the actions of a webhook event concurrently. A failed action is logged and doesn't stop the others.
+
+  Args:
+    issue_event_type_name (str): The webhook event, e.g. `issue_assigned`.
+    issue_key (str): The key of the JIRA issue.
+    jira_payload (JiraPayload, optional): The event's payload, which lets the transition use cached metadata.
+
+  Returns:
+    dict: The result of each action by name, or the exception it raised.
+  """
+  actions = WEBHOOK_ACTIONS.get(issue_event_type_name, [])
+  if not actions:
+    return {}
+
+  async def run(action: WebhookAction):
+    start = time.monotonic()
+    try:
+      return await action.run(issue_key, jira_payload)
+    finally:
+      logging.info(f"[{issue_event_type_name}] {action.name} on {issue_key} took {time.monotonic() - start:.2f}s")
+
+  results = await asyncio.gather(*[run(action) for action in actions], return_exceptions=True)
+  for action, result in zip(actions, results):
+    if isinstance(result, Exception):
+      logging.error(f"[{issue_event_type_name}] {action.name} failed on {issue_key}: {result}")
+  return {action.name: result for action, result in zip(actions, results)}
+
 async def process_jira_webhook(jira_payload):
   """
   Processes a JIRA webhook payload and extracts relevant information based on the event type.
@@ -33,30 +109,7 @@ async def process_jira_webhook(jira_payload):
   issue_event_type_name = jira_payload.get_issue_event_type_name()
 
   if webhook_event == "comment_created":
-    logging.info("*" * 80)
-    logging.info(f"Processing {webhook_event} event.")
-    logging.info("*" * 80)
-    author = jira_payload.get_comment_author()
-    logging.info(f"Author: {author}")
-    issue_assignee = await _get_jira_assignee(issue_key)
-    logging.info(f"Issue Assignee: {issue_assignee}")
-    if author == JARVIS_JIRA_USER_DISPLAYNAME:
-      logging.info(f"Skipping comment: Comment made by {author}")
-      return None, None, None
-    if issue_assignee is None:
-      logging.info("Skipping Comment: Issue has no assignee.")
-      return None, None, None
-    if issue_assignee.lower() != JARVIS_JIRA_USER_DISPLAYNAME.lower():
-      logging.info(f"Skipping Comment: Issue not assigned to {JARVIS_JIRA_USER_DISPLAYNAME}")
-      return None, None, None
-    comment = jira_payload.get_comment_body()
-    logging.info(f"Comment Body: {comment}")
-    logging.info("-" * 80)
-    logging.info(f"[comment_created] Issue Key: {issue_key}, Comment Author: {author} Comment Body: {comment}")
-    logging.info("-" * 80)
-    new_comment = f"Comment by {author}: {comment}"
-    logging.info(f"New Comment: {new_comment}")
-    return issue_key, new_comment, webhook_event
+    return await process_jira_comments([jira_payload])
   elif issue_event_type_name == "issue_assigned":
     logging.info("*" * 80)
     logging.info(f"Processing {issue_event_type_name} event.")
@@ -77,3 +130,53 @@ async def process_jira_webhook(jira_payload):
     else:
       logging.info(f"Skipping issue assignment to {assigned_user_displayname}")
   return None, None, None
+
+
+async def process_jira_comments(jira_payloads: list):
+  """
+  Processes the comment_created payloads of one JIRA issue as a single question.
+
+  Comments made by JARVIS_JIRA_USER_DISPLAYNAME are dropped, and the issue's assignee is resolved once for all
+  of them, through the user directory when the payload names them.
+
+  Args:
+    jira_payloads (list): The comment_created payloads of one issue, in the order the comments were made.
+
+  Returns:
+    tuple: The issue key, a question made of every comment and the webhook event if the issue is assigned
+         to JARVIS_JIRA_USER_DISPLAYNAME. Returns (None, None, None) otherwise.
+  """
+  issue_key = jira_payloads[0].get_issue_key()
+  webhook_event = jira_payloads[0].get_webhook_event()
+  logging.info("*" * 80)
+  logging.info(f"Processing {len(jira_payloads)} {webhook_event} event(s).")
+  logging.info("*" * 80)
+  comments = []
+  for jira_payload in jira_payloads:
+    author = jira_payload.get_comment_author()
+    logging.info(f"Author: {author}")
+    if author == JARVIS_JIRA_USER_DISPLAYNAME:
+      logging.info(f"Skipping comment: Comment made by {author}")
+      continue
+    comment = jira_payload.get_comment_body()
+    logging.info(f"Comment Body: {comment}")
+    logging.info("-" * 80)
+    logging.info(f"[comment_created] Issue Key: {issue_key}, Comment Author: {author} Comment Body: {comment}")
+    logging.info("-" * 80)
+    comments.append(f"Comment by {author}: {comment}")
+  if not comments:
+    return None, None, None
+  # The latest payload carries the issue's assignee, already added to the user directory from it
+  issue = jira_payloads[-1].issue
+  assignee = issue.fields.assignee if issue else None
+  issue_assignee = await _get_jira_assignee(issue_key, assignee.accountId if assignee else None)
+  logging.info(f"Issue Assignee: {issue_assignee}")
+  if issue_assignee is None:
+    logging.info("Skipping Comment: Issue has no assignee.")
+    return None, None, None
+  if issue_assignee.lower() != JARVIS_JIRA_USER_DISPLAYNAME.lower():
+    logging.info(f"Skipping Comment: Issue not assigned to {JARVIS_JIRA_USER_DISPLAYNAME}")
+    return None, None, None
+  new_comment = "\n".join(comments)
+  logging.info(f"New Comment: {new_comment}")
+  return issue_key, new_comment, webhook_event
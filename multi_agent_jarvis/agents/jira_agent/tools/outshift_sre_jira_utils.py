@@ -58,7 +58,7 @@ async def _create_outshift_service_desk_ticket(
   account_id = await _get_account_id_from_email(user_email)
   logging.info(f"Account ID for user {user_email}: {account_id}")
   try:
-    jira_api = JiraInstanceManager.get_jira_instance()
+    jira_client = await JiraInstanceManager.get_async_client()
     issue_dict = {
       "project": {"key": project},
       "summary": summary,
@@ -69,12 +69,15 @@ async def _create_outshift_service_desk_ticket(
       "labels": [label],
       "customfield_10017": "st/getithelp",
     }
-    new_issue = jira_api.create_issue(fields=issue_dict)
-    logging.info(f"New issue created: {new_issue.key}")
-    urlify_jira_issue_id = await _urlify_jira_issue_id(new_issue.key)
+    response = await jira_client.post("/rest/api/2/issue", json_body={"fields": issue_dict})
+    if response.status_code != 201:
+      raise Exception(f"Status code: {response.status_code}, Response: {response.text}")
+    new_issue_key = response.json()["key"]
+    logging.info(f"New issue created: {new_issue_key}")
+    urlify_jira_issue_id = await _urlify_jira_issue_id(new_issue_key)
     return (
-      f"A ticket was created successfully, you can view here - [{new_issue.key} : {summary}]({urlify_jira_issue_id}).",
-      new_issue.key,
+      f"A ticket was created successfully, you can view here - [{new_issue_key} : {summary}]({urlify_jira_issue_id}).",
+      new_issue_key,
     )
   except Exception as e:
     logging.error(f"Error in ticket creation tool: {e}")
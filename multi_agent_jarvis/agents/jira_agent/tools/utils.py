@@ -21,8 +21,8 @@ async def _create_jira_urlified_list(issues) -> list:
     Create a list of Jira issues in Markdown format with clickable links.
 
     Args:
-        issues (list): A list of Jira issue objects. Each object is expected to have a 'key' attribute
-                       representing the issue key (e.g., "PROJECT-123").
+        issues (list): A list of Jira issues as returned by the search API. Each issue is expected to have a
+                       'key' (e.g., "PROJECT-123") and a 'fields' dict with the 'summary'.
 
     Returns:
         list: A list of strings, where each string is a Markdown-formatted link to a Jira issue.
@@ -30,7 +30,7 @@ async def _create_jira_urlified_list(issues) -> list:
   """
   issues_md = []
   for issue in issues:
-    issue_link = await _urlify_jira_issue_id(issue.key)
-    issue_summary = issue.fields.summary
-    issues_md.append(f"[{issue.key}: {issue_summary}]({issue_link})")
+    issue_link = await _urlify_jira_issue_id(issue["key"])
+    issue_summary = issue["fields"]["summary"]
+    issues_md.append(f"[{issue['key']}: {issue_summary}]({issue_link})")
   return issues_md
@@ -4,11 +4,12 @@
 import os
 import traceback
 from langchain_core.messages import AIMessage
-from multi_agent_jarvis.globals import SUPERVISOR_AGENT
+from multi_agent_jarvis.globals import SUPERVISOR_AGENT, PAGERDUTY_AGENT
 from multi_agent_jarvis.llm_factory import JarvisLLMFactory
 
 from multi_agent_jarvis.state import AgentState
 from multi_agent_jarvis.utils import tool_call_response
+from multi_agent_jarvis.context_window import build_prompt
 from multi_agent_jarvis.agents.pagerduty_agent.sys_msg import pagerduty_sys_msg
 from multi_agent_jarvis.models import JarvisResponse
 
@@ -22,10 +23,10 @@ async def get_llm_connection():
   return llm_factory.get_llm_connection(response_format=JarvisResponse).bind_tools(tools, strict=True)
 
 
-async def pagerduty_agent(state: AgentState):
+async def pagerduty_agent(state: AgentState, llm=None):
   try:
-    llm_pagerduty = await get_llm_connection()
-    response = await llm_pagerduty.ainvoke([pagerduty_sys_msg] + state["messages"])
+    llm_pagerduty = llm or await get_llm_connection()
+    response = await llm_pagerduty.ainvoke(build_prompt(PAGERDUTY_AGENT, pagerduty_sys_msg, state))
     structured_response = response.additional_kwargs["parsed"]
     if response.tool_calls:
       return tool_call_response(structured_response, response, tools, SUPERVISOR_AGENT)
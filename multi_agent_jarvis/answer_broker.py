@@ -0,0 +1,373 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import asyncio
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Optional
+from prometheus_client import Counter, Gauge
+
+from multi_agent_jarvis.setup_logging import logging
+
+BROKER_PUBLISHED = Counter("jarvis_answer_broker_published_total", "Answer events published", ["backend"])
+BROKER_SUBSCRIBERS = Gauge("jarvis_answer_broker_subscribers", "Streams attached to the answer broker", ["backend"])
+BROKER_RESUMES = Counter(
+  "jarvis_answer_broker_resumes_total", "Streams resumed from a Last-Event-ID by outcome", ["backend", "outcome"]
+)
+
+# Payload of the event that opens a new run of a chat; readers of the previous run stop when they reach it
+_RUN_START = {"__run_start__": True}
+
+
+class AnswerBroker(ABC):
+  """
+  Carries the answer events of each chat from the replica running the graph to the replicas serving its streams.
+
+  Each run of a chat is an ordered stream of events with increasing sequence numbers, of which the last
+  `replay_size` are kept. The empty message `{}` ends the run, and `reset` opens a new one. Any number of
+  subscribers can read a chat at once; each replays the retained events of the current run, from the start
+  or from the sequence number it last saw, then follows new ones.
+  """
+
+  backend = "base"
+
+  async def start(self):
+    """Acquires the broker's connections. Called once from the FastAPI lifespan."""
+
+  async def close(self):
+    """Releases the broker's connections."""
+
+  @abstractmethod
+  async def reset(self, chat_id: str):
+    """Opens a new run of the chat, dropping the events of the previous one."""
+
+  @abstractmethod
+  async def publish(self, chat_id: str, message: dict) -> int:
+    """Appends an event to the chat's current run and returns its sequence number."""
+
+  @abstractmethod
+  def subscribe(self, chat_id: str, after: int = 0, idle_timeout: float = None) -> AsyncIterator[tuple[int, dict]]:
+    """
+    Yields `(sequence number, message)` for the events of the chat's current run, waiting for new ones.
+
+    Args:
+      chat_id (str): The chat to read.
+      after (int): Sequence number of the last event the client received, to resume after it. Events of a
+        previous run are ignored, and the stream restarts from the oldest retained event if events after
+        `after` have already been dropped.
+      idle_timeout (float, optional): Maximum seconds to wait for the next event.
+
+    Ends after the `{}` message, when the run is replaced by a new one, or immediately if the chat has no run.
+
+    Raises:
+      asyncio.TimeoutError: If no event arrives within `idle_timeout` seconds.
+    """
+
+  @staticmethod
+  def from_env() -> "AnswerBroker":
+    """Builds the broker selected by JARVIS_ANSWER_BROKER: `memory` (default) or `postgres`."""
+    backend = os.getenv("JARVIS_ANSWER_BROKER", "memory").lower()
+    replay_size = int(os.getenv("JARVIS_ANSWER_REPLAY_EVENTS", "2000"))
+    if backend == "postgres":
+      conninfo = os.getenv("JARVIS_ANSWER_BROKER_DB_URI", os.getenv("DB_URI"))
+      return PostgresAnswerBroker(conninfo, replay_size=replay_size)
+    if backend != "memory":
+      raise ValueError(f"Unsupported answer broker: {backend}")
+    return InProcessAnswerBroker(max_chats=int(os.getenv("JARVIS_CHAT_SESSIONS_MAX", "10000")), replay_size=replay_size)
+
+
+class _ChatStream:
+  def __init__(self, first_seq: int, replay_size: int):
+    # Ring buffer of (seq, message); sequence numbers are contiguous so a seq maps to a buffer index
+    self.events = deque(maxlen=replay_size)
+    self.first_seq = first_seq
+    self.next_seq = first_seq
+    self.closed = False
+    self.changed = asyncio.Event()
+
+  def notify(self):
+    # Wake every waiting subscriber, then arm a fresh event for the next change
+    self.changed.set()
+    self.changed = asyncio.Event()
+
+
+class InProcessAnswerBroker(AnswerBroker):
+  """
+  Answer broker for a single replica, also used as the local stand-in for the networked brokers.
+
+  Attributes:
+    max_chats (int): Maximum number of chats held; the least recently reset one is dropped beyond it.
+    replay_size (int): Number of events kept per chat for late and resuming subscribers.
+  """
+
+  backend = "memory"
+
+  def __init__(self, max_chats: int = 10000, replay_size: int = 2000):
+    self.max_chats = max_chats
+    self.replay_size = replay_size
+    self._streams: OrderedDict[str, _ChatStream] = OrderedDict()
+    # Highest sequence number handed out, so a new run never reuses the numbers of a previous one
+    self._seq = 0
+
+  def _close(self, stream: _ChatStream):
+    stream.closed = True
+    stream.notify()
+
+  async def reset(self, chat_id: str):
+    previous = self._streams.pop(chat_id, None)
+    if previous is not None:
+      self._close(previous)
+    while len(self._streams) >= self.max_chats:
+      self._close(self._streams.popitem(last=False)[1])
+    self._streams[chat_id] = _ChatStream(self._seq + 1, self.replay_size)
+
+  async def publish(self, chat_id: str, message: dict) -> int:
+    stream = self._streams.get(chat_id)
+    if stream is None:
+      await self.reset(chat_id)
+      stream = self._streams[chat_id]
+    seq = stream.next_seq
+    stream.next_seq += 1
+    self._seq = max(self._seq, seq)
+    stream.events.append((seq, message))
+    if not message:
+      stream.closed = True
+    stream.notify()
+    BROKER_PUBLISHED.labels(backend=self.backend).inc()
+    return seq
+
+  async def subscribe(
+    self, chat_id: str, after: int = 0, idle_timeout: float = None
+  ) -> AsyncIterator[tuple[int, dict]]:
+    stream = self._streams.get(chat_id)
+    if stream is None:
+      return
+    if after:
+      # Ids of a previous run, or of another broker, replay the current run from its start
+      in_run = stream.first_seq <= after < stream.next_seq
+      BROKER_RESUMES.labels(backend=self.backend, outcome="resumed" if in_run else "restarted").inc()
+      if not in_run:
+        after = 0
+    cursor = max(after + 1, stream.first_seq)
+    BROKER_SUBSCRIBERS.labels(backend=self.backend).inc()
+    try:
+      while True:
+        while cursor < stream.next_seq:
+          oldest = stream.events[0][0]
+          if cursor < oldest:
+            logging.warning(f"Events {cursor}-{oldest - 1} of chat {chat_id} left the replay buffer, skipping them")
+            BROKER_RESUMES.labels(backend=self.backend, outcome="gap").inc()
+            cursor = oldest
+          yield stream.events[cursor - oldest]
+          cursor += 1
+        if stream.closed:
+          return
+        await asyncio.wait_for(stream.changed.wait(), idle_timeout)
+    finally:
+      BROKER_SUBSCRIBERS.labels(backend=self.backend).dec()
+
+
+class PostgresAnswerBroker(AnswerBroker):
+  """
+  Answer broker shared by every replica through Postgres.
+
+  Events are appended to the `jarvis_answer_events` table and announced with NOTIFY on the
+  `jarvis_answer_events` channel. Each replica keeps one LISTEN connection and wakes its local subscribers,
+  which then read the new rows. The table makes late subscribers and missed notifications harmless: the
+  subscriber always reads every row after the last one it saw, and also re-reads every `poll_interval`.
+  Sequence numbers are the table's BIGSERIAL, so they are valid resume points on every replica.
+
+  Attributes:
+    conninfo (str): Postgres connection string, DB_URI by default.
+    replay_size (int): Number of events kept per chat; older ones are trimmed as new ones are published.
+    retention_seconds (float): Events older than this are deleted when a run starts.
+    poll_interval (float): Seconds a subscriber waits for a notification before reading the table anyway.
+  """
+
+  backend = "postgres"
+  channel = "jarvis_answer_events"
+
+  def __init__(
+    self, conninfo: str, replay_size: int = 2000, retention_seconds: float = 24 * 3600, poll_interval: float = 5.0
+  ):
+    self.conninfo = conninfo
+    self.replay_size = replay_size
+    self.retention_seconds = float(os.getenv("JARVIS_ANSWER_EVENTS_RETENTION", str(retention_seconds)))
+    self.poll_interval = poll_interval
+    self._pool = None
+    self._listen_connection = None
+    self._listener = None
+    self._waiters: dict[str, set[asyncio.Event]] = {}
+    self._published: dict[str, int] = {}
+
+  async def start(self):
+    # Imported here so the in-process broker doesn't need the Postgres driver
+    from psycopg_pool import AsyncConnectionPool
+
+    self._pool = AsyncConnectionPool(conninfo=self.conninfo, max_size=5, kwargs={"autocommit": True}, open=False)
+    await self._pool.open()
+    async with self._pool.connection() as conn:
+      await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jarvis_answer_events (
+          seq BIGSERIAL PRIMARY KEY,
+          chat_id TEXT NOT NULL,
+          payload JSONB NOT NULL,
+          created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+      )
+      await conn.execute("CREATE INDEX IF NOT EXISTS jarvis_answer_events_chat ON jarvis_answer_events (chat_id, seq)")
+      await conn.execute(
+        "CREATE INDEX IF NOT EXISTS jarvis_answer_events_created ON jarvis_answer_events (created_at)"
+      )
+    self._listen_connection = await self._connect_listener()
+    self._listener = asyncio.create_task(self._listen())
+    logging.info("Postgres answer broker started")
+
+  async def _connect_listener(self):
+    """Opens a connection listening on the broker's channel."""
+    import psycopg
+
+    conn = await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True)
+    await conn.execute(f"LISTEN {self.channel}")
+    return conn
+
+  async def close(self):
+    if self._listener is not None:
+      self._listener.cancel()
+    if self._listen_connection is not None:
+      await self._listen_connection.close()
+    if self._pool is not None:
+      await self._pool.close()
+
+  async def _listen(self):
+    while True:
+      try:
+        async for notify in self._listen_connection.notifies():
+          for waiter in self._waiters.get(notify.payload, ()):
+            waiter.set()
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        # Subscribers keep polling the table while the LISTEN connection is re-established
+        logging.error(f"Answer broker LISTEN connection failed, reconnecting: {e}")
+        await asyncio.sleep(self.poll_interval)
+        try:
+          # The broken connection is closed first so it doesn't leak a server backend on every reconnect
+          await self._listen_connection.close()
+        except Exception as close_error:
+          logging.debug(f"Failed to close the broken LISTEN connection: {close_error}")
+        try:
+          self._listen_connection = await self._connect_listener()
+        except Exception as reconnect_error:
+          logging.error(f"Answer broker LISTEN reconnect failed: {reconnect_error}")
+
+  async def _insert(self, conn, chat_id: str, message: dict) -> int:
+    cursor = await conn.execute(
+      "INSERT INTO jarvis_answer_events (chat_id, payload) VALUES (%s, %s) RETURNING seq",
+      (chat_id, json.dumps(message, default=str)),
+    )
+    seq = (await cursor.fetchone())[0]
+    await conn.execute("SELECT pg_notify(%s, %s)", (self.channel, chat_id))
+    return seq
+
+  async def reset(self, chat_id: str):
+    async with self._pool.connection() as conn:
+      seq = await self._insert(conn, chat_id, _RUN_START)
+      # Readers of the previous run stop at the run start marker, so its events can go
+      await conn.execute("DELETE FROM jarvis_answer_events WHERE chat_id = %s AND seq < %s", (chat_id, seq))
+      await conn.execute(
+        "DELETE FROM jarvis_answer_events WHERE created_at < now() - make_interval(secs => %s)",
+        (self.retention_seconds,),
+      )
+
+  async def publish(self, chat_id: str, message: dict) -> int:
+    async with self._pool.connection() as conn:
+      seq = await self._insert(conn, chat_id, message)
+      # Trim the chat back to its replay size every tenth of it, keeping the run start marker
+      published = self._published.get(chat_id, 0) + 1
+      if published >= max(1, self.replay_size // 10):
+        published = 0
+        await conn.execute(
+          """
+          DELETE FROM jarvis_answer_events WHERE chat_id = %s AND payload <> %s::jsonb AND seq < (
+            SELECT seq FROM jarvis_answer_events WHERE chat_id = %s ORDER BY seq DESC OFFSET %s LIMIT 1
+          )
+          """,
+          (chat_id, json.dumps(_RUN_START), chat_id, self.replay_size),
+        )
+      if message:
+        self._published[chat_id] = published
+      else:
+        self._published.pop(chat_id, None)
+    BROKER_PUBLISHED.labels(backend=self.backend).inc()
+    return seq
+
+  async def _read(self, chat_id: str, after: int) -> list:
+    async with self._pool.connection() as conn:
+      cursor = await conn.execute(
+        "SELECT seq, payload FROM jarvis_answer_events WHERE chat_id = %s AND seq > %s ORDER BY seq",
+        (chat_id, after),
+      )
+      return await cursor.fetchall()
+
+  async def _run_bounds(self, chat_id: str) -> tuple[Optional[int], Optional[int]]:
+    """Returns the sequence numbers of the current run's start marker and of its end, if it ended."""
+    async with self._pool.connection() as conn:
+      cursor = await conn.execute(
+        """
+        SELECT max(seq) FILTER (WHERE payload = %s::jsonb), max(seq) FILTER (WHERE payload = '{}'::jsonb)
+        FROM jarvis_answer_events WHERE chat_id = %s
+        """,
+        (json.dumps(_RUN_START), chat_id),
+      )
+      return await cursor.fetchone()
+
+  async def subscribe(
+    self, chat_id: str, after: int = 0, idle_timeout: float = None
+  ) -> AsyncIterator[tuple[int, dict]]:
+    cursor, end = await self._run_bounds(chat_id)
+    if cursor is None:
+      return
+    if after:
+      in_run = after > cursor
+      BROKER_RESUMES.labels(backend=self.backend, outcome="resumed" if in_run else "restarted").inc()
+      if in_run:
+        cursor = after
+    if end is not None and cursor >= end:
+      # Resuming after the end of the run
+      return
+    waiter = asyncio.Event()
+    self._waiters.setdefault(chat_id, set()).add(waiter)
+    BROKER_SUBSCRIBERS.labels(backend=self.backend).inc()
+    try:
+      idle = 0.0
+      while True:
+        # Cleared before reading, so a notification for rows committed during the read still wakes the next wait
+        waiter.clear()
+        rows = await self._read(chat_id, cursor)
+        for seq, payload in rows:
+          if payload == _RUN_START:
+            return
+          cursor = seq
+          yield seq, payload
+          if not payload:
+            return
+        if rows:
+          idle = 0.0
+        elif idle_timeout is not None and idle >= idle_timeout:
+          raise asyncio.TimeoutError()
+        wait = self.poll_interval if idle_timeout is None else min(self.poll_interval, idle_timeout - idle)
+        try:
+          await asyncio.wait_for(waiter.wait(), wait)
+        except asyncio.TimeoutError:
+          idle += wait
+    finally:
+      waiters = self._waiters.get(chat_id)
+      waiters.discard(waiter)
+      if not waiters:
+        del self._waiters[chat_id]
+      BROKER_SUBSCRIBERS.labels(backend=self.backend).dec()
@@ -0,0 +1,218 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+import json
+import time
+from typing import Optional
+import numpy as np
+from prometheus_client import Counter, Gauge, Histogram
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from multi_agent_jarvis.setup_logging import logging
+from multi_agent_jarvis.globals import GraphState
+from multi_agent_jarvis.fast_router import normalize_question
+
+ANSWER_CACHE_LOOKUPS = Counter("jarvis_answer_cache_lookups_total", "Answer cache lookups by result", ["result"])
+ANSWER_CACHE_SIMILARITY = Histogram(
+  "jarvis_answer_cache_best_similarity",
+  "Cosine similarity of the closest cached question on each lookup",
+  buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 0.99, 1.0),
+)
+ANSWER_CACHE_ENTRIES = Gauge("jarvis_answer_cache_entries", "Number of answers held in the answer cache")
+ANSWER_CACHE_INVALIDATIONS = Counter(
+  "jarvis_answer_cache_invalidations_total", "Answer cache entries dropped by reason", ["reason"]
+)
+
+# Tools that never change anything. A run is only cacheable if every tool it called is listed here.
+READ_ONLY_TOOLS = frozenset(
+  {
+    "who_is_on_sre_oncall",
+    "tool_get_backstage_catalog_entities",
+    "tool_get_backstage_groups_by_user",
+    "tool_get_backstage_projects_by_user",
+    "tool_list_ci_workflows",
+    "tool_retrieve_ci_status",
+    "tool_retrieve_ci_logs",
+    "tool_list_pull_requests",
+    "tool_read_pull_request",
+    "tool_read_latest_pull_request_comments",
+    "tool_get_repo_description",
+    "tool_get_repo_topics",
+    "tool_get_repo_members",
+    "get_last_jira_comment",
+    "get_jira_issue_details",
+    "retrieve_multiple_jira_issues",
+    "search_jira_using_jql",
+    "get_jira_transitions",
+    "get_jira_assignee",
+    "get_jira_reporter_displayname",
+    "get_jira_reporter_email",
+    "get_account_id_from_email",
+    "retrieve_outshift_service_desk_tickets",
+  }
+)
+
+# Seconds an answer stays valid, keyed by the supervisor action that produced it.
+DEFAULT_INTENT_TTLS = {
+  GraphState.WHAT_CAN_YOU_DO.value: 24 * 3600,
+  GraphState.PAGERDUTY.value: 300,
+  GraphState.BACKSTAGE.value: 3600,
+  GraphState.GITHUB.value: 120,
+  GraphState.JIRA.value: 60,
+  GraphState.ARGOCD.value: 0,
+}
+
+# Intents answered without calling any tool. Runs of every other intent that called no tool failed, and are
+# not cached.
+TOOL_FREE_INTENTS = frozenset({GraphState.WHAT_CAN_YOU_DO.value})
+
+# Parts of a question naming a specific object. Questions that differ only in one of them look alike to the
+# n-gram embedding, so a cached answer is only returned when they match exactly. This also keeps follow-ups
+# such as "yes, do it" from matching a question naming something.
+_IDENTIFIER_PATTERNS = (
+  re.compile(r"https?://\S+"),
+  re.compile(r"\b[a-z][a-z0-9_]+-\d+\b"),
+  re.compile(r"\b[\w.-]+/[\w.-]+\b"),
+  re.compile(r"\b(?:repo|repository|repos|project|app|application|service)\s+([\w./-]+)"),
+  re.compile(r"([\w./-]+)\s+(?:repo|repository|project|app|application|service)\b"),
+  re.compile(r"\b\d+\b"),
+)
+
+
+def extract_identifiers(question: str) -> frozenset:
+  """Returns the issue keys, URLs, repository names and numbers mentioned in a normalised question."""
+  return frozenset(match for pattern in _IDENTIFIER_PATTERNS for match in pattern.findall(question))
+
+
+class AnswerCache:
+  """
+  Semantic cache of answers to read-only questions, scoped per user.
+
+  Questions are normalised and embedded locally with a hashing vectorizer, so lookups need no network call.
+  A lookup is a single matrix-vector product over every live entry followed by a mask on scope and expiry.
+  Only entries naming exactly the same identifiers (issue keys, URLs, repository names, numbers) as the
+  question can match, however close the rest of the question is.
+
+  Each entry records every intent the supervisor chose while answering it, so a run that writes through one
+  intent can drop the answers of that intent for every user.
+
+  Attributes:
+    similarity_threshold (float): Minimum cosine similarity for a cached answer to be returned.
+    intent_ttls (dict): Seconds an answer stays valid, keyed by supervisor action. Intents with a TTL of 0
+      are never cached.
+    max_entries (int): Maximum number of cached answers; the oldest entries are evicted first.
+  """
+
+  def __init__(self, similarity_threshold: float = 0.92, intent_ttls: dict = None, max_entries: int = 1000):
+    self.similarity_threshold = similarity_threshold
+    self.intent_ttls = {**DEFAULT_INTENT_TTLS, **(intent_ttls or {})}
+    self.max_entries = max_entries
+    self._vectorizer = HashingVectorizer(
+      analyzer="char_wb", ngram_range=(3, 5), n_features=2048, alternate_sign=False, norm="l2"
+    )
+    self._vectors = np.zeros((0, 2048), dtype=np.float32)
+    self._scopes = np.zeros(0, dtype=object)
+    self._identifiers = np.zeros(0, dtype=object)
+    self._intents = np.zeros(0, dtype=object)
+    self._expires_at = np.zeros(0, dtype=np.float64)
+    self._answers = []
+
+  @classmethod
+  def from_env(cls) -> Optional["AnswerCache"]:
+    """Builds the cache from JARVIS_ANSWER_CACHE_* environment variables, or returns None if it is disabled."""
+    if os.getenv("JARVIS_ANSWER_CACHE_ENABLED", "false").lower() != "true":
+      return None
+    return cls(
+      similarity_threshold=float(os.getenv("JARVIS_ANSWER_CACHE_SIMILARITY", "0.92")),
+      intent_ttls=json.loads(os.getenv("JARVIS_ANSWER_CACHE_TTLS", "{}")),
+      max_entries=int(os.getenv("JARVIS_ANSWER_CACHE_MAX_ENTRIES", "1000")),
+    )
+
+  def _embed(self, question: str) -> np.ndarray:
+    return self._vectorizer.transform([normalize_question(question)]).toarray()[0].astype(np.float32)
+
+  def _keep(self, mask: np.ndarray):
+    self._vectors = self._vectors[mask]
+    self._scopes = self._scopes[mask]
+    self._identifiers = self._identifiers[mask]
+    self._intents = self._intents[mask]
+    self._expires_at = self._expires_at[mask]
+    self._answers = [answer for answer, keep in zip(self._answers, mask) if keep]
+    ANSWER_CACHE_ENTRIES.set(len(self._answers))
+
+  def _evict_expired(self):
+    expired = self._expires_at <= time.time()
+    if expired.any():
+      ANSWER_CACHE_INVALIDATIONS.labels(reason="expired").inc(int(expired.sum()))
+      self._keep(~expired)
+
+  def lookup(self, question: str, user_scope: str) -> Optional[list]:
+    """
+    Returns the cached messages for the closest question asked in the same user scope with the same identifiers,
+    or None on a miss.
+    """
+    self._evict_expired()
+    identifiers = extract_identifiers(normalize_question(question))
+    in_scope = self._scopes == user_scope
+    in_scope &= np.fromiter((ids == identifiers for ids in self._identifiers), dtype=bool, count=len(in_scope))
+    if not in_scope.any():
+      ANSWER_CACHE_LOOKUPS.labels(result="miss").inc()
+      return None
+    similarities = np.where(in_scope, self._vectors @ self._embed(question), -1.0)
+    best = int(similarities.argmax())
+    ANSWER_CACHE_SIMILARITY.observe(float(similarities[best]))
+    if similarities[best] < self.similarity_threshold:
+      ANSWER_CACHE_LOOKUPS.labels(result="miss").inc()
+      return None
+    ANSWER_CACHE_LOOKUPS.labels(result="hit").inc()
+    logging.info(f"Answer cache hit for {user_scope} with similarity {similarities[best]:.3f}")
+    return self._answers[best]
+
+  def store(self, question: str, user_scope: str, intents: set, tools_used: set, answers: list) -> bool:
+    """
+    Caches the messages produced for a question if the answer came from read-only tools only.
+
+    The entry lives for the shortest TTL of its intents. Runs that called no tool outside of TOOL_FREE_INTENTS
+    (e.g. error answers) and answers asking the user for input are not cached.
+
+    Returns:
+      bool: True if the answer was cached.
+    """
+    ttl = min((self.intent_ttls.get(intent, 0) for intent in intents), default=0)
+    if ttl <= 0 or not answers or not tools_used <= READ_ONLY_TOOLS:
+      return False
+    if not tools_used and not intents <= TOOL_FREE_INTENTS:
+      return False
+    if any((answer.get("metadata") or {}).get("user_input") for answer in answers):
+      return False
+    if len(self._answers) >= self.max_entries:
+      ANSWER_CACHE_INVALIDATIONS.labels(reason="evicted").inc()
+      self._keep(np.arange(len(self._answers)) > 0)
+    self._vectors = np.vstack([self._vectors, self._embed(question)])
+    self._scopes = np.append(self._scopes, np.array([user_scope], dtype=object))
+    identifiers = np.empty(1, dtype=object)
+    identifiers[0] = extract_identifiers(normalize_question(question))
+    self._identifiers = np.append(self._identifiers, identifiers)
+    entry_intents = np.empty(1, dtype=object)
+    entry_intents[0] = frozenset(intents)
+    self._intents = np.append(self._intents, entry_intents)
+    self._expires_at = np.append(self._expires_at, time.time() + ttl)
+    self._answers.append(answers)
+    ANSWER_CACHE_ENTRIES.set(len(self._answers))
+    return True
+
+  def invalidate(self, user_scope: str = None, intent: str = None):
+    """
+    Drops cached answers matching the given user scope and/or produced through the given intent. With no arguments,
+    drops everything.
+    """
+    mask = np.ones(len(self._answers), dtype=bool)
+    if user_scope is not None:
+      mask &= self._scopes == user_scope
+    if intent is not None:
+      mask &= np.fromiter((intent in intents for intents in self._intents), dtype=bool, count=len(mask))
+    if mask.any():
+      ANSWER_CACHE_INVALIDATIONS.labels(reason="invalidated").inc(int(mask.sum()))
+      self._keep(~mask)
@@ -4,12 +4,15 @@
 from aiohttp import ClientSession, ClientTimeout
 import os
 from multi_agent_jarvis.setup_logging import logging as log
+from multi_agent_jarvis.tracing import aiohttp_trace_config
 
 
 def with_async_http_session(func):
   async def with_async_http_session_wrapper(*args, **kwargs):
     session_timeout = int(os.getenv("JARVIS_GLOBAL_SESSION_TIMEOUT", "30"))
-    async with ClientSession(timeout=ClientTimeout(session_timeout)) as session:
+    async with ClientSession(
+      timeout=ClientTimeout(session_timeout), trace_configs=[aiohttp_trace_config()]
+    ) as session:
       try:
         return await func(session, *args, **kwargs)
       finally:
@@ -31,7 +34,7 @@ class AsyncHttpSession:
       session_timeout = int(os.getenv("JARVIS_GLOBAL_SESSION_TIMEOUT", "30"))
 
       log.info(f"Creating new AsyncHttpSession instance with a global timeout {session_timeout}s")
-      cls._instance = ClientSession(timeout=ClientTimeout(session_timeout))
+      cls._instance = ClientSession(timeout=ClientTimeout(session_timeout), trace_configs=[aiohttp_trace_config()])
     return cls._instance
 
   @classmethod
@@ -0,0 +1,292 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Hashable, Optional
+from prometheus_client import Counter, Gauge, Histogram
+
+from multi_agent_jarvis.setup_logging import logging
+
+CHAT_SESSIONS = Gauge("jarvis_chat_sessions", "Chat sessions held by the session registry")
+CHAT_SESSION_EVICTIONS = Counter("jarvis_chat_session_evictions_total", "Chat sessions evicted by reason", ["reason"])
+CHAT_SESSION_BYTES = Gauge("jarvis_chat_session_bytes", "Approximate bytes of answers held by the session registry")
+CHAT_COMPLETION_WAITERS = Gauge("jarvis_chat_completion_waiters", "Requests waiting for a chat run to complete")
+CHAT_COMPLETION_WAITS = Counter(
+  "jarvis_chat_completion_waits_total", "Waits for a chat run to complete by outcome", ["outcome"]
+)
+CHAT_SUBMISSIONS = Counter(
+  "jarvis_chat_submissions_total",
+  "Questions submitted by outcome: started, queued behind the chat's current turn, or joined to an identical run",
+  ["outcome"],
+)
+RUNS_CANCELLED = Counter("jarvis_runs_cancelled_total", "Graph runs cancelled before they ended", ["reason"])
+CANCELLED_RUN_SECONDS = Histogram(
+  "jarvis_cancelled_run_seconds",
+  "Seconds a run had been queued or running when it was cancelled",
+  buckets=(1, 5, 10, 30, 60, 120, 300, 600),
+)
+
+IN_PROGRESS = "in progress"
+COMPLETED = "completed"
+FAILED = "failed"
+EVICTED = "evicted"
+CANCELLED = "cancelled"
+
+
+def _message_bytes(message: dict) -> int:
+  return len(json.dumps(message, default=str))
+
+
+class ChatSession:
+  """
+  State of one chat on the replica running it: the status of its current run, the full responses and a
+  completion future resolved when the run ends. The stream itself goes through the answer broker.
+
+  Attributes:
+    chat_id (str): The chat identifier.
+    responses (list): Every answer of the current run, read by /get_answer.
+    key (Hashable): Identifies the submission, so an identical one can join the run instead of repeating it.
+    previous (ChatSession): The turn still running on the chat's thread when this one was submitted.
+    opened (asyncio.Future): Resolved once the run's stream is opened on the answer broker.
+    completion (asyncio.Future): Resolved with the final status of the current run.
+    task (asyncio.Task): The task queueing for and running the graph, cancelled when nobody is watching.
+    queue_position (int): 0 once running, otherwise the position of the run in the admission queue.
+    watchers (int): Streams and /get_answer requests of this replica currently following the run.
+    last_access (float): Monotonic time of the last read or write.
+    bytes (int): Approximate size of the messages held by the session.
+  """
+
+  def __init__(self, chat_id: str, key: Hashable = None, previous: Optional["ChatSession"] = None):
+    self.chat_id = chat_id
+    self.key = key
+    self.previous = previous
+    self.responses = []
+    loop = asyncio.get_running_loop()
+    self.opened = loop.create_future()
+    self.completion = loop.create_future()
+    self.task: Optional[asyncio.Task] = None
+    self.queue_position = 0
+    self.watchers = 0
+    self.started_at = time.monotonic()
+    self.last_access = self.started_at
+    self.bytes = 0
+    self._unwatched_timer: Optional[asyncio.TimerHandle] = None
+
+  @property
+  def status(self) -> str:
+    return self.completion.result() if self.completion.done() else IN_PROGRESS
+
+  def finish(self, status: str):
+    if not self.completion.done():
+      self.completion.set_result(status)
+
+
+class ChatSessionRegistry:
+  """
+  Bounded registry of chat sessions with idle TTL and LRU eviction.
+
+  Sessions are kept in least recently used order, so expired sessions are always at the front and the
+  TTL sweep stops at the first live one. Evicting a session resolves its run as evicted, so no waiter is
+  left hanging.
+
+  A run nobody is watching any more, because its streams disconnected or its /get_answer requests gave up,
+  is cancelled once it has stayed unwatched for `disconnect_grace` seconds. The grace period covers a stream
+  reconnecting with Last-Event-ID and the gap between /submit_question and the first read.
+
+  Attributes:
+    max_sessions (int): Maximum number of sessions; the least recently used finished one is evicted beyond it.
+    idle_ttl (float): Seconds without access after which a finished session is evicted.
+    disconnect_grace (float, optional): Seconds a run may stay unwatched before it is cancelled, None to never
+      cancel it.
+  """
+
+  def __init__(self, max_sessions: int = 10000, idle_ttl: float = 3600, disconnect_grace: Optional[float] = 30):
+    self.max_sessions = max_sessions
+    self.idle_ttl = idle_ttl
+    self.disconnect_grace = disconnect_grace
+    self._sessions: OrderedDict[str, ChatSession] = OrderedDict()
+    self._bytes = 0
+
+  @classmethod
+  def from_env(cls) -> "ChatSessionRegistry":
+    # Only the watchers of this replica are counted, so with a shared answer broker a stream served by
+    # another replica would not keep the run alive
+    local_broker = os.getenv("JARVIS_ANSWER_BROKER", "memory").lower() == "memory"
+    cancel_on_disconnect = os.getenv("JARVIS_CANCEL_ON_DISCONNECT", str(local_broker)).lower() == "true"
+    return cls(
+      max_sessions=int(os.getenv("JARVIS_CHAT_SESSIONS_MAX", "10000")),
+      idle_ttl=float(os.getenv("JARVIS_CHAT_SESSION_IDLE_TTL", "3600")),
+      disconnect_grace=float(os.getenv("JARVIS_DISCONNECT_CANCEL_GRACE", "30")) if cancel_on_disconnect else None,
+    )
+
+  def __len__(self) -> int:
+    return len(self._sessions)
+
+  def _is_live(self, session: ChatSession) -> bool:
+    return self._sessions.get(session.chat_id) is session
+
+  def _touch(self, session: ChatSession):
+    session.last_access = time.monotonic()
+    self._sessions.move_to_end(session.chat_id)
+
+  def _add_bytes(self, session: ChatSession, size: int):
+    session.bytes += size
+    self._bytes += size
+    CHAT_SESSION_BYTES.set(self._bytes)
+
+  def _evict(self, chat_id: str, reason: str):
+    session = self._sessions.pop(chat_id)
+    self._add_bytes(session, -session.bytes)
+    if not session.completion.done():
+      logging.warning(f"Evicting chat session {chat_id} while its run is in progress ({reason})")
+    session.finish(EVICTED)
+    CHAT_SESSION_EVICTIONS.labels(reason=reason).inc()
+    CHAT_SESSIONS.set(len(self._sessions))
+
+  def evict_expired(self):
+    deadline = time.monotonic() - self.idle_ttl
+    while self._sessions:
+      session = next(iter(self._sessions.values()))
+      if session.last_access > deadline:
+        break
+      if not session.completion.done():
+        # A long run is not idle, only its reader is
+        self._touch(session)
+        continue
+      self._evict(session.chat_id, "ttl")
+
+  def join(self, chat_id: str, key: Hashable) -> Optional[ChatSession]:
+    """Returns the chat's latest session if it is an identical submission that has not ended yet."""
+    session = self.get(chat_id)
+    if session is None or session.completion.done() or session.key != key:
+      return None
+    CHAT_SUBMISSIONS.labels(outcome="joined").inc()
+    return session
+
+  def start(self, chat_id: str, key: Hashable = None) -> ChatSession:
+    """
+    Creates a fresh session for a new turn of the chat, replacing the previous one.
+
+    A previous turn that is still running keeps running and is linked as `previous`, so the new turn can wait
+    for it: runs on the same LangGraph thread would race on its checkpoints.
+    """
+    self.evict_expired()
+    previous = self._sessions.pop(chat_id, None)
+    if previous is not None:
+      self._add_bytes(previous, -previous.bytes)
+      if previous.completion.done():
+        previous = None
+    CHAT_SUBMISSIONS.labels(outcome="queued" if previous else "started").inc()
+    while len(self._sessions) >= self.max_sessions:
+      # Prefer the least recently used finished session, only cut a running one short if all are running
+      victim = next((k for k, v in self._sessions.items() if v.completion.done()), next(iter(self._sessions)))
+      self._evict(victim, "lru")
+    session = ChatSession(chat_id, key, previous)
+    self._sessions[chat_id] = session
+    CHAT_SESSIONS.set(len(self._sessions))
+    return session
+
+  def get(self, chat_id: str) -> Optional[ChatSession]:
+    self.evict_expired()
+    session = self._sessions.get(chat_id)
+    if session is not None:
+      self._touch(session)
+    return session
+
+  def record(self, session: ChatSession, message: dict):
+    """Records a message in the session's full responses."""
+    # A session that was evicted or replaced no longer holds answers
+    if self._is_live(session):
+      session.responses.append(message)
+      self._add_bytes(session, _message_bytes(message))
+      self._touch(session)
+
+  def open(self, session: ChatSession):
+    """Marks the session's stream as opened on the answer broker."""
+    session.previous = None
+    if not session.opened.done():
+      session.opened.set_result(None)
+
+  def complete(self, session: ChatSession, status: str = COMPLETED):
+    session.finish(status)
+    if session._unwatched_timer is not None:
+      session._unwatched_timer.cancel()
+      session._unwatched_timer = None
+    if self._is_live(session):
+      self._touch(session)
+
+  def _arm_unwatched_timer(self, session: ChatSession):
+    if self.disconnect_grace is None or session.completion.done() or session._unwatched_timer is not None:
+      return
+    session._unwatched_timer = asyncio.get_running_loop().call_later(
+      self.disconnect_grace, self._cancel_unwatched, session
+    )
+
+  def _cancel_unwatched(self, session: ChatSession):
+    session._unwatched_timer = None
+    if session.watchers or session.completion.done() or session.task is None:
+      return
+    logging.info(f"Cancelling run of chat {session.chat_id}, nobody watched it for {self.disconnect_grace}s")
+    RUNS_CANCELLED.labels(reason="disconnect").inc()
+    CANCELLED_RUN_SECONDS.observe(time.monotonic() - session.started_at)
+    session.task.cancel()
+
+  def attach_run(self, session: ChatSession, task: asyncio.Task):
+    """Records the task of the session's run, cancelled if it stays unwatched for the grace period."""
+    session.task = task
+    if not session.watchers:
+      self._arm_unwatched_timer(session)
+
+  @contextmanager
+  def watching(self, session: Optional[ChatSession]):
+    """Marks the session's run as watched for the duration of the block. A None session is ignored."""
+    if session is None:
+      yield
+      return
+    session.watchers += 1
+    if session._unwatched_timer is not None:
+      session._unwatched_timer.cancel()
+      session._unwatched_timer = None
+    try:
+      yield
+    finally:
+      session.watchers -= 1
+      if not session.watchers:
+        self._arm_unwatched_timer(session)
+
+  def release_responses(self, session: ChatSession):
+    """Drops the full responses of a session once they have been returned to the client."""
+    if self._is_live(session):
+      self._add_bytes(session, -session.bytes)
+    session.responses = []
+
+  async def wait(self, session: ChatSession, timeout: float) -> Optional[str]:
+    """
+    Waits for the session's run to end.
+
+    Returns:
+      str: The final status of the run, or None if it did not end within the timeout.
+
+    Raises:
+      asyncio.CancelledError: If the waiter itself is cancelled; the run and the other waiters are unaffected.
+    """
+    CHAT_COMPLETION_WAITERS.inc()
+    try:
+      # Shielded so a timed out or cancelled waiter doesn't cancel the future shared with the other waiters
+      status = await asyncio.wait_for(asyncio.shield(session.completion), timeout)
+      CHAT_COMPLETION_WAITS.labels(outcome=status).inc()
+      return status
+    except asyncio.TimeoutError:
+      logging.warning(f"Timed out after {timeout}s waiting for chat {session.chat_id} to complete")
+      CHAT_COMPLETION_WAITS.labels(outcome="timeout").inc()
+      return None
+    except asyncio.CancelledError:
+      CHAT_COMPLETION_WAITS.labels(outcome="cancelled").inc()
+      raise
+    finally:
+      CHAT_COMPLETION_WAITERS.dec()
@@ -0,0 +1,160 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+from prometheus_client import Histogram
+from langchain_core.messages import AnyMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+
+from multi_agent_jarvis.setup_logging import logging
+from multi_agent_jarvis.state import AgentState
+
+CONTEXT_PROMPT_TOKENS = Histogram(
+  "jarvis_context_prompt_tokens",
+  "Estimated prompt tokens sent to the LLM by each graph node",
+  ["node"],
+  buckets=(250, 500, 1000, 2000, 4000, 8000, 12000, 16000, 24000, 32000, 64000, 128000),
+)
+
+# Rough average for English text and JSON on GPT-4o tokenizers; avoids shipping or downloading a tokenizer.
+_CHARS_PER_TOKEN = 4
+# Role and framing tokens added by the chat format to every message.
+_MESSAGE_OVERHEAD_TOKENS = 4
+# Estimated token budget of a single tool output in a prompt. Task agents loop with their tools without going
+# through the supervisor's window, so one huge API response would otherwise reach every following LLM call.
+MAX_TOOL_OUTPUT_TOKENS = int(os.getenv("JARVIS_MAX_TOOL_OUTPUT_TOKENS", "4000"))
+
+_ROLE_NAMES = {"human": "User", "ai": "Assistant", "tool": "Tool"}
+
+
+def _content_text(message: AnyMessage) -> str:
+  if isinstance(message.content, str):
+    return message.content
+  return json.dumps(message.content, default=str)
+
+
+def estimate_tokens(message: AnyMessage) -> int:
+  """Estimates the number of prompt tokens a message costs without calling a tokenizer."""
+  chars = len(_content_text(message))
+  tool_calls = getattr(message, "tool_calls", None)
+  if tool_calls:
+    chars += len(json.dumps(tool_calls, default=str))
+  return chars // _CHARS_PER_TOKEN + _MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_tool_output(message: AnyMessage, max_tokens: int = MAX_TOOL_OUTPUT_TOKENS) -> AnyMessage:
+  """Returns a copy of a tool message cut down to `max_tokens`, or the message itself if it fits."""
+  text = _content_text(message)
+  max_chars = max_tokens * _CHARS_PER_TOKEN
+  if not isinstance(message, ToolMessage) or len(text) <= max_chars:
+    return message
+  logging.info(f"Truncating output of tool {message.name} from {len(text)} to {max_chars} characters")
+  content = f"{text[:max_chars]}\n[... {len(text) - max_chars} more characters of tool output truncated]"
+  return message.model_copy(update={"content": content})
+
+
+def build_prompt(node: str, sys_msg: SystemMessage, state: AgentState, messages: list = None) -> list:
+  """
+  Builds the prompt for a node: its system message, the rolling summary of older turns, then the window.
+
+  Tool outputs over JARVIS_MAX_TOOL_OUTPUT_TOKENS are truncated in the prompt, the state keeps them whole.
+
+  Args:
+    node (str): Name of the graph node, used to label the prompt size metric.
+    sys_msg (SystemMessage): The node's system message.
+    state (AgentState): The current graph state.
+    messages (list, optional): Message window to send instead of state["messages"].
+
+  Returns:
+    list: The messages to send to the LLM.
+  """
+  prompt = [sys_msg]
+  if state.get("summary"):
+    prompt.append(SystemMessage(content=f"Summary of the earlier conversation:\n{state['summary']}"))
+  prompt += [truncate_tool_output(m) for m in (state["messages"] if messages is None else messages)]
+  CONTEXT_PROMPT_TOKENS.labels(node=node).observe(sum(estimate_tokens(m) for m in prompt))
+  return prompt
+
+
+class ContextWindow:
+  """
+  Token-budgeted message window that folds older turns into a rolling summary.
+
+  The window is only trimmed once it grows past `max_tokens`, and is then cut down to
+  `max_tokens * low_water_ratio`, so most hops leave the checkpoint's message list untouched.
+
+  Attributes:
+    max_tokens (int): Estimated token budget of the message window.
+    low_water_ratio (float): Fraction of the budget kept after trimming.
+    summary_max_tokens (int): Estimated token budget of the rolling summary; its oldest lines are dropped first.
+    line_chars (int): Characters kept from each folded message.
+  """
+
+  def __init__(
+    self, max_tokens: int = 12000, low_water_ratio: float = 0.75, summary_max_tokens: int = 1000, line_chars: int = 300
+  ):
+    self.max_tokens = max_tokens
+    self.low_water_ratio = low_water_ratio
+    self.summary_max_tokens = summary_max_tokens
+    self.line_chars = line_chars
+
+  @classmethod
+  def from_env(cls) -> "ContextWindow":
+    return cls(
+      max_tokens=int(os.getenv("JARVIS_MAX_CONTEXT_TOKENS", "12000")),
+      low_water_ratio=float(os.getenv("JARVIS_CONTEXT_LOW_WATER_RATIO", "0.75")),
+      summary_max_tokens=int(os.getenv("JARVIS_CONTEXT_SUMMARY_MAX_TOKENS", "1000")),
+    )
+
+  def _window_start(self, messages: list) -> int:
+    target = int(self.max_tokens * self.low_water_ratio)
+    start = len(messages) - 1
+    used = estimate_tokens(messages[start])
+    while start > 0 and used + estimate_tokens(messages[start - 1]) <= target:
+      start -= 1
+      used += estimate_tokens(messages[start])
+    # Never split a tool call from its results: pull in the AI message that requested them
+    while start > 0 and isinstance(messages[start], ToolMessage):
+      start -= 1
+    return start
+
+  def _fold(self, summary: str, dropped: list) -> str:
+    lines = summary.splitlines() if summary else []
+    for message in dropped:
+      if isinstance(message, SystemMessage):
+        continue
+      text = " ".join(_content_text(message).split())
+      if not text:
+        continue
+      if len(text) > self.line_chars:
+        text = text[: self.line_chars] + "..."
+      lines.append(f"{_ROLE_NAMES.get(message.type, message.type)}: {text}")
+    max_chars = self.summary_max_tokens * _CHARS_PER_TOKEN
+    while lines and sum(len(line) + 1 for line in lines) > max_chars:
+      lines.pop(0)
+    return "\n".join(lines)
+
+  def trim(self, state: AgentState) -> tuple[dict, list]:
+    """
+    Trims the message window if it is over budget.
+
+    Args:
+      state (AgentState): The current graph state.
+
+    Returns:
+      tuple: The state update to return from the node (empty if nothing changed) and the message window
+        the node should send to its LLM.
+    """
+    messages = state["messages"]
+    if not messages or sum(estimate_tokens(m) for m in messages) <= self.max_tokens:
+      return {}, messages
+    start = self._window_start(messages)
+    # Keep the latest question in the window even if the answers after it are large
+    last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=start)
+    start = min(start, last_human)
+    if start == 0:
+      return {}, messages
+    dropped, kept = messages[:start], messages[start:]
+    summary = self._fold(state.get("summary") or "", dropped)
+    logging.info(f"Folding {len(dropped)} messages into the conversation summary, keeping {len(kept)}")
+    return {"messages": [RemoveMessage(id=m.id) for m in dropped], "summary": summary}, kept
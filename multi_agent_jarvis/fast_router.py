@@ -0,0 +1,154 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import re
+import yaml
+import collections
+from typing import Optional
+from prometheus_client import Counter, Histogram
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from langchain_core.messages import HumanMessage
+
+from multi_agent_jarvis.setup_logging import logging
+from multi_agent_jarvis.globals import GRAPH_STATE_TO_NEXT_ACTIONS, SUPERVISOR_AGENT
+
+FAST_ROUTER_DECISIONS = Counter(
+  "jarvis_fast_router_decisions_total",
+  "Supervisor routing decisions by source (fast_router hit or llm fallback)",
+  ["source"],
+)
+FAST_ROUTER_CONFIDENCE = Histogram(
+  "jarvis_fast_router_confidence",
+  "Confidence of the fast router's top prediction",
+  buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99, 1.0),
+)
+
+# Questions are suffixed with the user's email before reaching the graph, which is noise for routing.
+_ASKED_BY_PATTERN = re.compile(r"\(asked by user_email:[^)]*\)", re.IGNORECASE)
+
+_NODE_TO_ACTION = {node: action for action, node in GRAPH_STATE_TO_NEXT_ACTIONS.items()}
+
+
+def normalize_question(question: str) -> str:
+  return _ASKED_BY_PATTERN.sub("", question).strip().lower()
+
+
+def load_routing_dataset(file_path: str) -> tuple[list[str], list[str]]:
+  """
+  Loads a labelled routing dataset from YAML.
+
+  The dataset either lists questions under `routes`, keyed by router action (see eval/routing), or is in the
+  eval/strict_match format, where the label of each test is the first node visited after the supervisor in its
+  reference trajectory. Questions labelled with anything that is not a router action are skipped.
+
+  Args:
+    file_path (str): Path to the YAML dataset.
+
+  Returns:
+    tuple: The list of questions and the list of their router actions.
+  """
+  with open(file_path, "r", encoding="utf-8") as file:
+    data = yaml.safe_load(file) or {}
+
+  questions, actions = [], []
+  for action, examples in (data.get("routes") or {}).items():
+    if action not in GRAPH_STATE_TO_NEXT_ACTIONS:
+      logging.debug(f"Skipping routing examples of unknown action {action}")
+      continue
+    for question in examples or []:
+      questions.append(normalize_question(question))
+      actions.append(action)
+  for test_id, test in (data.get("tests") or {}).items():
+    for trajectory in (test.get("reference_trajectory") or {}).values():
+      nodes = trajectory.split(";")
+      if SUPERVISOR_AGENT not in nodes or nodes.index(SUPERVISOR_AGENT) + 1 >= len(nodes):
+        continue
+      action = _NODE_TO_ACTION.get(nodes[nodes.index(SUPERVISOR_AGENT) + 1])
+      if action is None:
+        logging.debug(f"Skipping routing example {test_id}: no router action for trajectory {trajectory}")
+        continue
+      questions.append(normalize_question(test["input"]))
+      actions.append(action)
+      break
+  return questions, actions
+
+
+class FastRouter:
+  """
+  Local TF-IDF/logistic-regression classifier that picks the supervisor action without an LLM call.
+
+  The router only answers when its confidence is at or above `threshold`; otherwise the caller falls back
+  to the supervisor LLM.
+
+  `from_env` only enables the router when the dataset has at least `min_examples` questions for every router
+  action; with fewer, a class the model barely knows gets confidently wrong predictions.
+
+  Attributes:
+    threshold (float): Minimum predicted probability required to route locally.
+    model: Fitted scikit-learn pipeline, or None if the router could not be trained.
+  """
+
+  def __init__(self, questions: list[str], actions: list[str], threshold: float = 0.85):
+    self.threshold = threshold
+    self.model = None
+    if len(set(actions)) < 2:
+      logging.warning("Fast router needs at least two distinct actions to train, disabling it")
+      return
+    # Character n-grams cope with typos and identifiers better than words on a small dataset, and the weak
+    # regularisation lets confident predictions clear the threshold
+    self.model = make_pipeline(
+      TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 5), sublinear_tf=True),
+      LogisticRegression(C=30, max_iter=1000),
+    )
+    self.model.fit(questions, actions)
+    logging.info(f"Fast router trained on {len(questions)} examples across {len(set(actions))} actions")
+
+  @classmethod
+  def from_env(cls) -> Optional["FastRouter"]:
+    """Builds the router from JARVIS_FAST_ROUTER_* environment variables, or returns None if it is disabled."""
+    if os.getenv("JARVIS_FAST_ROUTER_ENABLED", "false").lower() != "true":
+      return None
+    dataset = os.getenv("JARVIS_FAST_ROUTER_DATASET", "eval/routing/routing_dataset.yaml")
+    threshold = float(os.getenv("JARVIS_FAST_ROUTER_CONFIDENCE", "0.85"))
+    min_examples = int(os.getenv("JARVIS_FAST_ROUTER_MIN_EXAMPLES", "20"))
+    try:
+      questions, actions = load_routing_dataset(dataset)
+      counts = collections.Counter(actions)
+      too_few = {action: counts[action] for action in GRAPH_STATE_TO_NEXT_ACTIONS if counts[action] < min_examples}
+      if too_few:
+        logging.warning(
+          f"Fast router disabled: {dataset} has fewer than {min_examples} examples for actions {too_few}"
+        )
+        return None
+      router = cls(questions, actions, threshold=threshold)
+    except Exception as e:
+      logging.error(f"Failed to train fast router from {dataset}: {e}")
+      return None
+    if router.model is None:
+      return None
+    logging.info(f"Fast router enabled from {dataset} with examples per action {dict(counts)}")
+    return router
+
+  def route(self, messages) -> Optional[str]:
+    """
+    Returns the router action for the latest human message, or None to fall back to the supervisor LLM.
+
+    Only the first supervisor hop of a turn is routed locally: once other agents have replied, the decision
+    depends on the conversation and is left to the LLM.
+    """
+    if not messages or not isinstance(messages[-1], HumanMessage):
+      return None
+    probabilities = self.model.predict_proba([normalize_question(str(messages[-1].content))])[0]
+    best = probabilities.argmax()
+    confidence = float(probabilities[best])
+    FAST_ROUTER_CONFIDENCE.observe(confidence)
+    if confidence < self.threshold:
+      FAST_ROUTER_DECISIONS.labels(source="llm").inc()
+      return None
+    FAST_ROUTER_DECISIONS.labels(source="fast_router").inc()
+    action = str(self.model.classes_[best])
+    logging.info(f"Fast router selected '{action}' with confidence {confidence:.2f}")
+    return action
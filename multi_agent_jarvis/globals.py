@@ -39,6 +39,9 @@ SUPERVISOR_AGENT = sys.intern("supervisor_agent")
 WHAT_CAN_YOU_DO_AGENT = sys.intern("what_can_you_do_agent")
 # Observation Agent Nodes
 REFLECTION_AGENT = sys.intern("reflection_agent")
+# Fan-out Nodes: run several task agents concurrently and merge their results before reflection
+PARALLEL_AGENT = sys.intern("parallel_agent")
+MERGE_AGENT = sys.intern("merge_agent")
 
 # Agent Nodes
 ARGOCD_AGENT = sys.intern("argocd_agent")
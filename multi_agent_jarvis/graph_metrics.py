@@ -0,0 +1,123 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import time
+from uuid import UUID
+from prometheus_client import Counter, Histogram
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from multi_agent_jarvis.setup_logging import logging
+
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 34, 60, 120)
+
+NODE_LATENCY = Histogram("jarvis_graph_node_seconds", "Latency of each graph node run", ["node"], buckets=_LATENCY_BUCKETS)
+TOOL_LATENCY = Histogram("jarvis_tool_call_seconds", "Latency of each tool call", ["tool"], buckets=_LATENCY_BUCKETS)
+LLM_LATENCY = Histogram(
+  "jarvis_llm_call_seconds", "Latency of each LLM call", ["node", "deployment"], buckets=_LATENCY_BUCKETS
+)
+LLM_PROMPT_TOKENS = Counter("jarvis_llm_prompt_tokens_total", "Prompt tokens reported by the LLM", ["node", "deployment"])
+LLM_COMPLETION_TOKENS = Counter(
+  "jarvis_llm_completion_tokens_total", "Completion tokens reported by the LLM", ["node", "deployment"]
+)
+GRAPH_ERRORS = Counter("jarvis_graph_errors_total", "Errors raised by graph nodes, tools and LLM calls", ["kind", "name"])
+
+
+def _token_usage(response: LLMResult) -> tuple[int, int]:
+  for generations in response.generations:
+    for generation in generations:
+      usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+      if usage:
+        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+  usage = (response.llm_output or {}).get("token_usage") or {}
+  return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+class GraphMetricsCallbackHandler(BaseCallbackHandler):
+  """
+  Callback handler recording Prometheus metrics for every node, tool and LLM call of the graph.
+
+  It is attached to the compiled graph, so it follows every invocation, including the subgraphs run by the
+  parallel agent. Node runs are told apart from the runnables nested inside them by their run name, which
+  LangGraph sets to the node name.
+  """
+
+  # Only updates in-memory metrics, so there is no need to hop to a thread for each event
+  run_inline = True
+
+  def __init__(self):
+    self._node_runs = {}
+    self._tool_runs = {}
+    self._llm_runs = {}
+
+  # Nodes
+
+  def on_chain_start(self, serialized, inputs, *, run_id: UUID, metadata: dict = None, **kwargs):
+    node = (metadata or {}).get("langgraph_node")
+    if node and kwargs.get("name") == node:
+      self._node_runs[run_id] = (node, time.perf_counter())
+
+  def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+    node_run = self._node_runs.pop(run_id, None)
+    if node_run:
+      NODE_LATENCY.labels(node=node_run[0]).observe(time.perf_counter() - node_run[1])
+
+  def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+    node_run = self._node_runs.pop(run_id, None)
+    if node_run:
+      NODE_LATENCY.labels(node=node_run[0]).observe(time.perf_counter() - node_run[1])
+      # Control flow exceptions such as interrupts are not errors
+      if not type(error).__name__.startswith("Graph"):
+        GRAPH_ERRORS.labels(kind="node", name=node_run[0]).inc()
+
+  # Tools
+
+  def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs):
+    tool = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+    self._tool_runs[run_id] = (tool, time.perf_counter())
+
+  def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+    tool_run = self._tool_runs.pop(run_id, None)
+    if tool_run:
+      TOOL_LATENCY.labels(tool=tool_run[0]).observe(time.perf_counter() - tool_run[1])
+
+  def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+    tool_run = self._tool_runs.pop(run_id, None)
+    if tool_run:
+      TOOL_LATENCY.labels(tool=tool_run[0]).observe(time.perf_counter() - tool_run[1])
+      GRAPH_ERRORS.labels(kind="tool", name=tool_run[0]).inc()
+
+  # LLM calls
+
+  def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: dict = None, **kwargs):
+    self._start_llm_run(run_id, metadata)
+
+  def on_llm_start(self, serialized, prompts, *, run_id: UUID, metadata: dict = None, **kwargs):
+    self._start_llm_run(run_id, metadata)
+
+  def _start_llm_run(self, run_id: UUID, metadata: dict):
+    metadata = metadata or {}
+    node = metadata.get("langgraph_node", "unknown")
+    deployment = metadata.get("ls_model_name", "unknown")
+    self._llm_runs[run_id] = (node, deployment, time.perf_counter())
+
+  def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+    llm_run = self._llm_runs.pop(run_id, None)
+    if llm_run is None:
+      return
+    node, deployment, start_time = llm_run
+    LLM_LATENCY.labels(node=node, deployment=deployment).observe(time.perf_counter() - start_time)
+    try:
+      prompt_tokens, completion_tokens = _token_usage(response)
+    except Exception as e:
+      logging.debug(f"Could not read token usage of LLM call: {e}")
+      return
+    LLM_PROMPT_TOKENS.labels(node=node, deployment=deployment).inc(prompt_tokens)
+    LLM_COMPLETION_TOKENS.labels(node=node, deployment=deployment).inc(completion_tokens)
+
+  def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+    llm_run = self._llm_runs.pop(run_id, None)
+    if llm_run:
+      node, deployment, start_time = llm_run
+      LLM_LATENCY.labels(node=node, deployment=deployment).observe(time.perf_counter() - start_time)
+      GRAPH_ERRORS.labels(kind="llm", name=deployment).inc()
@@ -0,0 +1,399 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import time
+import socket
+import asyncio
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Optional
+from prometheus_client import Counter, Gauge, Histogram
+
+from multi_agent_jarvis.setup_logging import logging
+
+JIRA_WEBHOOK_EVENTS = Counter("jarvis_jira_webhook_events_total", "Jira webhook deliveries by outcome", ["outcome"])
+JIRA_WEBHOOK_QUEUE_DEPTH = Gauge("jarvis_jira_webhook_queue_depth", "Accepted Jira webhook events not yet processed")
+JIRA_WEBHOOK_BUSY_WORKERS = Gauge("jarvis_jira_webhook_busy_workers", "Workers currently processing a Jira event")
+JIRA_WEBHOOK_QUEUE_WAIT = Histogram(
+  "jarvis_jira_webhook_queue_wait_seconds",
+  "Seconds a Jira webhook event waited between being accepted and being processed",
+  buckets=(0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+JIRA_WEBHOOK_PROCESSING_SECONDS = Histogram(
+  "jarvis_jira_webhook_processing_seconds",
+  "Seconds spent processing a Jira webhook event",
+  ["outcome"],
+  buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600),
+)
+JIRA_WEBHOOK_MERGED_EVENTS = Counter(
+  "jarvis_jira_webhook_merged_events_total", "Debounced Jira webhook events processed along with an earlier one"
+)
+
+QUEUED = "queued"
+DONE = "done"
+FAILED = "failed"
+
+
+class WebhookRejected(Exception):
+  """Raised when a webhook event can't be accepted. `retry_after` is a hint in seconds for Jira."""
+
+  def __init__(self, reason: str, retry_after: float):
+    super().__init__(f"Jira webhook event rejected ({reason}), retry after {retry_after:.0f}s")
+    self.reason = reason
+    self.retry_after = retry_after
+
+
+class WebhookEvent:
+  """
+  An accepted Jira webhook delivery.
+
+  Attributes:
+    delivery_id (str): Issue key and identifier of the delivery, the same on every retry of it.
+    issue_key (str): Key of the issue the event is about.
+    payload (dict): The webhook body.
+    received_at (float): Epoch seconds at which the event was first accepted.
+    debounced (bool): Whether the event waits for the issue's debounce window and is merged with the debounced
+      events that follow it.
+  """
+
+  def __init__(self, delivery_id: str, issue_key: str, payload: dict, received_at: Optional[float] = None):
+    self.delivery_id = delivery_id
+    self.issue_key = issue_key
+    self.payload = payload
+    self.received_at = received_at or time.time()
+    self.debounced = False
+
+
+class JiraWebhookQueue:
+  """
+  Processes Jira webhook events in the background, so the webhook can be acknowledged as soon as it's verified.
+
+  Events are deduplicated by issue key and delivery identifier, which Jira keeps the same when it retries a
+  delivery, for `dedup_seconds`. Events of one issue are processed one at a time in the order they were
+  accepted, events of different issues by up to `workers` workers at once. At most `max_pending` events are
+  queued or running; beyond that deliveries are rejected so Jira retries them later.
+
+  Events selected by `debounce` wait until their issue has had no such event for `debounce_seconds`, or until
+  `debounce_max_seconds` after the first one. Consecutive debounced events of an issue are then processed
+  together, in a single call to `process`, so a burst of comments makes one run instead of one per comment.
+
+  With a Postgres connection string, events are also written to the `jarvis_jira_webhook_events` table before
+  they are acknowledged, owned by the replica that accepted them. The table deduplicates across replicas and
+  restarts. A replica picks its own queued events back up when it starts, and every `recover_after / 3` seconds
+  it refreshes the events it owns and claims those another replica hasn't refreshed for `recover_after`
+  seconds, which it must have stopped. Ordering per issue only holds within a replica.
+
+  Attributes:
+    process (Callable[[list], Awaitable]): Processes the payloads of events processed together, one unless they
+      were debounced.
+    workers (int): Number of events processed at once.
+    max_pending (int): Maximum number of events queued or running.
+    dedup_seconds (float): How long a delivery is remembered for deduplication.
+    conninfo (str, optional): Postgres connection string.
+    recover_after (float): Seconds after which a queued event another replica hasn't refreshed is considered
+      abandoned.
+    replica_id (str): Identifies this replica as the owner of its events in the table; it must stay the same
+      across restarts of the replica, like a StatefulSet pod name.
+    debounce (Callable[[dict], bool], optional): Selects the payloads to debounce.
+    debounce_seconds (float): Quiet time an issue's debounced events wait for, 0 to disable debouncing.
+    debounce_max_seconds (float): Longest time the first debounced event of a burst waits.
+  """
+
+  def __init__(
+    self,
+    process: Callable[[list], Awaitable],
+    workers: int = 4,
+    max_pending: int = 1000,
+    dedup_seconds: float = 24 * 3600,
+    conninfo: Optional[str] = None,
+    recover_after: float = 900,
+    replica_id: Optional[str] = None,
+    debounce: Optional[Callable[[dict], bool]] = None,
+    debounce_seconds: float = 0,
+    debounce_max_seconds: float = 30,
+  ):
+    self.process = process
+    self.workers = workers
+    self.max_pending = max_pending
+    self.dedup_seconds = dedup_seconds
+    self.conninfo = conninfo
+    self.recover_after = recover_after
+    self.replica_id = replica_id or socket.gethostname()
+    self.debounce = debounce
+    self.debounce_seconds = debounce_seconds
+    self.debounce_max_seconds = debounce_max_seconds
+    self._pool = None
+    self._worker_tasks: list[asyncio.Task] = []
+    self._sweep_task: Optional[asyncio.Task] = None
+    # Issues with events waiting, in the order they become runnable; an issue is never in it while running
+    self._ready: asyncio.Queue[str] = asyncio.Queue()
+    self._queued: set[str] = set()
+    self._pending: dict[str, deque[WebhookEvent]] = {}
+    self._running: set[str] = set()
+    # Debounce timer of each issue, with the loop time of the first event of the burst
+    self._debouncing: dict[str, tuple[asyncio.TimerHandle, float]] = {}
+    self._depth = 0
+    self._seen: OrderedDict[str, float] = OrderedDict()
+    self._finished = 0
+    # Moving average of processing durations, used for the Retry-After hint
+    self._avg_process_seconds = 30.0
+
+  @classmethod
+  def from_env(
+    cls,
+    process: Callable[[list], Awaitable],
+    conninfo: Optional[str] = None,
+    debounce: Optional[Callable[[dict], bool]] = None,
+  ) -> "JiraWebhookQueue":
+    return cls(
+      process,
+      workers=int(os.getenv("JARVIS_JIRA_WEBHOOK_WORKERS", "4")),
+      max_pending=int(os.getenv("JARVIS_JIRA_WEBHOOK_QUEUE_SIZE", "1000")),
+      dedup_seconds=float(os.getenv("JARVIS_JIRA_WEBHOOK_DEDUP_SECONDS", str(24 * 3600))),
+      conninfo=conninfo,
+      recover_after=float(os.getenv("JARVIS_JIRA_WEBHOOK_RECOVER_AFTER", "900")),
+      replica_id=os.getenv("JARVIS_REPLICA_ID"),
+      debounce=debounce,
+      debounce_seconds=float(os.getenv("JARVIS_JIRA_WEBHOOK_DEBOUNCE_SECONDS", "5")),
+      debounce_max_seconds=float(os.getenv("JARVIS_JIRA_WEBHOOK_DEBOUNCE_MAX_SECONDS", "30")),
+    )
+
+  @property
+  def started(self) -> bool:
+    return bool(self._worker_tasks)
+
+  async def start(self):
+    """Starts the workers, after recovering this replica's events and the abandoned ones when there is a table."""
+    if self.conninfo:
+      # Imported here so the in-memory queue doesn't need the Postgres driver
+      from psycopg_pool import AsyncConnectionPool
+
+      self._pool = AsyncConnectionPool(conninfo=self.conninfo, max_size=2, kwargs={"autocommit": True}, open=False)
+      await self._pool.open()
+      async with self._pool.connection() as conn:
+        await conn.execute(
+          """
+          CREATE TABLE IF NOT EXISTS jarvis_jira_webhook_events (
+            delivery_id TEXT PRIMARY KEY,
+            issue_key TEXT NOT NULL,
+            payload JSONB NOT NULL,
+            status TEXT NOT NULL,
+            owner TEXT,
+            received_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+          )
+          """
+        )
+        await conn.execute("ALTER TABLE jarvis_jira_webhook_events ADD COLUMN IF NOT EXISTS owner TEXT")
+        await conn.execute(
+          "DELETE FROM jarvis_jira_webhook_events "
+          "WHERE status <> %s AND updated_at < now() - make_interval(secs => %s)",
+          (QUEUED, self.dedup_seconds),
+        )
+        # Nothing of this replica is running yet, so all of its queued events were left by its previous run
+        await self._recover(conn, include_own=True)
+      self._sweep_task = asyncio.create_task(self._sweep())
+    self._worker_tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+    logging.info(f"Jira webhook queue started with {self.workers} workers")
+
+  async def _recover(self, conn, include_own: bool = False):
+    """Claims and enqueues the abandoned queued events of the table, and this replica's own with `include_own`."""
+    # Taking ownership bumps updated_at, so the other replicas skip the claimed events
+    cursor = await conn.execute(
+      """
+      UPDATE jarvis_jira_webhook_events SET owner = %s, updated_at = now()
+      WHERE status = %s AND ((%s AND owner = %s) OR updated_at < now() - make_interval(secs => %s))
+      RETURNING delivery_id, issue_key, payload, extract(epoch FROM received_at)
+      """,
+      (self.replica_id, QUEUED, include_own, self.replica_id, self.recover_after),
+    )
+    recovered = await cursor.fetchall()
+    for delivery_id, issue_key, payload, received_at in sorted(recovered, key=lambda row: row[3]):
+      self._remember(delivery_id)
+      self._enqueue(WebhookEvent(delivery_id, issue_key, payload, float(received_at)))
+    if recovered:
+      logging.info(f"Recovered {len(recovered)} abandoned Jira webhook events")
+
+  async def _sweep(self):
+    """Refreshes the queued events of this replica and recovers the ones other replicas abandoned."""
+    while True:
+      await asyncio.sleep(self.recover_after / 3)
+      try:
+        async with self._pool.connection() as conn:
+          await conn.execute(
+            "UPDATE jarvis_jira_webhook_events SET updated_at = now() WHERE status = %s AND owner = %s",
+            (QUEUED, self.replica_id),
+          )
+          await self._recover(conn)
+      except Exception as e:
+        logging.error(f"Failed to sweep the Jira webhook events table: {e}")
+
+  async def close(self):
+    for timer, _ in self._debouncing.values():
+      timer.cancel()
+    self._debouncing.clear()
+    tasks = self._worker_tasks + ([self._sweep_task] if self._sweep_task else [])
+    for task in tasks:
+      task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    self._worker_tasks = []
+    self._sweep_task = None
+    if self._pool is not None:
+      await self._pool.close()
+
+  def _remember(self, key: str) -> bool:
+    """Records a delivery, returning False if it was already seen within the dedup window."""
+    now = time.monotonic()
+    while self._seen and next(iter(self._seen.values())) < now:
+      self._seen.popitem(last=False)
+    if key in self._seen:
+      return False
+    self._seen[key] = now + self.dedup_seconds
+    return True
+
+  def _schedule(self, issue_key: str):
+    """Makes the issue runnable, unless it's running, already runnable or its next event is being debounced."""
+    events = self._pending.get(issue_key)
+    if not events or issue_key in self._running or issue_key in self._queued:
+      return
+    if events[0].debounced and issue_key in self._debouncing:
+      return
+    self._queued.add(issue_key)
+    self._ready.put_nowait(issue_key)
+
+  def _debounce(self, issue_key: str):
+    # Every debounced event pushes the issue's timer back, up to debounce_max_seconds after the first one
+    loop = asyncio.get_running_loop()
+    now = loop.time()
+    timer, first_at = self._debouncing.get(issue_key, (None, now))
+    if timer is not None:
+      timer.cancel()
+    delay = min(self.debounce_seconds, max(0.0, first_at + self.debounce_max_seconds - now))
+    self._debouncing[issue_key] = (loop.call_later(delay, self._debounced, issue_key), first_at)
+
+  def _debounced(self, issue_key: str):
+    self._debouncing.pop(issue_key, None)
+    self._schedule(issue_key)
+
+  def _enqueue(self, event: WebhookEvent):
+    self._pending.setdefault(event.issue_key, deque()).append(event)
+    self._depth += 1
+    JIRA_WEBHOOK_QUEUE_DEPTH.set(self._depth)
+    if self.debounce_seconds > 0 and self.debounce is not None and self.debounce(event.payload):
+      event.debounced = True
+      self._debounce(event.issue_key)
+    self._schedule(event.issue_key)
+
+  async def submit(self, delivery_id: str, issue_key: str, payload: dict) -> bool:
+    """
+    Accepts a webhook event for processing.
+
+    Returns:
+      bool: False if the delivery is a duplicate and was dropped.
+
+    Raises:
+      WebhookRejected: If the queue isn't started or is full.
+      Exception: If the event couldn't be written to the table, in which case it isn't accepted.
+    """
+    if not self.started:
+      JIRA_WEBHOOK_EVENTS.labels(outcome="rejected").inc()
+      raise WebhookRejected("not_started", 5)
+    key = f"{issue_key}:{delivery_id}"
+    if key in self._seen and self._seen[key] >= time.monotonic():
+      JIRA_WEBHOOK_EVENTS.labels(outcome="duplicate").inc()
+      logging.info(f"Dropping duplicate Jira webhook delivery {delivery_id} for {issue_key}")
+      return False
+    if self._depth >= self.max_pending:
+      JIRA_WEBHOOK_EVENTS.labels(outcome="rejected").inc()
+      logging.warning(f"Jira webhook queue is full, rejecting delivery {delivery_id} for {issue_key}")
+      raise WebhookRejected("queue_full", self._avg_process_seconds * (self._depth + 1) / self.workers)
+    event = WebhookEvent(key, issue_key, payload)
+    if self._pool is not None:
+      async with self._pool.connection() as conn:
+        cursor = await conn.execute(
+          "INSERT INTO jarvis_jira_webhook_events (delivery_id, issue_key, payload, status, owner) "
+          "VALUES (%s, %s, %s, %s, %s) ON CONFLICT (delivery_id) DO NOTHING RETURNING delivery_id",
+          (key, issue_key, json.dumps(payload, default=str), QUEUED, self.replica_id),
+        )
+        inserted = await cursor.fetchone()
+      if inserted is None:
+        # Accepted before, by this replica before a restart or by another one
+        self._remember(key)
+        JIRA_WEBHOOK_EVENTS.labels(outcome="duplicate").inc()
+        logging.info(f"Dropping duplicate Jira webhook delivery {delivery_id} for {issue_key}")
+        return False
+    # Checked again, a retry may have been accepted while this one was being written
+    if not self._remember(key):
+      JIRA_WEBHOOK_EVENTS.labels(outcome="duplicate").inc()
+      return False
+    self._enqueue(event)
+    JIRA_WEBHOOK_EVENTS.labels(outcome="accepted").inc()
+    return True
+
+  async def _finish(self, events: list[WebhookEvent], status: str):
+    if self._pool is None:
+      return
+    delivery_ids = [event.delivery_id for event in events]
+    try:
+      async with self._pool.connection() as conn:
+        await conn.execute(
+          "UPDATE jarvis_jira_webhook_events SET status = %s, updated_at = now() WHERE delivery_id = ANY(%s)",
+          (status, delivery_ids),
+        )
+        previous, self._finished = self._finished, self._finished + len(events)
+        if previous // 100 != self._finished // 100:
+          await conn.execute(
+            "DELETE FROM jarvis_jira_webhook_events "
+            "WHERE status <> %s AND updated_at < now() - make_interval(secs => %s)",
+            (QUEUED, self.dedup_seconds),
+          )
+    except Exception as e:
+      logging.error(f"Failed to record Jira webhook events {delivery_ids} as {status}: {e}")
+
+  async def _work(self):
+    while True:
+      issue_key = await self._ready.get()
+      self._queued.discard(issue_key)
+      events = self._pending[issue_key]
+      batch = [events.popleft()]
+      if batch[0].debounced:
+        while events and events[0].debounced:
+          batch.append(events.popleft())
+        # Debounced events that came in after the timer fired are merged too, their timer is moot
+        timer, _ = self._debouncing.pop(issue_key, (None, None))
+        if timer is not None:
+          timer.cancel()
+      if len(batch) > 1:
+        logging.info(f"Processing {len(batch)} debounced Jira webhook events of {issue_key} together")
+        JIRA_WEBHOOK_MERGED_EVENTS.inc(len(batch) - 1)
+      self._running.add(issue_key)
+      JIRA_WEBHOOK_BUSY_WORKERS.inc()
+      for event in batch:
+        JIRA_WEBHOOK_QUEUE_WAIT.observe(max(0.0, time.time() - event.received_at))
+      start = time.monotonic()
+      status = FAILED
+      try:
+        await self.process([event.payload for event in batch])
+        status = DONE
+      except asyncio.CancelledError:
+        # Left queued in the table, so a replica recovers it
+        status = None
+        raise
+      except Exception as e:
+        logging.error(f"Error processing Jira webhook events {[event.delivery_id for event in batch]}: {e}")
+      finally:
+        seconds = time.monotonic() - start
+        self._avg_process_seconds = 0.9 * self._avg_process_seconds + 0.1 * seconds
+        JIRA_WEBHOOK_BUSY_WORKERS.dec()
+        self._running.discard(issue_key)
+        self._depth -= len(batch)
+        JIRA_WEBHOOK_QUEUE_DEPTH.set(self._depth)
+        if events:
+          # The issue's next event goes to the back, behind issues that were waiting
+          self._schedule(issue_key)
+        else:
+          del self._pending[issue_key]
+      JIRA_WEBHOOK_PROCESSING_SECONDS.labels(outcome=status).observe(seconds)
+      JIRA_WEBHOOK_EVENTS.labels(outcome=status).inc(len(batch))
+      await self._finish(batch, status)
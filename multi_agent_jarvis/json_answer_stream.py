@@ -0,0 +1,82 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class AnswerFieldStream:
+  """
+  Incrementally extracts the text of one top-level string field from a JSON object streamed in fragments.
+
+  Task agents reply with a structured `JarvisResponse`, so the token deltas of their LLM calls are fragments of
+  JSON such as `{"answer":"Th`. Feeding every fragment to `feed` returns only the decoded text of the `answer`
+  field that arrived with it, so users see the answer being written rather than its JSON encoding.
+
+  Attributes:
+    field (str): Name of the top-level string field to extract.
+  """
+
+  def __init__(self, field: str = "answer"):
+    self.field = field
+    self._depth = 0
+    self._in_string = False
+    self._is_key = False
+    self._after_colon = False
+    self._key = None
+    self._chars = []
+    self._escape = None
+    self._high_surrogate = None
+
+  def _emitting(self) -> bool:
+    return self._in_string and not self._is_key and self._depth == 1 and self._key == self.field
+
+  def _string_char(self, char: str, out: list):
+    if self._high_surrogate is not None:
+      high, self._high_surrogate = self._high_surrogate, None
+      if 0xDC00 <= ord(char) <= 0xDFFF:
+        char = chr(0x10000 + ((ord(high) - 0xD800) << 10) + (ord(char) - 0xDC00))
+      else:
+        self._string_char(high, out)
+    elif 0xD800 <= ord(char) <= 0xDBFF:
+      self._high_surrogate = char
+      return
+    if self._is_key:
+      self._chars.append(char)
+    elif self._emitting():
+      out.append(char)
+
+  def feed(self, fragment: str) -> str:
+    """Consumes the next fragment of the JSON document and returns the field text it completes."""
+    out = []
+    for char in fragment:
+      if self._escape is not None:
+        self._escape += char
+        if self._escape[0] != "u":
+          self._string_char(_ESCAPES.get(char, char), out)
+          self._escape = None
+        elif len(self._escape) == 5:
+          self._string_char(chr(int(self._escape[1:], 16)), out)
+          self._escape = None
+      elif self._in_string:
+        if char == "\\":
+          self._escape = ""
+        elif char == '"':
+          if self._is_key:
+            self._key = "".join(self._chars)
+          self._in_string = False
+        else:
+          self._string_char(char, out)
+      elif char == '"':
+        self._in_string = True
+        # At the top level, a string before the colon is a key and one after it is the value of that key
+        self._is_key = self._depth == 1 and not self._after_colon
+        self._chars = []
+      elif char in "{[":
+        self._depth += 1
+      elif char in "}]":
+        self._depth -= 1
+      elif char == ":" and self._depth == 1:
+        self._after_colon = True
+      elif char == "," and self._depth == 1:
+        self._after_colon = False
+    return "".join(out)
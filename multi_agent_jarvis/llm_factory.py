@@ -13,6 +13,8 @@ class JarvisLLMFactory:
 
   Attributes:
     model_name (str): The name of the model to be used.
+    http_async_client (httpx.AsyncClient, optional): Shared HTTP client used by every connection created by
+      this factory. When unset, each connection creates its own client.
 
   Methods:
     get_llm_connection(response_format=None):
@@ -28,14 +30,19 @@ class JarvisLLMFactory:
         ValueError: If the model_name is not supported.
   """
 
-  def __init__(self, model_name: str):
+  def __init__(self, model_name: str, http_async_client=None):
     self.model_name = model_name
+    self.http_async_client = http_async_client
+
+  @property
+  def deployment(self):
+    return os.getenv(f"AZURE_OPENAI_DEPLOYMENT_{self.model_name.replace('-', '_').upper()}")
 
   def get_llm_connection(self, response_format=None):
     if self.model_name not in ["gpt-4o", "gpt-4o-mini", "gpt-o1", "gpt-o1-mini"]:
       raise ValueError(f"Unsupported model name: {self.model_name}")
 
-    deployment = os.getenv(f"AZURE_OPENAI_DEPLOYMENT_{self.model_name.replace('-', '_').upper()}")
+    deployment = self.deployment
     api_version = os.getenv(f"AZURE_OPENAI_API_VERSION_{self.model_name.replace('-', '_').upper()}")
     logging.info(f"Using model: {self.model_name}, deployment: {deployment}, api_version: {api_version}")
 
@@ -48,6 +55,9 @@ class JarvisLLMFactory:
       max_tokens=None,
       timeout=None,
       max_retries=5,
+      http_async_client=self.http_async_client,
+      # Report token usage on streamed completions too, for the token counters
+      stream_usage=True,
       model_kwargs=({"response_format": response_format} if response_format else dict()),
     )
 
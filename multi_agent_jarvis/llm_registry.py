@@ -0,0 +1,81 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import time
+import httpx
+from multi_agent_jarvis.setup_logging import logging
+from multi_agent_jarvis.llm_factory import JarvisLLMFactory
+from multi_agent_jarvis.models import JarvisResponse
+from multi_agent_jarvis.tracing import HTTPX_EVENT_HOOKS
+
+
+class JarvisLLMRegistry:
+  """
+  Builds every LLM connection and tool binding used by the graph once and shares them across invocations.
+
+  All connections created by the registry share a single pooled `httpx.AsyncClient`, so an agent hop only
+  pays for the network round-trip instead of rebuilding the client and regenerating the tool JSON schemas.
+
+  Attributes:
+    llm_factory (JarvisLLMFactory): Factory used to create the underlying connections.
+    build_timings (dict): Seconds spent building each registered runnable, keyed by node name.
+
+  Methods:
+    register(name, runnable): Register an already built runnable under a node name.
+    register_llm(name, response_format=None): Build and register a plain LLM connection.
+    register_structured_output(name, schema): Build and register an LLM returning the given schema.
+    register_tools(name, tools, response_format=JarvisResponse): Build and register an LLM bound to tools.
+    get(name): Return the runnable registered under a node name.
+    aclose(): Close the shared HTTP client.
+  """
+
+  def __init__(self, model_name: str):
+    max_connections = int(os.getenv("JARVIS_LLM_MAX_CONNECTIONS", "100"))
+    max_keepalive_connections = int(os.getenv("JARVIS_LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    self.http_async_client = httpx.AsyncClient(
+      limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+      timeout=httpx.Timeout(float(os.getenv("JARVIS_LLM_TIMEOUT", "600"))),
+      event_hooks=HTTPX_EVENT_HOOKS,
+    )
+    self.llm_factory = JarvisLLMFactory(model_name, http_async_client=self.http_async_client)
+    self.build_timings = {}
+    self._runnables = {}
+
+  def register(self, name: str, runnable, build_seconds: float = 0.0):
+    self._runnables[name] = runnable
+    self.build_timings[name] = build_seconds
+    return runnable
+
+  def register_llm(self, name: str, response_format=None):
+    start_time = time.perf_counter()
+    llm = self.llm_factory.get_llm_connection(response_format=response_format)
+    return self.register(name, llm, time.perf_counter() - start_time)
+
+  def register_structured_output(self, name: str, schema):
+    start_time = time.perf_counter()
+    llm = self.llm_factory.get_llm_connection().with_structured_output(schema, strict=True)
+    return self.register(name, llm, time.perf_counter() - start_time)
+
+  def register_tools(self, name: str, tools, response_format=JarvisResponse):
+    start_time = time.perf_counter()
+    llm = self.llm_factory.get_llm_connection(response_format=response_format).bind_tools(tools, strict=True)
+    build_seconds = time.perf_counter() - start_time
+    logging.info(f"Built tool schemas for {name}: {len(tools)} tools in {build_seconds * 1000:.1f}ms")
+    return self.register(name, llm, build_seconds)
+
+  def get(self, name: str):
+    if name not in self._runnables:
+      raise KeyError(f"No LLM registered for node: {name}")
+    return self._runnables[name]
+
+  def log_build_timings(self):
+    total = sum(self.build_timings.values())
+    logging.info(f"LLM registry built {len(self.build_timings)} runnables in {total * 1000:.1f}ms")
+    for name, build_seconds in self.build_timings.items():
+      logging.info(f"  {name}: {build_seconds * 1000:.1f}ms")
+
+  async def aclose(self):
+    """Close the shared HTTP client."""
+    logging.info("Closing LLM registry HTTP client")
+    await self.http_async_client.aclose()
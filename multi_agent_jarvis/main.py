@@ -1,8 +1,9 @@
 # Copyright 2025 CNOE
 # SPDX-License-Identifier: Apache-2.0
 
-from fastapi import BackgroundTasks, FastAPI, Depends, HTTPException, Request
+from fastapi import BackgroundTasks, FastAPI, Depends, HTTPException, Query, Request
 import traceback
+from fastapi.responses import JSONResponse
 from sse_starlette import EventSourceResponse
 from contextlib import asynccontextmanager
 from concurrent.futures import ProcessPoolExecutor
@@ -21,9 +22,17 @@ from jarvis_agent.aigateway_agent.api import bootstrap_project
 from multi_agent_jarvis.globals import PROJECT_NAME_TO_UUID
 import uuid
 import time
+import inspect
 import json
+import math
 from jarvis_agent.jarvis_agent import JarvisAgent
 from multi_agent_jarvis.async_http_utils import AsyncHttpSession
+from multi_agent_jarvis.chat_sessions import ChatSession, ChatSessionRegistry, CANCELLED, COMPLETED, FAILED
+from multi_agent_jarvis.admission import AdmissionController, AdmissionRejected, AdmissionTicket
+from multi_agent_jarvis.answer_broker import AnswerBroker
+from multi_agent_jarvis.jira_webhook_queue import JiraWebhookQueue, WebhookRejected
+from multi_agent_jarvis.sandbox_cache import CONFIGMAP, SECRET, InvalidContinueToken, SandboxCache
+from multi_agent_jarvis.startup import BootstrapStateStore, StartupPipeline, bootstrap_projects
 from prometheus_client import start_http_server, Summary, Counter, Gauge
 from jarvis_agent.verify_jwt import validate_token
 import os
@@ -36,13 +45,17 @@ from kubernetes import client, config
 import hmac
 import hashlib
 from multi_agent_jarvis.agents.jira_agent.models.jira_issue_model import JiraPayload
+from multi_agent_jarvis.agents.jira_agent.tools._jira_instance import JiraInstanceManager
 from jarvis_agent.jarvis_utils import print_banner
 
 from multi_agent_jarvis.agents.jira_agent import (
   process_jira_webhook,
+  process_jira_comments,
   _add_jira_comment,
   jira_comment_body_adf,
   _get_jira_reporter_email,
+  _run_webhook_actions,
+  JiraUserDirectory,
 )
 
 jarvis_agent = None
@@ -53,6 +66,7 @@ def generate_uuid():
 
 
 DB_URI = os.getenv("DB_URI")
+STREAM_TOKENS = os.getenv("JARVIS_STREAM_TOKENS", "false").lower() == "true"
 LANGGRAPH_CHECKPOINT_MEMORY_SAVER = os.getenv("LANGGRAPH_CHECKPOINT_MEMORY_SAVER", "memory")
 
 
@@ -91,122 +105,200 @@ async def update_kubeconfig():
     raise ValueError(f"Failed to update kubeconfig: {err}")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-  if os.getenv("JARVIS_DRYRUN", "false").lower() == "true":
-    print_banner("JARVIS DRY RUN MODE ENABLED", "Tools will not be executed. This is a dry run.")
+def _postgres_conninfo() -> str:
+  p = urlparse(DB_URI)
 
-  if os.getenv("ENABLE_KNOWLEDGE_GRAPH", "false").lower() != "true":
-    print_banner("KNOWLEDGE GRAPH DISABLED", "Knowledge graph features will not be available.")
-  # Create global async HTTP session
-  await AsyncHttpSession.get_instance()
-  await update_kubeconfig()
-  config.load_kube_config()
-  # Prepare a list of tasks for bootstrapping projects
-  tasks = []
+  conninfo = {
+    "dbname": p.path[1:],
+    "user": p.username,
+    "password": p.password,
+    "port": p.port,
+    "host": p.hostname,
+  }
+
+  return "\n".join([f"{k}={v}" for k, v in conninfo.items()])
 
+
+def _bootstrap_requests() -> dict:
+  requests = {}
   for project_name, project_id in PROJECT_NAME_TO_UUID.items():
     # hack to avoid bootstrapping the "other" project which is the default one
     if project_name != "other":
       if str(uuid.UUID(project_id, version=4)) != project_id:
         logging.error(f"project ID {project_id} is not a valid UUID4, it might encounter onboarding issues")
-      bootstrap_request = BootstrapRequest(
+      requests[project_name] = BootstrapRequest(
         org_id="c646e079-6c27-4dcb-9c6b-5b8b12d8c0d1",  # Static root org ID for all projects
         project_id=project_id,
         project_name=project_name,
         project_owner="sraradhy@cisco.com",
         update_existing_models=True,
       )
-      tasks.append(bootstrap_project(bootstrap_request))
+  return requests
+
 
-  # Execute all tasks concurrently
-  results = await asyncio.gather(*tasks, return_exceptions=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  if os.getenv("JARVIS_DRYRUN", "false").lower() == "true":
+    print_banner("JARVIS DRY RUN MODE ENABLED", "Tools will not be executed. This is a dry run.")
 
-  # Handle exceptions and log errors
-  for i, result in enumerate(results):
-    if isinstance(result, Exception):
-      project_name = list(PROJECT_NAME_TO_UUID.keys())[i]
-      project_id = list(PROJECT_NAME_TO_UUID.values())[i]
-      logging.error(f"Failed to bootstrap project: {project_name} with ID: {project_id}. Error: {str(result)}")
+  if os.getenv("ENABLE_KNOWLEDGE_GRAPH", "false").lower() != "true":
+    print_banner("KNOWLEDGE GRAPH DISABLED", "Knowledge graph features will not be available.")
 
-  try:
+  # The steps run in the background: /healthz answers right away and /readyz once the critical ones are done
+  resources = {}
+
+  async def start_http_session():
+    # Create global async HTTP session
+    await AsyncHttpSession.get_instance()
+
+  async def load_kubeconfig():
+    await update_kubeconfig()
+    await asyncio.to_thread(config.load_kube_config)
+
+  async def bootstrap():
+    # Unchanged projects are skipped, their last bootstrap hash is kept next to the checkpoints when possible
+    conninfo = _postgres_conninfo() if LANGGRAPH_CHECKPOINT_MEMORY_SAVER == "postgres" else None
+    await bootstrap_projects(
+      _bootstrap_requests(),
+      bootstrap_project,
+      BootstrapStateStore.from_env(conninfo),
+      max_concurrency=int(os.getenv("JARVIS_BOOTSTRAP_CONCURRENCY", "4")),
+    )
+
+  async def list_llm_providers():
     # cache the supported LLM providers and models
     await list_supported_llm_providers_and_models()
-  except Exception as e:
-    logging.error(f"Failed to list supported llm providers and models: {e}")
 
   #######################################
   ######### Add Memory Checkpoint #######
   #######################################
 
-  global jarvis_agent
-  logging.info("Using InMemoryStore.")
-  store = InMemoryStore()
-  checkpointer = None
-  if LANGGRAPH_CHECKPOINT_MEMORY_SAVER == "memory":
-    logging.info("Using MemorySaver for checkpointing.")
-    checkpointer = MemorySaver()
-    jarvis_agent = JarvisAgent(checkpointer, store)
-    # Not resource intensive, just need to get around GIL
-    p = ProcessPoolExecutor(max_workers=1)
-    p.submit(jarvis_webex)
-    yield
-  elif LANGGRAPH_CHECKPOINT_MEMORY_SAVER == "postgres":
-    logging.info("Using PostgresSaver for checkpointing.")
-
-    connection_kwargs = {
-      "autocommit": True,
-      "prepare_threshold": 0,
-    }
-
-    p = urlparse(DB_URI)
-
-    conninfo = {
-      "dbname": p.path[1:],
-      "user": p.username,
-      "password": p.password,
-      "port": p.port,
-      "host": p.hostname,
-    }
-
-    conninfo = "\n".join([f"{k}={v}" for k, v in conninfo.items()])
-
-    async with AsyncConnectionPool(
-      conninfo=conninfo,
-      max_size=5,
-      kwargs=connection_kwargs,
-    ) as pool:
+  async def setup_checkpointer():
+    if LANGGRAPH_CHECKPOINT_MEMORY_SAVER == "memory":
+      logging.info("Using MemorySaver for checkpointing.")
+      resources["checkpointer"] = MemorySaver()
+    elif LANGGRAPH_CHECKPOINT_MEMORY_SAVER == "postgres":
+      logging.info("Using PostgresSaver for checkpointing.")
+      connection_kwargs = {
+        "autocommit": True,
+        "prepare_threshold": 0,
+      }
+      # Closed at shutdown, so that the DB connections stay active while serving
+      pool = AsyncConnectionPool(conninfo=_postgres_conninfo(), max_size=5, kwargs=connection_kwargs, open=False)
+      await pool.open()
+      resources["pool"] = pool
       checkpointer = AsyncPostgresSaver(pool)
-
       await checkpointer.setup()
-      jarvis_agent = JarvisAgent(checkpointer, store)
-      # Not resource intensive, just need to get around GIL
-      p = ProcessPoolExecutor(max_workers=1)
-      p.submit(jarvis_webex)
+      resources["checkpointer"] = checkpointer
+    else:
+      raise ValueError(f"Unsupported LANGGRAPH_CHECKPOINT_MEMORY_SAVER: {LANGGRAPH_CHECKPOINT_MEMORY_SAVER}")
+
+  async def build_agent():
+    global jarvis_agent
+    logging.info("Using InMemoryStore.")
+    jarvis_agent = JarvisAgent(resources["checkpointer"], InMemoryStore())
+    if STREAM_TOKENS and not _accepts_kwarg(jarvis_agent.interact, "stream_tokens"):
+      logging.warning("JARVIS_STREAM_TOKENS is set but the agent does not stream tokens, answers are sent per node")
+
+  async def start_webex():
+    # Not resource intensive, just need to get around GIL
+    resources["webex"] = ProcessPoolExecutor(max_workers=1)
+    resources["webex"].submit(jarvis_webex)
+
+  startup.add("http_session", start_http_session)
+  startup.add("answer_broker", answer_broker.start)
+  startup.add("kubeconfig", load_kubeconfig)
+  startup.add("bootstrap_projects", bootstrap, depends_on=["http_session"])
+  startup.add("llm_providers", list_llm_providers, depends_on=["bootstrap_projects"], critical=False)
+  startup.add("checkpointer", setup_checkpointer)
+  startup.add("agent", build_agent, depends_on=["checkpointer", "llm_providers"])
+  startup.add("webex", start_webex, depends_on=["agent"], critical=False)
+  startup.add("jira_webhook_queue", jira_webhooks.start, depends_on=["agent"])
+  startup_task = asyncio.create_task(startup.run())
+  # The error is kept in startup.error and reported by /healthz
+  startup_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+  yield
 
-      # Yield inside context so that the DB connections stay active
-      yield
   # Any cleanup tasks can be added here if needed
+  if not startup_task.done():
+    startup_task.cancel()
   await AsyncHttpSession.close()
-  p.shutdown(wait=False, cancel_futures=True)
+  await JiraInstanceManager.close()
+  # Agents built on the LLM registry share one pooled HTTP client across interactions
+  agent_aclose = getattr(jarvis_agent, "aclose", None)
+  if agent_aclose:
+    await agent_aclose()
+  await jira_webhooks.close()
+  await answer_broker.close()
+  await SandboxCache.close()
+  if "pool" in resources:
+    await resources["pool"].close()
+  if "webex" in resources:
+    resources["webex"].shutdown(wait=False, cancel_futures=True)
+
+
+def _accepts_kwarg(func, name: str) -> bool:
+  # The agent may not support every option of JarvisMultiAgentSystem.interact, e.g. token streaming
+  try:
+    parameters = inspect.signature(func).parameters
+  except (TypeError, ValueError):
+    return False
+  return name in parameters or any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values())
 
 
-async def task_submit_question(question: ChatBotQuestion, user_email: str):
+async def task_submit_question(question: ChatBotQuestion, user_email: str, session: ChatSession):
   try:
     question.question += f" (asked by user_email: {user_email})"
     logging.info(f"Received question: {question.question}")
+    interact_kwargs = {}
+    if STREAM_TOKENS and _accepts_kwarg(jarvis_agent.interact, "stream_tokens"):
+      interact_kwargs["stream_tokens"] = True
     async for message in jarvis_agent.interact(
-      human_message=question.question, thread_id=question.chat_id, user_email=user_email, user_files=question.user_files
+      human_message=question.question,
+      thread_id=question.chat_id,
+      user_email=user_email,
+      user_files=question.user_files,
+      **interact_kwargs,
     ):
-      await message_queues[question.chat_id].put(message)
-      full_responses[question.chat_id].append(message)
-    task_status[question.chat_id] = "completed"
+      # Token deltas are only for the stream; the full answer of each node follows them
+      if "delta" not in message:
+        chat_sessions.record(session, message)
+      await answer_broker.publish(question.chat_id, message)
+    chat_sessions.complete(session, COMPLETED)
+  except asyncio.CancelledError:
+    # Nobody is watching the run any more; the cancellation has already stopped the LLM and tool calls
+    logging.info(f"Run of chat {question.chat_id} cancelled")
+    chat_sessions.complete(session, CANCELLED)
+    try:
+      await answer_broker.publish(question.chat_id, {})
+    except Exception as broker_error:
+      logging.error(f"Failed to publish the end of stream for chat {question.chat_id}: {broker_error}")
+    raise
   except Exception as e:
     logging.error(f"Error in task_submit_question method: {traceback.format_exc()}")
     logging.error(f"{type(e).__name__}: {e}")
-    await message_queues[question.chat_id].put(
-      {"answer": "Jarvis Agent is not available right now. Please try again later!"}
-    )
+    chat_sessions.complete(session, FAILED)
+    try:
+      await answer_broker.publish(
+        question.chat_id, {"answer": "Jarvis Agent is not available right now. Please try again later!"}
+      )
+      await answer_broker.publish(question.chat_id, {})
+    except Exception as broker_error:
+      logging.error(f"Failed to publish the end of stream for chat {question.chat_id}: {broker_error}")
+
+
+def _spawn(coro) -> asyncio.Task:
+  # The event loop only keeps weak references to tasks
+  task = asyncio.create_task(coro)
+  server_tasks.add(task)
+  task.add_done_callback(server_tasks.discard)
+  return task
+
+
+def _publish_queue_position(chat_id: str, position: int):
+  # Called synchronously by the admission controller, the broker publish runs as its own task
+  _spawn(answer_broker.publish(chat_id, {"queue_position": position}))
 
 
 app = FastAPI(lifespan=lifespan)
@@ -223,9 +315,17 @@ if os.getenv("START_METRICS_SERVER", "false").lower() == "true":
   start_http_server(8001)
 
 submit_feedback_executor = ThreadPoolExecutor(max_workers=10)
-task_status = {}
-message_queues = {}
-full_responses = {}
+# Status and answers of the chats run by this replica, bounded in size and evicted after an idle TTL
+chat_sessions = ChatSessionRegistry.from_env()
+# Answer events of every chat, readable from any replica when backed by Postgres (JARVIS_ANSWER_BROKER)
+answer_broker = AnswerBroker.from_env()
+# Runs and broker publishes started outside of a request
+server_tasks = set()
+# Dependency-aware startup steps run by the lifespan, reported by /readyz
+startup = StartupPipeline.from_env()
+# Global in-flight limit, per-user rate and concurrency limits, and a bounded wait queue in front of the runs
+admission = AdmissionController.from_env()
+GET_ANSWER_TIMEOUT = float(os.getenv("JARVIS_GET_ANSWER_TIMEOUT", "600"))
 
 origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
 
@@ -261,61 +361,91 @@ async def _extract_token(request: Request) -> str:
   return user_email
 
 
+async def _wait_for_disconnect(request: Request):
+  """Returns once the client has closed the connection."""
+  while True:
+    message = await request.receive()
+    if message["type"] == "http.disconnect":
+      return
+
+
 @app.get("/get_answer/{chat_id}")
-async def get_answer(chat_id: str, user_email: str = Depends(_extract_token)):
+async def get_answer(request: Request, chat_id: str, user_email: str = Depends(_extract_token)):
   REQUEST_COUNT.inc()
   request_start_time = time.time()
+  session = chat_sessions.get(chat_id)
+  if session is None:
+    logging.warning(f"No session found for chat {chat_id}")
+    REQUEST_TIME.observe(time.time() - request_start_time)
+    return JARVIS_UNAVAILABLE_MESSAGE
+  completion = asyncio.create_task(chat_sessions.wait(session, GET_ANSWER_TIMEOUT))
+  disconnect = asyncio.create_task(_wait_for_disconnect(request))
   try:
-    timeout = 600
-    task_start_time = time.time()
-    while time.time() - task_start_time < timeout:
-      status = task_status.get(chat_id)
-      if status == "completed":
-        break
-      await asyncio.sleep(0.5)
-    else:
+    # Once the client leaves or the wait times out, the run is cancelled unless something else watches it
+    with chat_sessions.watching(session):
+      await asyncio.wait([completion, disconnect], return_when=asyncio.FIRST_COMPLETED)
+    if not completion.done():
+      logging.info(f"Client disconnected while waiting for chat {chat_id}")
+      return JARVIS_UNAVAILABLE_MESSAGE
+    if completion.result() != COMPLETED:
       return JARVIS_UNAVAILABLE_MESSAGE
     # Strip the end of stream message and use the last message's metadata
     answer_message_dict = {
-      "answer": "\n".join([m["answer"] for m in full_responses[chat_id][:-1]]),
-      "metadata": full_responses[chat_id][:-1][-1]["metadata"],
+      "answer": "\n".join([m["answer"] for m in session.responses[:-1]]),
+      "metadata": session.responses[:-1][-1]["metadata"],
     }
     logging.info(f"Retrieved answer message: {json.dumps(answer_message_dict, indent=2)}")
-    full_responses.pop(chat_id)
+    chat_sessions.release_responses(session)
     return answer_message_dict
   except Exception as e:
     logging.error(f"Error in get_answer method: {traceback.format_exc()}")
     logging.error(f"{type(e).__name__}: {e}")
     return JARVIS_UNAVAILABLE_MESSAGE
   finally:
+    completion.cancel()
+    disconnect.cancel()
     REQUEST_TIME.observe(time.time() - request_start_time)
 
 
-@app.get("/get_answer_stream/{chat_id}")
-async def get_answer_stream(chat_id: str, user_email: str = Depends(_extract_token)):
-  async def message_stream():
-    REQUEST_COUNT.inc()
-    request_start_time = time.time()
+async def _answer_events(chat_id: str, after: int = 0):
+  """Yields the SSE events of a chat's current run, read from the answer broker."""
+  REQUEST_COUNT.inc()
+  request_start_time = time.time()
+  session = chat_sessions.get(chat_id)
+  # Keeps the run alive while the client is connected, if this replica runs it
+  with chat_sessions.watching(session):
     try:
-      timeout = 600
-      task_start_time = time.time()
-      while time.time() - task_start_time < timeout:
-        # Get message from the queue
-        queue = message_queues.get(chat_id)
-        if queue is None:
-          # Missing chat_id
-          break
-        answer_message_dict = await queue.get()
-        if answer_message_dict:
+      if session is not None and not session.opened.done():
+        # A follow-up queued behind the chat's current turn, its stream opens when it starts
+        await asyncio.wait([session.opened, session.completion], return_when=asyncio.FIRST_COMPLETED)
+        if not session.opened.done():
+          raise RuntimeError(f"Turn of chat {chat_id} ended with status {session.status} before it started")
+      # The broker serves the stream whichever replica runs the chat, to any number of readers
+      async for seq, answer_message_dict in answer_broker.subscribe(chat_id, after=after, idle_timeout=600):
+        if answer_message_dict and "queue_position" in answer_message_dict:
+          # The question is waiting for an execution slot, 0 once it starts running
+          yield {"id": seq, "event": "queue", "data": json.dumps(answer_message_dict)}
+        elif answer_message_dict and "delta" in answer_message_dict:
+          # Partial text of the answer being generated, superseded by the next "data" event of the same node
+          yield {"id": seq, "event": "delta", "data": json.dumps(answer_message_dict)}
+        elif answer_message_dict:
           logging.info(f"Retrieved answer message: {answer_message_dict}")
-          yield {"event": "data", "data": json.dumps(answer_message_dict)}
+          yield {"id": seq, "event": "data", "data": json.dumps(answer_message_dict)}
         else:
           logging.info("End of stream")
-          yield {"event": "end"}
+          yield {"id": seq, "event": "end"}
           break
       else:
-        logging.warning("Timed out")
-        yield {"event": "error", "data": json.dumps(JARVIS_UNAVAILABLE_MESSAGE)}
+        if after:
+          # Reconnected after the run had already ended
+          yield {"event": "end"}
+        else:
+          # No run for this chat, or it was replaced by a new question before it ended
+          logging.warning(f"Stream of chat {chat_id} ended without an answer")
+          yield {"event": "error", "data": json.dumps(JARVIS_UNAVAILABLE_MESSAGE)}
+    except asyncio.TimeoutError:
+      logging.warning("Timed out")
+      yield {"event": "error", "data": json.dumps(JARVIS_UNAVAILABLE_MESSAGE)}
     except Exception as e:
       logging.error(f"Error in get_answer_stream method: {traceback.format_exc()}")
       logging.error(f"{type(e).__name__}: {e}")
@@ -323,24 +453,96 @@ async def get_answer_stream(chat_id: str, user_email: str = Depends(_extract_tok
     finally:
       REQUEST_TIME.observe(time.time() - request_start_time)
 
-  return EventSourceResponse(message_stream())
+
+@app.get("/get_answer_stream/{chat_id}")
+async def get_answer_stream(request: Request, chat_id: str, user_email: str = Depends(_extract_token)):
+  # Set by EventSource when it reconnects, so the stream resumes after the last event the client got
+  last_event_id = request.headers.get("Last-Event-ID", "")
+  after = int(last_event_id) if last_event_id.isdigit() else 0
+  return EventSourceResponse(_answer_events(chat_id, after))
+
+
+def _admit(user_email: str) -> AdmissionTicket:
+  try:
+    return admission.admit(user_email)
+  except AdmissionRejected as e:
+    raise HTTPException(
+      status_code=429,
+      detail=f"Jarvis is busy, please try again later ({e.reason})",
+      headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+
+def _on_queue_position(session: ChatSession, position: int):
+  session.queue_position = position
+  # A turn queued behind the previous one doesn't have its stream yet
+  if session.opened.done():
+    _publish_queue_position(session.chat_id, position)
+
+
+async def _open_turn(session: ChatSession):
+  await answer_broker.reset(session.chat_id)
+  chat_sessions.open(session)
+  if session.queue_position:
+    _publish_queue_position(session.chat_id, session.queue_position)
+
+
+async def _run_turn(question: ChatBotQuestion, user_email: str, session: ChatSession):
+  if session.previous is not None:
+    # Runs on the same LangGraph thread would race on its checkpoints, so a follow-up waits for the turn before it
+    try:
+      await asyncio.shield(session.previous.completion)
+      await _open_turn(session)
+    except asyncio.CancelledError:
+      chat_sessions.complete(session, CANCELLED)
+      raise
+    except Exception:
+      chat_sessions.complete(session, FAILED)
+      raise
+  await task_submit_question(question, user_email, session)
+
+
+async def _start_question(question: ChatBotQuestion, user_email: str) -> ChatSession:
+  """
+  Starts a new turn of the chat in the background, or joins the run of an identical submission still in flight.
+
+  Raises:
+    HTTPException: 429 if the question is not admitted.
+  """
+  key = (user_email, question.question, tuple(question.user_files or ()))
+  session = chat_sessions.join(question.chat_id, key)
+  if session is not None:
+    logging.info(f"Joining the run in flight for the same question on chat {question.chat_id}")
+    return session
+  ticket = _admit(user_email)
+  try:
+    session = chat_sessions.start(question.chat_id, key)
+    session.queue_position = ticket.position
+    ticket.on_position = lambda position: _on_queue_position(session, position)
+    if session.previous is None:
+      await _open_turn(session)
+    chat_sessions.attach_run(
+      session, _spawn(admission.run(ticket, lambda: _run_turn(question, user_email, session)))
+    )
+    return session
+  except Exception:
+    admission.cancel(ticket)
+    raise
 
 
 @app.post("/submit_question")
 async def submit_question(
   request: Request,
   question: ChatBotQuestion,
-  background_tasks: BackgroundTasks,
   user_email: str = Depends(_extract_token),
 ):
   REQUEST_COUNT.inc()
   start_time = time.time()
   try:
-    task_status[question.chat_id] = "in progress"
-    message_queues[question.chat_id] = asyncio.Queue()
-    full_responses[question.chat_id] = []
-    background_tasks.add_task(task_submit_question, question, user_email)
-    return {"chat_id": question.chat_id, "suggestions": ""}
+    session = await _start_question(question, user_email)
+    return {"chat_id": question.chat_id, "suggestions": "", "queue_position": session.queue_position}
+  except HTTPException:
+    raise
   except Exception as e:
     logging.error(f"Error in submit_question method: {traceback.format_exc()}")
     logging.error(f"{type(e).__name__}: {e}")
@@ -352,6 +554,25 @@ async def submit_question(
     REQUEST_TIME.observe(time.time() - start_time)
 
 
+@app.post("/chat/stream")
+async def chat_stream(question: ChatBotQuestion, user_email: str = Depends(_extract_token)):
+  """Submits a question and streams its answer in the same request, with the events of /get_answer_stream."""
+  try:
+    # Rejections are still plain 429 responses, before the stream starts
+    await _start_question(question, user_email)
+  except HTTPException:
+    raise
+  except Exception as e:
+    logging.error(f"Error in chat_stream method: {traceback.format_exc()}")
+    logging.error(f"{type(e).__name__}: {e}")
+
+    async def error_stream():
+      yield {"event": "error", "data": json.dumps(JARVIS_UNAVAILABLE_MESSAGE)}
+
+    return EventSourceResponse(error_stream())
+  return EventSourceResponse(_answer_events(question.chat_id))
+
+
 @app.post("/submit_feedback")
 async def submit_feedback(
   feedback: Feedback,
@@ -421,56 +642,57 @@ async def get_projects():
     logging.info("Project names and UUIDs request processing time recorded")
 
 
-@app.get("/sandbox/configmap")
-async def sandbox_configmap_get(
-  name: str = None,
-  user_email: str = Depends(_extract_token),
-):
+def _user_sandbox(user_email: str) -> str:
   user_sandbox = "sandbox-" + user_email.split("@")[0]
   if user_sandbox == "sandbox-":
     raise HTTPException(status_code=400, detail="Invalid user email")
-  # proc = await asyncio.create_subprocess_exec("kubectl", "get", "cm", "--namespace", user_sandbox, stdout=PIPE, stderr=PIPE)
-  # out, err = await proc.communicate()
-  # if proc.returncode != 0:
-  #   raise HTTPException(status_code=400, detail="Error listing configmaps")
-  v1 = client.CoreV1Api()
-  if name is None or name == "":
-    try:
-      configmap_list = v1.list_namespaced_config_map(namespace=user_sandbox)
-      return configmap_list.to_dict()
-    except client.rest.ApiException as e:
-      logging.error(f"Error listing configmaps: {str(e)}")
-      raise HTTPException(status_code=400, detail="Error listing configmaps")
+  return user_sandbox
+
+
+async def _sandbox_get(
+  kind: str, user_email: str, name: str, label_selector: str, limit: int, continue_token: str
+) -> dict:
+  user_sandbox = _user_sandbox(user_email)
   try:
-    configmap = v1.read_namespaced_config_map(name=name, namespace=user_sandbox)
-    return configmap.to_dict()
+    cache = await SandboxCache.get_instance().cache(kind, user_sandbox)
   except client.rest.ApiException as e:
-    logging.error(f"Error listing configmaps: {str(e)}")
-    raise HTTPException(status_code=400, detail="Error listing configmaps")
+    logging.error(f"Error listing {kind}s: {str(e)}")
+    raise HTTPException(status_code=400, detail=f"Error listing {kind}s")
+  if name is None or name == "":
+    try:
+      return cache.list(label_selector=label_selector, limit=limit, continue_token=continue_token)
+    except InvalidContinueToken as e:
+      raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+      raise HTTPException(status_code=400, detail=str(e))
+  obj = cache.get(name)
+  if obj is None:
+    logging.error(f"Error reading {kind}: {name} not found in {user_sandbox}")
+    raise HTTPException(status_code=400, detail=f"Error reading {kind}")
+  return obj
+
+
+@app.get("/sandbox/configmap")
+async def sandbox_configmap_get(
+  name: str = None,
+  label_selector: str = Query(None, alias="labelSelector"),
+  limit: int = Query(None, ge=1),
+  continue_token: str = Query(None, alias="continue"),
+  user_email: str = Depends(_extract_token),
+):
+  # Served from the watch-backed cache of the sandbox namespace
+  return await _sandbox_get(CONFIGMAP, user_email, name, label_selector, limit, continue_token)
 
 
 @app.get("/sandbox/secret")
 async def sandbox_secret_get(
   name: str = None,
+  label_selector: str = Query(None, alias="labelSelector"),
+  limit: int = Query(None, ge=1),
+  continue_token: str = Query(None, alias="continue"),
   user_email: str = Depends(_extract_token),
 ):
-  user_sandbox = "sandbox-" + user_email.split("@")[0]
-  if user_sandbox == "sandbox-":
-    raise HTTPException(status_code=400, detail="Invalid user email")
-  v1 = client.CoreV1Api()
-  if name is None or name == "":
-    try:
-      secret_list = v1.list_namespaced_secret(namespace=user_sandbox)
-      return secret_list.to_dict()
-    except client.rest.ApiException as e:
-      logging.error(f"Error listing secrets: {str(e)}")
-      raise HTTPException(status_code=400, detail="Error listing secrets")
-  try:
-    secret = v1.read_namespaced_secret(name=name, namespace=user_sandbox)
-    return secret.to_dict()
-  except client.rest.ApiException as e:
-    logging.error(f"Error reading secret: {str(e)}")
-    raise HTTPException(status_code=400, detail="Error reading secret")
+  return await _sandbox_get(SECRET, user_email, name, label_selector, limit, continue_token)
 
 
 @app.post("/sandbox/configmap")
@@ -478,12 +700,9 @@ async def sandbox_configmap_post(
   configmap: dict,
   user_email: str = Depends(_extract_token),
 ):
-  user_sandbox = "sandbox-" + user_email.split("@")[0]
-  if user_sandbox == "sandbox-":
-    raise HTTPException(status_code=400, detail="Invalid user email")
-  v1 = client.CoreV1Api()
+  user_sandbox = _user_sandbox(user_email)
   name = configmap["metadata"]["name"]
-  v1.replace_namespaced_config_map(name=name, namespace=user_sandbox, body=configmap)
+  await SandboxCache.get_instance().replace(CONFIGMAP, user_sandbox, name, configmap)
 
 
 @app.post("/sandbox/secret")
@@ -491,18 +710,85 @@ async def sandbox_secret_post(
   secret: dict,
   user_email: str = Depends(_extract_token),
 ):
-  user_sandbox = "sandbox-" + user_email.split("@")[0]
-  if user_sandbox == "sandbox-":
-    raise HTTPException(status_code=400, detail="Invalid user email")
-  v1 = client.CoreV1Api()
+  user_sandbox = _user_sandbox(user_email)
   name = secret["metadata"]["name"]
-  v1.replace_namespaced_secret(name=name, namespace=user_sandbox, body=secret)
+  await SandboxCache.get_instance().replace(SECRET, user_sandbox, name, secret)
+
 
+async def _process_jira_events(payloads: list):
+  """
+  Runs the agent on Jira webhook events accepted by the webhook queue.
+
+  The event is filtered by `process_jira_webhook`. For an issue assigned to Jarvis, the issue is first commented,
+  labelled and transitioned by `_run_webhook_actions`. The agent's answers to the issue or comment are then
+  added to the issue as comments. Comments made on an issue within the debounce window come as several
+  payloads, and are asked of the agent together by `process_jira_comments`.
+
+  Args:
+    payloads (list): The webhook bodies, several only for debounced comments of one issue.
+  """
+  jira_payloads = [JiraPayload(**payload) for payload in payloads]
+  for payload in payloads:
+    # Seeds the user directory with the users the payload embeds, e.g. the comment author and the assignee
+    JiraUserDirectory.get_instance().warm(payload)
+  if len(jira_payloads) > 1:
+    issue_key, llm_question, issue_event_type_name = await process_jira_comments(jira_payloads)
+  else:
+    issue_key, llm_question, issue_event_type_name = await process_jira_webhook(jira_payloads[0])
+  logging.info(f"Issue Key: {issue_key}")
+  logging.info(f"LLM Question: {llm_question}")
+  logging.info(f"Issue Event Type name: {issue_event_type_name}")
+
+  if not (issue_key and llm_question and issue_event_type_name):
+    logging.info("[Jira Webhook] Skipping further processing of webhook payload")
+    return
+
+  logging.info(f"Issue Key: {issue_key}, LLM Question: {llm_question}")
+  # Events of one issue are processed in order by the webhook queue, so they can share the issue's thread
+  thread_id = issue_key
+
+  # The fixed steps of the event (comment, label and transition on assignment) are plain Jira calls, they run
+  # alongside the reporter lookup and only the question goes through the agent
+  # The issue_assigned payload carries the reporter, comment payloads don't and it's fetched with the issue
+  reporter = jira_payloads[-1].issue.fields.reporter
+  reporter_email, _ = await asyncio.gather(
+    _get_jira_reporter_email(issue_key, reporter.accountId if reporter else None),
+    _run_webhook_actions(issue_event_type_name, issue_key, jira_payloads[-1]),
+  )
+
+  llm_question = f"{llm_question} (asked by user_email: {reporter_email} on Jira Issue ID: {issue_key})"
+  logging.info(f"LLM Question: {llm_question}")
+
+  async for message in jarvis_agent.interact(
+    human_message=llm_question, thread_id=thread_id, user_email=reporter_email
+  ):
+    logging.info(f"LLM response: {message}")
+    if message:
+      message_answer = message.get("answer")
+      message_metadata = message.get("metadata")
+      markdown_string = f"{message_answer}\n" if message_answer else ""
+      jira_comment = (
+        await jira_comment_body_adf(message)
+        if message_metadata and message_metadata.get("user_input", True)
+        else markdown_string
+      )
+      if jira_comment and jira_comment != llm_question:
+        await _add_jira_comment(issue_key, jira_comment)
 
-@app.post("/jira/webhook")
+
+# Jira webhook events are processed in the background, in order per issue (JARVIS_JIRA_WEBHOOK_*). Bursts of
+# comments on an issue are debounced into a single run
+jira_webhooks = JiraWebhookQueue.from_env(
+  _process_jira_events,
+  _postgres_conninfo() if LANGGRAPH_CHECKPOINT_MEMORY_SAVER == "postgres" else None,
+  debounce=lambda payload: payload.get("webhookEvent") == "comment_created",
+)
+
+
+@app.post("/jira/webhook", status_code=202)
 async def webhook(request: Request):
   """
-  Handle incoming webhook requests, verify their authenticity, and process the payload.
+  Handle incoming webhook requests, verify their authenticity, and queue the event for processing.
 
   This function performs the following steps:
   1. Logs the received request URL and headers.
@@ -510,25 +796,23 @@ async def webhook(request: Request):
   3. Checks for the `x-hub-signature` header in the request.
   4. Computes the HMAC SHA256 signature of the request body using the `JIRA_WEBHOOK_SECRET`.
   5. Compares the computed signature with the `x-hub-signature` header to verify authenticity.
-  6. If the signatures match, processes the webhook payload:
-     - Parses the JSON payload.
-     - Extracts the issue key and LLM question from the payload.
-     - Comments on the Jira ticket indicating that processing has started.
-     - Interacts with the Jarvis Agent to get responses based on the LLM question.
-     - Comments on the Jira ticket with the responses from the Jarvis Agent.
+  6. If the signatures match, parses and validates the JSON payload and submits it to the webhook queue, which
+     processes it with `_process_jira_events` after the response is sent. Deliveries are identified by the
+     `x-atlassian-webhook-identifier` header, which Jira keeps on retries, or else by a hash of the body.
   7. If the signatures do not match, logs an error and raises an HTTP 400 exception.
 
   Args:
     request (Request): The incoming HTTP request object.
 
   Returns:
-    dict: A dictionary with a status key indicating the result of the processing.
+    dict: A dictionary with a status key, `accepted`, `duplicate` or `ignored`.
 
   Raises:
     HTTPException: If the `JIRA_WEBHOOK_SECRET` environment variable is not set.
     HTTPException: If the `x-hub-signature` header is missing.
     HTTPException: If the `x-hub-signature` is invalid.
     HTTPException: If the payload is invalid.
+    HTTPException: If the webhook queue is full or not started yet, with a Retry-After header.
   """
   logging.debug(f"Received webhook request: {request.url}")
   headers = dict(request.headers)
@@ -553,69 +837,46 @@ async def webhook(request: Request):
 
   logging.debug(f"Computed signature: {computed_signature}")
 
-  if hmac.compare_digest(computed_signature, x_hub_signature):
-    try:
-      payload = await request.json()
-      # logging.debug(f"Webhook payload: {json.dumps(payload, indent=2)}")
-      issue_key, llm_question, issue_event_type_name = await process_jira_webhook(JiraPayload(**payload))
-      logging.info(f"Issue Key: {issue_key}")
-      logging.info(f"LLM Question: {llm_question}")
-      logging.info(f"Issue Event Type name: {issue_event_type_name}")
-
-      if issue_key and llm_question and issue_event_type_name:
-        logging.info(f"Issue Key: {issue_key}, LLM Question: {llm_question}")
-        # Create a unique thread ID for jira webhook event.
-        # Timestamp is used to ensure uniqueness in case of multiple events for the same issue key.
-        thread_id = issue_key
-
-        reporter_email = await _get_jira_reporter_email(issue_key)
-
-        if issue_event_type_name == "issue_assigned":
-          prompts = [
-            f"Add comment to Jira {issue_key} asked by user_email: {reporter_email}: ⏳ Jarvis AI Agent is processing...",
-            f"Add label to Jira {issue_key} asked by user_email: {reporter_email}: JARVIS_AGENT_AT_WORK",
-            f"Transition Jira {issue_key} asked by user_email: {reporter_email}: If Jira project key is OPENSD transition to Acknowledge otherwise transition to In-Progress",
-          ]
-
-          for prompt in prompts:
-            try:
-              async for message in jarvis_agent.interact(
-                human_message=prompt, thread_id=thread_id, user_email=reporter_email
-              ):
-                logging.info(f"LLM response: {message}")
-            except Exception as e:
-              logging.error(f"Error processing webhook prompts: {str(e)}")
-              pass
-
-        llm_question = f"{llm_question} (asked by user_email: {reporter_email} on Jira Issue ID: {issue_key})"
-        logging.info(f"LLM Question: {llm_question}")
-
-        async for message in jarvis_agent.interact(
-          human_message=llm_question, thread_id=thread_id, user_email=reporter_email
-        ):
-          logging.info(f"LLM response: {message}")
-          if message:
-            message_answer = message.get("answer")
-            message_metadata = message.get("metadata")
-            markdown_string = f"{message_answer}\n" if message_answer else ""
-            jira_comment = (
-              await jira_comment_body_adf(message)
-              if message_metadata and message_metadata.get("user_input", True)
-              else markdown_string
-            )
-            if jira_comment and jira_comment != llm_question:
-              await _add_jira_comment(issue_key, jira_comment)
-      else:
-        logging.info("[Jira Webhook] Skipping further processing of webhook payload")
-    except Exception as e:
-      logging.error(f"Error parsing webhook payload: {str(e)}")
-      raise HTTPException(status_code=400, detail="Invalid payload")
-    return {"status": "ok"}
-  else:
+  if not hmac.compare_digest(computed_signature, x_hub_signature):
     logging.error("Invalid x-hub-signature")
     raise HTTPException(status_code=400, detail="Invalid x-hub-signature")
 
+  try:
+    payload = json.loads(body)
+    jira_payload = JiraPayload(**payload)
+  except Exception as e:
+    logging.error(f"Error parsing webhook payload: {str(e)}")
+    raise HTTPException(status_code=400, detail="Invalid payload")
+  if jira_payload.issue is None:
+    logging.info("[Jira Webhook] Skipping webhook payload without an issue")
+    return {"status": "ignored"}
+
+  delivery_id = headers.get("x-atlassian-webhook-identifier") or hashlib.sha256(body).hexdigest()
+  try:
+    accepted = await jira_webhooks.submit(delivery_id, jira_payload.get_issue_key(), payload)
+  except WebhookRejected as e:
+    raise HTTPException(
+      status_code=503,
+      detail=f"Jira webhook queue is unavailable ({e.reason})",
+      headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+  except Exception as e:
+    # Not acknowledged, so Jira delivers it again
+    logging.error(f"Failed to queue Jira webhook event {delivery_id}: {str(e)}")
+    raise HTTPException(status_code=503, detail="Failed to queue the webhook event")
+  return {"status": "accepted" if accepted else "duplicate"}
+
 
 @app.get("/healthz")
 async def healthz():
+  # A failed critical startup step used to crash the process, failing liveness restarts the pod instead
+  if startup.error is not None:
+    return JSONResponse(status_code=503, content={"status": "failed", "error": str(startup.error)})
   return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+  if not startup.ready.is_set():
+    return JSONResponse(status_code=503, content={"status": "starting", "steps": startup.status()})
+  return {"status": "ready", "steps": startup.status()}
@@ -61,7 +61,10 @@ corresponding and input fields""",
 
 
 class SupervisorAction(BaseModel):
-  action: RouterNextActions = Field(description="The action you will take to service the user")
+  actions: List[RouterNextActions] = Field(
+    description="""The actions you will take to service the user. Return several actions only when the request has \
+independent parts handled by different agents, otherwise return a single action.""",
+  )
 
 
 class K8sSupervisorAction(BaseModel):
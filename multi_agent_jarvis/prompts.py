@@ -14,6 +14,8 @@ sys_msg_supervisor = SystemMessage(
 
 Supervisor LLM Instructions:
 - Use defaults where possible.
+- If the request has independent parts for different agents (for example on-call and Jira tickets), choose all of \
+their actions so they run in parallel. Otherwise choose a single action.
 - DO NOT CREATE Service Desk tickets unless it is explicitly requested.
 - On Platform docs, after receiving tool output, do not reprocess the output of the tool, return the output as is.
 
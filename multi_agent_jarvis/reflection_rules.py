@@ -0,0 +1,106 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import hashlib
+from typing import Callable, NamedTuple, Optional
+from prometheus_client import Counter
+from langchain_core.messages import AIMessage, SystemMessage
+
+from multi_agent_jarvis.setup_logging import logging
+from multi_agent_jarvis.state import AgentState
+
+REFLECTION_DECISIONS = Counter(
+  "jarvis_reflection_decisions_total",
+  "Reflection decisions by the rule (or llm) that made them",
+  ["rule", "should_continue"],
+)
+
+
+class ReflectionDecision(NamedTuple):
+  rule: str
+  should_continue: bool
+  reason: str
+
+
+def _message_fingerprint(message) -> str:
+  payload = {
+    "type": message.type,
+    "content": message.content,
+    "tool_calls": [{"name": t["name"], "args": t["args"]} for t in getattr(message, "tool_calls", None) or []],
+  }
+  return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def loop_budget_exhausted(state: AgentState) -> Optional[ReflectionDecision]:
+  """Stop once reflection has sent the turn back to the supervisor JARVIS_REFLECTION_MAX_LOOPS times; 0 never does."""
+  max_loops = int(os.getenv("JARVIS_REFLECTION_MAX_LOOPS", "2"))
+  if (state.get("reflection_loops") or 0) >= max_loops:
+    return ReflectionDecision("loop_budget_exhausted", False, "The turn used up its reflection loops.")
+  return None
+
+
+def user_input_required(state: AgentState) -> Optional[ReflectionDecision]:
+  """Stop when the last agent response asks the user for input."""
+  metadata = state.get("metadata") or []
+  if metadata and metadata[-1].user_input:
+    return ReflectionDecision("user_input_required", False, "The agent is waiting for user input.")
+  return None
+
+
+def loop_detected(state: AgentState) -> Optional[ReflectionDecision]:
+  """Stop when the last agent message repeats an earlier one anywhere in the message window."""
+  messages = [m for m in state["messages"] if not isinstance(m, SystemMessage)]
+  if len(messages) < 2:
+    return None
+  last_fingerprint = _message_fingerprint(messages[-1])
+  if any(_message_fingerprint(m) == last_fingerprint for m in messages[:-1] if m.type == messages[-1].type):
+    return ReflectionDecision("loop_detected", False, "The agent repeated a previous response.")
+  return None
+
+
+def final_answer(state: AgentState) -> Optional[ReflectionDecision]:
+  """
+  Stop when the agent returned a final answer without requesting any tool calls. Task agents end almost every
+  turn that way, so the rule leaves reflection nothing to decide and is off unless
+  JARVIS_REFLECTION_STOP_ON_FINAL_ANSWER=true.
+  """
+  if os.getenv("JARVIS_REFLECTION_STOP_ON_FINAL_ANSWER", "false").lower() != "true":
+    return None
+  last_message = state["messages"][-1] if state["messages"] else None
+  if isinstance(last_message, AIMessage) and last_message.content and not last_message.tool_calls:
+    return ReflectionDecision("final_answer", False, "The agent returned a final answer.")
+  return None
+
+
+# Rules are evaluated in order; the first one that returns a decision wins.
+REFLECTION_RULES: list[Callable[[AgentState], Optional[ReflectionDecision]]] = [
+  loop_budget_exhausted,
+  user_input_required,
+  loop_detected,
+  final_answer,
+]
+
+
+def evaluate_reflection_rules(state: AgentState) -> Optional[ReflectionDecision]:
+  """
+  Decides whether the graph should continue from the state alone.
+
+  Args:
+    state (AgentState): The current graph state.
+
+  Returns:
+    ReflectionDecision: The decision of the first matching rule, or None if the reflection LLM must decide.
+  """
+  for rule in REFLECTION_RULES:
+    decision = rule(state)
+    if decision is not None:
+      logging.info(f"Reflection rule '{decision.rule}' decided should_continue={decision.should_continue}")
+      record_reflection_decision(decision)
+      return decision
+  return None
+
+
+def record_reflection_decision(decision: ReflectionDecision):
+  REFLECTION_DECISIONS.labels(rule=decision.rule, should_continue=str(decision.should_continue).lower()).inc()
@@ -0,0 +1,361 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import time
+import base64
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional
+from kubernetes import client, watch
+from prometheus_client import Counter, Gauge
+
+from multi_agent_jarvis.setup_logging import logging
+
+SANDBOX_CACHE_REQUESTS = Counter(
+  "jarvis_sandbox_cache_requests_total", "Sandbox reads by kind and whether the cache was warm", ["kind", "outcome"]
+)
+SANDBOX_CACHE_NAMESPACES = Gauge("jarvis_sandbox_cache_namespaces", "Sandbox namespace caches being watched", ["kind"])
+SANDBOX_WATCH_RESTARTS = Counter(
+  "jarvis_sandbox_watch_restarts_total", "Sandbox watch restarts by kind and reason", ["kind", "reason"]
+)
+
+CONFIGMAP = "configmap"
+SECRET = "secret"
+
+_LIST_KINDS = {CONFIGMAP: "ConfigMapList", SECRET: "SecretList"}
+
+
+class InvalidContinueToken(ValueError):
+  """Raised when a `continue` token was not issued by the cache."""
+
+
+def _parse_label_selector(selector: str) -> list:
+  """
+  Parses a Kubernetes label selector into (key, operator, values) requirements.
+
+  Supports `k=v`, `k==v`, `k!=v`, `k in (a,b)`, `k notin (a,b)`, `k` and `!k`.
+  """
+  requirements = []
+  parts, depth, current = [], 0, ""
+  for char in selector:
+    if char == "," and depth == 0:
+      parts.append(current)
+      current = ""
+      continue
+    depth += {"(": 1, ")": -1}.get(char, 0)
+    current += char
+  parts.append(current)
+  for part in (p.strip() for p in parts):
+    if not part:
+      continue
+    if " notin " in part or " in " in part:
+      operator = "notin" if " notin " in part else "in"
+      key, values = part.split(f" {operator} ", 1)
+      values = values.strip()
+      if not (values.startswith("(") and values.endswith(")")):
+        raise ValueError(f"Invalid label selector requirement: {part}")
+      requirements.append((key.strip(), operator, {v.strip() for v in values[1:-1].split(",")}))
+    elif "!=" in part:
+      key, value = part.split("!=", 1)
+      requirements.append((key.strip(), "!=", {value.strip()}))
+    elif "=" in part:
+      key, value = part.split("==", 1) if "==" in part else part.split("=", 1)
+      requirements.append((key.strip(), "=", {value.strip()}))
+    elif part.startswith("!"):
+      requirements.append((part[1:].strip(), "!exists", set()))
+    else:
+      requirements.append((part, "exists", set()))
+  return requirements
+
+
+def _matches(labels: Optional[dict], requirements: list) -> bool:
+  labels = labels or {}
+  for key, operator, values in requirements:
+    if operator == "=" or operator == "in":
+      if labels.get(key) not in values:
+        return False
+    elif operator == "!=" or operator == "notin":
+      if key in labels and labels[key] in values:
+        return False
+    elif operator == "exists":
+      if key not in labels:
+        return False
+    elif key in labels:
+      return False
+  return True
+
+
+def _newer(resource_version: Optional[str], than: Optional[str]) -> bool:
+  # resourceVersions are opaque, but etcd-backed API servers hand out increasing integers
+  try:
+    return int(resource_version) >= int(than)
+  except (TypeError, ValueError):
+    return True
+
+
+class SandboxResourceCache:
+  """
+  In-memory copy of the ConfigMaps or Secrets of one sandbox namespace, kept current by a watch.
+
+  The initial list records the collection's resourceVersion and the watch resumes from it, so no change is
+  missed between the two. The watch runs in its own thread with bookmarks enabled, and relists when the API
+  server reports its resourceVersion as expired (410 Gone).
+
+  Attributes:
+    kind (str): `configmap` or `secret`.
+    namespace (str): The sandbox namespace.
+    resource_version (str): resourceVersion of the collection the cache reflects.
+    last_access (float): Monotonic time of the last read, used to stop the watch of idle namespaces.
+  """
+
+  def __init__(self, api: client.CoreV1Api, kind: str, namespace: str, watch_timeout: int = 300):
+    self.api = api
+    self.kind = kind
+    self.namespace = namespace
+    self.watch_timeout = watch_timeout
+    self.resource_version = None
+    self.last_access = time.monotonic()
+    self._list = api.list_namespaced_config_map if kind == CONFIGMAP else api.list_namespaced_secret
+    self._objects: dict[str, dict] = {}
+    self._lock = threading.Lock()
+    self._stopped = threading.Event()
+    self._watch = None
+    self._thread = None
+
+  def _relist(self):
+    object_list = self._list(namespace=self.namespace)
+    objects = {item.metadata.name: item.to_dict() for item in object_list.items}
+    with self._lock:
+      self._objects = objects
+      self.resource_version = object_list.metadata.resource_version
+
+  def start(self):
+    """Lists the namespace and starts the watch. Blocking, raises the ApiException of the initial list."""
+    self._relist()
+    self._thread = threading.Thread(
+      target=self._watch_loop, name=f"sandbox-watch-{self.kind}-{self.namespace}", daemon=True
+    )
+    self._thread.start()
+
+  def stop(self):
+    self._stopped.set()
+    if self._watch is not None:
+      self._watch.stop()
+
+  def _apply(self, event_type: str, obj: dict):
+    name = obj["metadata"]["name"]
+    resource_version = obj["metadata"].get("resource_version")
+    with self._lock:
+      current = self._objects.get(name)
+      # A write through the cache may already hold a newer version than this event
+      if current is not None and not _newer(resource_version, current["metadata"].get("resource_version")):
+        return
+      if event_type == "DELETED":
+        self._objects.pop(name, None)
+      else:
+        self._objects[name] = obj
+      self.resource_version = resource_version
+
+  def put(self, obj: dict):
+    """Writes the object returned by a successful update into the cache, ahead of its watch event."""
+    self._apply("MODIFIED", obj)
+
+  def _watch_loop(self):
+    backoff = 1
+    while not self._stopped.is_set():
+      try:
+        if self.resource_version is None:
+          self._relist()
+        self._watch = watch.Watch()
+        for event in self._watch.stream(
+          self._list,
+          namespace=self.namespace,
+          resource_version=self.resource_version,
+          allow_watch_bookmarks=True,
+          timeout_seconds=self.watch_timeout,
+        ):
+          if event["type"] == "ERROR":
+            if event["raw_object"].get("code") == 410:
+              raise client.rest.ApiException(status=410, reason="Gone")
+            raise client.rest.ApiException(reason=str(event["raw_object"]))
+          if event["type"] == "BOOKMARK":
+            self.resource_version = event["raw_object"]["metadata"]["resourceVersion"]
+            continue
+          self._apply(event["type"], event["object"].to_dict())
+        backoff = 1
+      except client.rest.ApiException as e:
+        if e.status == 410:
+          # The API server no longer has our resourceVersion, only a relist can catch up
+          SANDBOX_WATCH_RESTARTS.labels(kind=self.kind, reason="expired").inc()
+          self.resource_version = None
+          continue
+        SANDBOX_WATCH_RESTARTS.labels(kind=self.kind, reason="error").inc()
+        logging.error(f"Error watching {self.kind}s in {self.namespace}: {e}")
+        self._stopped.wait(backoff)
+        backoff = min(backoff * 2, 60)
+      except Exception as e:
+        SANDBOX_WATCH_RESTARTS.labels(kind=self.kind, reason="error").inc()
+        logging.error(f"Error watching {self.kind}s in {self.namespace}: {e}")
+        self._stopped.wait(backoff)
+        backoff = min(backoff * 2, 60)
+
+  def get(self, name: str) -> Optional[dict]:
+    self.last_access = time.monotonic()
+    with self._lock:
+      return self._objects.get(name)
+
+  def list(self, label_selector: str = None, limit: int = None, continue_token: str = None) -> dict:
+    """
+    Lists the cached objects in name order, in the shape of the API's `to_dict()` list.
+
+    Raises:
+      ValueError: If the label selector can't be parsed.
+      InvalidContinueToken: If the continue token was not issued by this cache.
+    """
+    self.last_access = time.monotonic()
+    requirements = _parse_label_selector(label_selector) if label_selector else []
+    start_after = None
+    if continue_token:
+      try:
+        start_after = json.loads(base64.urlsafe_b64decode(continue_token.encode()))["start_after"]
+      except Exception:
+        raise InvalidContinueToken(f"Invalid continue token: {continue_token}")
+    with self._lock:
+      resource_version = self.resource_version
+      items = [
+        obj
+        for name, obj in sorted(self._objects.items())
+        if (start_after is None or name > start_after) and _matches(obj["metadata"].get("labels"), requirements)
+      ]
+    next_token, remaining = None, None
+    if limit and len(items) > limit:
+      remaining = len(items) - limit
+      items = items[:limit]
+      next_token = base64.urlsafe_b64encode(
+        json.dumps({"start_after": items[-1]["metadata"]["name"], "resource_version": resource_version}).encode()
+      ).decode()
+    return {
+      "api_version": "v1",
+      "items": items,
+      "kind": _LIST_KINDS[self.kind],
+      "metadata": {"_continue": next_token, "remaining_item_count": remaining, "resource_version": resource_version},
+    }
+
+
+class SandboxCache:
+  """
+  Shared Kubernetes client for the sandbox endpoints, with a watch-backed cache per sandbox namespace and kind.
+
+  Kubernetes calls go through one CoreV1Api and run in worker threads, so they never block the event loop.
+  Caches are created on the first read of a namespace and stopped once unread for `idle_seconds`, or when the
+  least recently read one is beyond `max_namespaces`, since each holds a watch connection and a thread.
+
+  Attributes:
+    max_namespaces (int): Maximum number of namespace caches per kind.
+    idle_seconds (float): Seconds without a read after which a namespace cache is stopped, 0 to keep it.
+  """
+
+  _instance = None
+
+  def __init__(self, max_namespaces: int = 64, idle_seconds: float = 1800):
+    self.max_namespaces = max_namespaces
+    self.idle_seconds = idle_seconds
+    self._api = None
+    self._caches: OrderedDict[tuple, SandboxResourceCache] = OrderedDict()
+    self._starting: dict[tuple, asyncio.Future] = {}
+
+  @classmethod
+  def get_instance(cls) -> "SandboxCache":
+    if cls._instance is None:
+      cls._instance = cls(
+        max_namespaces=int(os.getenv("JARVIS_SANDBOX_CACHE_NAMESPACES", "64")),
+        idle_seconds=float(os.getenv("JARVIS_SANDBOX_CACHE_IDLE_SECONDS", "1800")),
+      )
+    return cls._instance
+
+  @property
+  def api(self) -> client.CoreV1Api:
+    # Created on first use, after the lifespan has loaded the kubeconfig
+    if self._api is None:
+      self._api = client.CoreV1Api(client.ApiClient())
+    return self._api
+
+  def _update_gauge(self, kind: str):
+    SANDBOX_CACHE_NAMESPACES.labels(kind=kind).set(sum(1 for k in self._caches if k[0] == kind))
+
+  def evict_idle(self):
+    """Stops the caches of the namespaces that haven't been read for `idle_seconds`."""
+    if self.idle_seconds <= 0:
+      return
+    deadline = time.monotonic() - self.idle_seconds
+    idle = [key for key, cache in self._caches.items() if cache.last_access < deadline]
+    for key in idle:
+      logging.info(f"Stopping the idle {key[0]} cache of {key[1]}")
+      self._caches.pop(key).stop()
+    for kind in {key[0] for key in idle}:
+      self._update_gauge(kind)
+
+  async def cache(self, kind: str, namespace: str) -> SandboxResourceCache:
+    """
+    Returns the cache of a namespace, listing it and starting its watch on first use.
+
+    Raises:
+      kubernetes.client.rest.ApiException: If the initial list fails.
+    """
+    self.evict_idle()
+    key = (kind, namespace)
+    cache = self._caches.get(key)
+    if cache is not None:
+      self._caches.move_to_end(key)
+      SANDBOX_CACHE_REQUESTS.labels(kind=kind, outcome="hit").inc()
+      return cache
+    SANDBOX_CACHE_REQUESTS.labels(kind=kind, outcome="miss").inc()
+    # Concurrent first reads of a namespace share one initial list
+    starting = self._starting.get(key)
+    if starting is not None:
+      return await asyncio.shield(starting)
+    starting = self._starting[key] = asyncio.get_running_loop().create_future()
+    try:
+      cache = SandboxResourceCache(self.api, kind, namespace)
+      await asyncio.to_thread(cache.start)
+      self._caches[key] = cache
+      while sum(1 for k in self._caches if k[0] == kind) > self.max_namespaces:
+        victim = next(k for k in self._caches if k[0] == kind)
+        self._caches.pop(victim).stop()
+      self._update_gauge(kind)
+      starting.set_result(cache)
+      return cache
+    except asyncio.CancelledError:
+      starting.cancel()
+      raise
+    except Exception as e:
+      starting.set_exception(e)
+      # Marks the exception as retrieved when nobody else was waiting
+      starting.exception()
+      raise
+    finally:
+      del self._starting[key]
+
+  async def replace(self, kind: str, namespace: str, name: str, body: dict) -> dict:
+    """Replaces an object, then writes the result into the namespace's cache if there is one."""
+    replace = self.api.replace_namespaced_config_map if kind == CONFIGMAP else self.api.replace_namespaced_secret
+    updated = await asyncio.to_thread(replace, name=name, namespace=namespace, body=body)
+    updated = updated.to_dict()
+    cache = self._caches.get((kind, namespace))
+    if cache is not None:
+      cache.put(updated)
+    return updated
+
+  @classmethod
+  async def close(cls):
+    if cls._instance is None:
+      return
+    for cache in cls._instance._caches.values():
+      cache.stop()
+    cls._instance._caches.clear()
+    if cls._instance._api is not None:
+      await asyncio.to_thread(cls._instance._api.api_client.close)
+    cls._instance = None
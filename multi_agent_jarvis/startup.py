@@ -0,0 +1,255 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Iterable, Optional
+from prometheus_client import Counter, Gauge
+
+from multi_agent_jarvis.setup_logging import logging
+
+STARTUP_STEP_SECONDS = Gauge(
+  "jarvis_startup_step_seconds", "Seconds each startup step took, from start to end", ["step", "status"]
+)
+STARTUP_STEP_WAIT_SECONDS = Gauge(
+  "jarvis_startup_step_wait_seconds", "Seconds each startup step waited for its dependencies and a slot", ["step"]
+)
+STARTUP_SECONDS = Gauge("jarvis_startup_seconds", "Seconds from process start until ready")
+STARTUP_READY = Gauge("jarvis_startup_ready", "1 once every critical startup step has completed")
+BOOTSTRAP_PROJECTS = Counter(
+  "jarvis_startup_bootstrap_projects_total", "Project bootstraps at startup by outcome", ["outcome"]
+)
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class StartupStep:
+  """
+  One step of the startup pipeline.
+
+  Attributes:
+    name (str): Step name, used by other steps to depend on it and as the metrics label.
+    run (Callable[[], Awaitable]): The work of the step.
+    depends_on (tuple): Names of the steps that must have ended before this one starts.
+    critical (bool): Whether the service is not ready without this step. A failed non-critical step is logged
+      and its dependents still run; a failed critical step fails the dependents and the pipeline.
+  """
+
+  def __init__(self, name: str, run: Callable[[], Awaitable], depends_on: Iterable[str] = (), critical: bool = True):
+    self.name = name
+    self.run = run
+    self.depends_on = tuple(depends_on)
+    self.critical = critical
+    self.status = None
+    self.seconds = None
+
+
+class StartupPipeline:
+  """
+  Runs the startup steps as soon as their dependencies have ended, at most `max_concurrency` at a time.
+
+  `ready` is set once every critical step has succeeded, which is what /readyz reports; non-critical steps
+  may still be running at that point.
+  """
+
+  def __init__(self, max_concurrency: int = 4):
+    self.max_concurrency = max_concurrency
+    self.steps: dict[str, StartupStep] = {}
+    self.ready = asyncio.Event()
+    self.error: Optional[BaseException] = None
+    self._done: dict[str, asyncio.Future] = {}
+    self._started_at = time.monotonic()
+
+  @classmethod
+  def from_env(cls) -> "StartupPipeline":
+    return cls(max_concurrency=int(os.getenv("JARVIS_STARTUP_CONCURRENCY", "4")))
+
+  def add(self, name: str, run: Callable[[], Awaitable], depends_on: Iterable[str] = (), critical: bool = True):
+    self.steps[name] = StartupStep(name, run, depends_on, critical)
+
+  async def _run_step(self, step: StartupStep, semaphore: asyncio.Semaphore):
+    queued_at = time.monotonic()
+    try:
+      for dependency in step.depends_on:
+        await self._done[dependency]
+      async with semaphore:
+        STARTUP_STEP_WAIT_SECONDS.labels(step=step.name).set(time.monotonic() - queued_at)
+        start = time.monotonic()
+        logging.info(f"Startup step {step.name} started")
+        try:
+          await step.run()
+          step.status = SUCCEEDED
+        except Exception:
+          step.status = FAILED
+          raise
+        finally:
+          step.seconds = time.monotonic() - start
+          STARTUP_STEP_SECONDS.labels(step=step.name, status=step.status).set(step.seconds)
+          logging.info(f"Startup step {step.name} {step.status} in {step.seconds:.2f}s")
+    except Exception as e:
+      if step.status is None:
+        # A critical dependency failed, so this step never ran
+        step.status = SKIPPED
+        STARTUP_STEP_SECONDS.labels(step=step.name, status=step.status).set(0)
+      if step.critical:
+        if step.status == FAILED:
+          logging.error(f"Critical startup step {step.name} failed: {e}")
+        self._done[step.name].set_exception(e)
+        raise
+      logging.error(f"Non-critical startup step {step.name} failed: {e}")
+    self._done[step.name].set_result(step.status)
+
+  async def run(self):
+    """
+    Runs every step, then returns once they have all ended.
+
+    Raises:
+      Exception: The error of the first critical step that failed.
+    """
+    unknown = {d for step in self.steps.values() for d in step.depends_on if d not in self.steps}
+    if unknown:
+      raise ValueError(f"Startup steps depend on unknown steps: {unknown}")
+    loop = asyncio.get_running_loop()
+    self._done = {name: loop.create_future() for name in self.steps}
+    semaphore = asyncio.Semaphore(self.max_concurrency)
+    critical = [self._done[name] for name, step in self.steps.items() if step.critical]
+
+    async def mark_ready():
+      try:
+        await asyncio.gather(*critical)
+      except Exception:
+        return
+      STARTUP_SECONDS.set(time.monotonic() - self._started_at)
+      STARTUP_READY.set(1)
+      self.ready.set()
+      logging.info(f"Ready after {time.monotonic() - self._started_at:.2f}s")
+
+    ready_task = asyncio.create_task(mark_ready())
+    results = await asyncio.gather(
+      *[self._run_step(step, semaphore) for step in self.steps.values()], return_exceptions=True
+    )
+    for future in self._done.values():
+      # Retrieve the exceptions of critical steps nobody depended on
+      if future.done() and not future.cancelled():
+        future.exception()
+    errors = [r for r in results if isinstance(r, BaseException)]
+    await ready_task
+    if errors:
+      self.error = errors[0]
+      raise self.error
+
+  def status(self) -> dict:
+    return {
+      name: {"status": step.status or "pending", "seconds": step.seconds, "critical": step.critical}
+      for name, step in self.steps.items()
+    }
+
+
+class BootstrapStateStore:
+  """
+  Persists the content hash of each project's last successful bootstrap, so an unchanged project is skipped at
+  the next startup.
+
+  Hashes are kept in the `jarvis_startup_state` table when a Postgres connection string is given, which
+  survives pod restarts, and otherwise in a JSON file.
+
+  Attributes:
+    conninfo (str, optional): Postgres connection string.
+    path (str): JSON file used without Postgres.
+  """
+
+  def __init__(self, conninfo: Optional[str] = None, path: str = ".jarvis/bootstrap_state.json"):
+    self.conninfo = conninfo
+    self.path = path
+
+  @classmethod
+  def from_env(cls, conninfo: Optional[str] = None) -> "BootstrapStateStore":
+    return cls(conninfo=conninfo, path=os.getenv("JARVIS_BOOTSTRAP_STATE_PATH", ".jarvis/bootstrap_state.json"))
+
+  @staticmethod
+  def content_hash(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+  async def load(self) -> dict:
+    if self.conninfo:
+      import psycopg
+
+      async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as conn:
+        await conn.execute(
+          "CREATE TABLE IF NOT EXISTS jarvis_startup_state (key TEXT PRIMARY KEY, hash TEXT NOT NULL, "
+          "updated_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+        cursor = await conn.execute("SELECT key, hash FROM jarvis_startup_state")
+        return dict(await cursor.fetchall())
+    if not os.path.exists(self.path):
+      return {}
+    with open(self.path, encoding="utf-8") as f:
+      return json.load(f)
+
+  async def save(self, hashes: dict):
+    if self.conninfo:
+      import psycopg
+
+      async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as conn:
+        for key, content_hash in hashes.items():
+          await conn.execute(
+            "INSERT INTO jarvis_startup_state (key, hash) VALUES (%s, %s) "
+            "ON CONFLICT (key) DO UPDATE SET hash = excluded.hash, updated_at = now()",
+            (key, content_hash),
+          )
+      return
+    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+    with open(self.path, "w", encoding="utf-8") as f:
+      json.dump(hashes, f, indent=2, sort_keys=True)
+
+
+async def bootstrap_projects(
+  requests: dict, bootstrap: Callable[[object], Awaitable], store: BootstrapStateStore, max_concurrency: int = 4
+):
+  """
+  Bootstraps the projects whose request changed since their last successful bootstrap, `max_concurrency` at a
+  time. Failures are logged per project and the project is retried at the next startup.
+
+  Args:
+    requests (dict): Bootstrap request of each project, by project name.
+    bootstrap (Callable): Bootstraps one project from its request.
+    store (BootstrapStateStore): Where the hashes of the successful bootstraps are kept.
+    max_concurrency (int): Maximum number of projects bootstrapped at once.
+  """
+  force = os.getenv("JARVIS_BOOTSTRAP_FORCE", "false").lower() == "true"
+  try:
+    previous = {} if force else await store.load()
+  except Exception as e:
+    logging.error(f"Failed to load the bootstrap state, bootstrapping every project: {e}")
+    previous = {}
+  hashes = {name: store.content_hash(request.model_dump()) for name, request in requests.items()}
+  semaphore = asyncio.Semaphore(max_concurrency)
+  succeeded = {}
+
+  async def bootstrap_one(name: str, request):
+    if previous.get(name) == hashes[name]:
+      BOOTSTRAP_PROJECTS.labels(outcome="unchanged").inc()
+      succeeded[name] = hashes[name]
+      return
+    async with semaphore:
+      try:
+        await bootstrap(request)
+        BOOTSTRAP_PROJECTS.labels(outcome="bootstrapped").inc()
+        succeeded[name] = hashes[name]
+      except Exception as e:
+        BOOTSTRAP_PROJECTS.labels(outcome="failed").inc()
+        logging.error(f"Failed to bootstrap project: {name} with ID: {request.project_id}. Error: {str(e)}")
+
+  await asyncio.gather(*[bootstrap_one(name, request) for name, request in requests.items()])
+  skipped = sum(1 for name in requests if previous.get(name) == hashes[name])
+  failed = len(requests) - len(succeeded)
+  logging.info(f"Bootstrapped {len(succeeded) - skipped} projects, {skipped} unchanged, {failed} failed")
+  try:
+    await store.save(succeeded)
+  except Exception as e:
+    logging.error(f"Failed to save the bootstrap state: {e}")
@@ -1,13 +1,25 @@
 # Copyright 2025 CNOE
 # SPDX-License-Identifier: Apache-2.0
 
-from typing import List, Literal
+from typing import Annotated, List, Literal, Optional
 
 from langgraph.graph import MessagesState
 
 from multi_agent_jarvis.models import JarvisResponseMetadata
 from multi_agent_jarvis.globals import GraphState
 
+def keep_last(left: list, right: list) -> list:
+  """Reducer that keeps the latest write, so concurrent branches can update the key in the same step."""
+  return right
+
+
+def merge_branch_results(left: Optional[list], right: Optional[list]) -> list:
+  """Reducer that accumulates results from parallel branches. Writing None clears them."""
+  if right is None:
+    return []
+  return (left or []) + right
+
+
 # AgentState
 class AgentState(MessagesState):
   # The next agent to call
@@ -20,7 +32,15 @@ class AgentState(MessagesState):
     GraphState.NOTHING,
   ]
 
-  metadata: List[JarvisResponseMetadata]
+  # All independent actions chosen by the supervisor for this step
+  parallel_actions: List[str]
+  metadata: Annotated[List[JarvisResponseMetadata], keep_last]
+  # Results of the task agents run concurrently by the parallel agent, merged before reflection
+  branch_results: Annotated[list, merge_branch_results]
+  # Times reflection sent the current turn back to the supervisor
+  reflection_loops: int
+  # Rolling summary of the turns folded out of the message window
+  summary: str
   # The local path of the target Github repo for the K8s agent
   target_repo: str
   # The iteration for K8s code generation
@@ -0,0 +1,177 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Reads the JSONL traces written by the trace sink (JARVIS_TRACE_ENABLED=true) and reports, for each interaction,
+the critical path and the wall-clock time spent waiting on LLM calls versus tools, then the slowest spans
+across all selected traces. Only the standard library is used, so it runs anywhere the trace files are.
+
+Usage:
+  python -m multi_agent_jarvis.trace_report --path traces/jarvis_traces.jsonl --since 1h --top 10
+  python -m multi_agent_jarvis.trace_report --thread-id 1234 --critical-path-only
+"""
+
+import os
+import glob
+import json
+import time
+import argparse
+import datetime
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_window(window: str) -> float:
+  """Parses a time window such as '30m', '2h' or '1d' into seconds."""
+  if window[-1] in _UNITS:
+    return float(window[:-1]) * _UNITS[window[-1]]
+  return float(window)
+
+
+def load_traces(path: str, since: float = None, until: float = None, thread_id: str = None) -> list:
+  """Loads the traces of the trace file and its rotated backups, oldest first."""
+  traces = []
+  trace_files = [path] + glob.glob(f"{glob.escape(path)}.[0-9]*")
+  for trace_file in sorted((f for f in trace_files if os.path.exists(f)), key=os.path.getmtime):
+    with open(trace_file, encoding="utf-8") as f:
+      for line in f:
+        line = line.strip()
+        if not line:
+          continue
+        try:
+          trace = json.loads(line)
+        except json.JSONDecodeError:
+          continue
+        if since is not None and trace["start"] < since:
+          continue
+        if until is not None and trace["start"] > until:
+          continue
+        if thread_id is not None and trace["thread_id"] != thread_id:
+          continue
+        traces.append(trace)
+  return sorted(traces, key=lambda t: t["start"])
+
+
+def _children_by_parent(spans: list) -> dict:
+  children = {}
+  for span in spans:
+    children.setdefault(span["parent_id"], []).append(span)
+  return children
+
+
+def critical_path(trace: dict) -> list:
+  """
+  Returns the spans on the critical path of a trace, root first.
+
+  Walking back from the end of a span, the child that finished last is the one the span was waiting on;
+  the search then continues from that child's start, and recursively inside each selected child.
+  """
+  children = _children_by_parent(trace["spans"])
+  root = next(s for s in trace["spans"] if s["parent_id"] is None)
+
+  def walk(span: dict, depth: int) -> list:
+    path = [(depth, span)]
+    remaining = list(children.get(span["span_id"], []))
+    cursor = span["end"]
+    selected = []
+    while remaining:
+      candidates = [c for c in remaining if c["end"] <= cursor + 1e-6]
+      if not candidates:
+        break
+      last = max(candidates, key=lambda c: c["end"])
+      selected.append(last)
+      cursor = last["start"]
+      remaining = [c for c in remaining if c["end"] <= cursor + 1e-6 and c is not last]
+    for child in reversed(selected):
+      path += walk(child, depth + 1)
+    return path
+
+  return walk(root, 0)
+
+
+def _union_seconds(intervals: list) -> float:
+  total, current_start, current_end = 0.0, None, None
+  for start, end in sorted(intervals):
+    if current_end is None or start > current_end:
+      if current_end is not None:
+        total += current_end - current_start
+      current_start, current_end = start, end
+    else:
+      current_end = max(current_end, end)
+  if current_end is not None:
+    total += current_end - current_start
+  return total
+
+
+def wait_breakdown(trace: dict) -> dict:
+  """Returns the wall-clock seconds during which at least one span of each kind was running."""
+  breakdown = {}
+  for kind in ("llm", "tool", "http"):
+    breakdown[kind] = _union_seconds([(s["start"], s["end"]) for s in trace["spans"] if s["kind"] == kind])
+  return breakdown
+
+
+def slowest_spans(traces: list, top: int, kinds: list = None) -> list:
+  spans = [
+    (trace, span)
+    for trace in traces
+    for span in trace["spans"]
+    if span["parent_id"] is not None and (not kinds or span["kind"] in kinds)
+  ]
+  return sorted(spans, key=lambda ts: ts[1]["end"] - ts[1]["start"], reverse=True)[:top]
+
+
+def _format_time(timestamp: float) -> str:
+  return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _format_span(span: dict) -> str:
+  error = f"  ERROR {span['error']}" if span.get("error") else ""
+  return f"{span['kind']:<8} {span['name']:<40} {(span['end'] - span['start']) * 1000:>10.1f}ms{error}"
+
+
+def print_report(traces: list, top: int, critical_path_only: bool = False):
+  for trace in traces:
+    breakdown = wait_breakdown(trace)
+    print(f"\n=== trace {trace['trace_id']} thread {trace['thread_id']} at {_format_time(trace['start'])} ===")
+    print(
+      f"total {trace['duration'] * 1000:.1f}ms | waiting on llm {breakdown['llm'] * 1000:.1f}ms"
+      f" | tools {breakdown['tool'] * 1000:.1f}ms | http {breakdown['http'] * 1000:.1f}ms"
+    )
+    print("critical path:")
+    for depth, span in critical_path(trace):
+      print(f"  {'  ' * depth}{_format_span(span)}")
+  if critical_path_only or not traces:
+    return
+  print(f"\n=== {top} slowest spans across {len(traces)} traces ===")
+  for trace, span in slowest_spans(traces, top, kinds=["node", "llm", "tool", "http"]):
+    print(f"  {_format_time(span['start'])} thread {trace['thread_id']:<20} {_format_span(span)}")
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("--path", default=os.getenv("JARVIS_TRACE_PATH", "traces/jarvis_traces.jsonl"))
+  parser.add_argument("--since", help="Only traces started in this window, e.g. 30m, 2h, 1d")
+  parser.add_argument("--until", help="Only traces started before this many seconds/minutes/hours ago")
+  parser.add_argument("--thread-id", help="Only traces of this conversation thread")
+  parser.add_argument("--top", type=int, default=10, help="Number of slowest spans to report")
+  parser.add_argument("--last", type=int, help="Only report the last N traces")
+  parser.add_argument("--critical-path-only", action="store_true", help="Skip the slowest spans summary")
+  args = parser.parse_args()
+
+  now = time.time()
+  traces = load_traces(
+    args.path,
+    since=now - parse_window(args.since) if args.since else None,
+    until=now - parse_window(args.until) if args.until else None,
+    thread_id=args.thread_id,
+  )
+  if not traces:
+    print(f"No traces found in {args.path}*")
+    return
+  report_traces = traces[-args.last :] if args.last else traces
+  print_report(report_traces, args.top, args.critical_path_only)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,275 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+import json
+import time
+import uuid
+import logging as std_logging
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+from uuid import UUID
+import httpx
+from aiohttp import TraceConfig
+from langchain_core.callbacks import BaseCallbackHandler
+
+from multi_agent_jarvis.setup_logging import logging
+
+# Trace of the interaction running in the current context, read by the outbound HTTP hooks
+_current_trace: ContextVar[Optional["InteractionTrace"]] = ContextVar("jarvis_current_trace", default=None)
+# Innermost node, LLM or tool span open in the current context, the parent of the HTTP requests it makes
+_current_span_id: ContextVar[Optional[str]] = ContextVar("jarvis_current_span_id", default=None)
+
+
+class InteractionTrace:
+  """
+  Span tree of a single `interact` run.
+
+  Spans are plain dicts with `span_id`, `parent_id`, `kind` (interact, node, llm, tool or http), `name`,
+  `start`, `end` (epoch seconds), `attributes` and an optional `error`. The root span covers the whole run.
+
+  Attributes:
+    trace_id (str): Unique identifier of the trace.
+    thread_id (str): Conversation thread the run belongs to.
+    spans (list): Finished spans, root last.
+  """
+
+  def __init__(self, thread_id: str):
+    self.trace_id = str(uuid.uuid4())
+    self.thread_id = thread_id
+    self.root_id = str(uuid.uuid4())
+    self.start = time.time()
+    self.attributes = {}
+    self.spans = []
+
+  def add_span(
+    self,
+    kind: str,
+    name: str,
+    start: float,
+    end: float,
+    parent_id: str = None,
+    attributes: dict = None,
+    error=None,
+    span_id: str = None,
+  ) -> str:
+    span_id = span_id or str(uuid.uuid4())
+    self.spans.append(
+      {
+        "span_id": span_id,
+        "parent_id": parent_id or self.root_id,
+        "kind": kind,
+        "name": name,
+        "start": start,
+        "end": end,
+        "attributes": attributes or {},
+        "error": f"{type(error).__name__}: {error}" if error else None,
+      }
+    )
+    return span_id
+
+  def to_dict(self, end: float) -> dict:
+    root = {
+      "span_id": self.root_id,
+      "parent_id": None,
+      "kind": "interact",
+      "name": "interact",
+      "start": self.start,
+      "end": end,
+      "attributes": self.attributes,
+      "error": None,
+    }
+    return {
+      "trace_id": self.trace_id,
+      "thread_id": self.thread_id,
+      "start": self.start,
+      "end": end,
+      "duration": end - self.start,
+      "spans": self.spans + [root],
+    }
+
+
+class TraceSink:
+  """
+  Writes finished traces to a local rotating JSONL file, one trace per line.
+
+  Attributes:
+    path (str): Path of the active trace file; rotated files get a numeric suffix (`.1`, `.2`, ...).
+  """
+
+  def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5):
+    self.path = path
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    handler.setFormatter(std_logging.Formatter("%(message)s"))
+    self._logger = std_logging.getLogger(f"jarvis.traces.{path}")
+    self._logger.handlers = [handler]
+    self._logger.setLevel(std_logging.INFO)
+    self._logger.propagate = False
+
+  @classmethod
+  def from_env(cls) -> Optional["TraceSink"]:
+    """Builds the sink from JARVIS_TRACE_* environment variables, or returns None if tracing is disabled."""
+    if os.getenv("JARVIS_TRACE_ENABLED", "false").lower() != "true":
+      return None
+    return cls(
+      path=os.getenv("JARVIS_TRACE_PATH", "traces/jarvis_traces.jsonl"),
+      max_bytes=int(os.getenv("JARVIS_TRACE_MAX_BYTES", str(50 * 1024 * 1024))),
+      backup_count=int(os.getenv("JARVIS_TRACE_BACKUP_COUNT", "5")),
+    )
+
+  def write(self, trace: InteractionTrace):
+    try:
+      self._logger.info(json.dumps(trace.to_dict(time.time()), default=str))
+    except Exception as e:
+      logging.error(f"Failed to write trace {trace.trace_id}: {e}")
+
+
+def start_trace(thread_id: str) -> InteractionTrace:
+  """Starts a trace and makes it the current one, so outbound HTTP requests made by the run are recorded in it."""
+  trace = InteractionTrace(thread_id)
+  _current_trace.set(trace)
+  _current_span_id.set(None)
+  return trace
+
+
+def end_trace():
+  _current_trace.set(None)
+  _current_span_id.set(None)
+
+
+def _record_http_span(method: str, url: str, start: float, parent_id: str = None, status: int = None, error=None):
+  trace = _current_trace.get()
+  if trace is not None:
+    trace.add_span(
+      "http", f"{method} {url}", start, time.time(), parent_id, attributes={"status": status}, error=error
+    )
+
+
+# Outbound HTTP hooks
+
+
+def aiohttp_trace_config() -> TraceConfig:
+  """Returns an aiohttp TraceConfig recording every request of a session as an http span of the current trace."""
+
+  async def on_request_start(session, ctx, params):
+    ctx.start = time.time()
+    ctx.parent_id = _current_span_id.get()
+
+  async def on_request_end(session, ctx, params):
+    url = f"{params.url.host}{params.url.path}"
+    _record_http_span(params.method, url, ctx.start, ctx.parent_id, status=params.response.status)
+
+  async def on_request_exception(session, ctx, params):
+    url = f"{params.url.host}{params.url.path}"
+    _record_http_span(params.method, url, ctx.start, ctx.parent_id, error=params.exception)
+
+  trace_config = TraceConfig()
+  trace_config.on_request_start.append(on_request_start)
+  trace_config.on_request_end.append(on_request_end)
+  trace_config.on_request_exception.append(on_request_exception)
+  return trace_config
+
+
+async def _httpx_on_request(request: httpx.Request):
+  request.extensions["jarvis_trace_start"] = time.time()
+  request.extensions["jarvis_trace_parent_id"] = _current_span_id.get()
+
+
+async def _httpx_on_response(response: httpx.Response):
+  request = response.request
+  start = request.extensions.get("jarvis_trace_start")
+  if start is not None:
+    _record_http_span(
+      request.method,
+      f"{request.url.host}{request.url.path}",
+      start,
+      request.extensions.get("jarvis_trace_parent_id"),
+      status=response.status_code,
+    )
+
+
+HTTPX_EVENT_HOOKS = {"request": [_httpx_on_request], "response": [_httpx_on_response]}
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+  """
+  Callback handler recording graph node, LLM and tool runs of one interaction as spans of its trace.
+
+  Runs nested inside a node (prompt templates, output parsers, ...) are not recorded, but are followed to
+  parent every span to its closest recorded ancestor. The innermost open span is also made current in the
+  run's context, so the HTTP requests made by an LLM or tool call are recorded under its span.
+  """
+
+  run_inline = True
+
+  def __init__(self, trace: InteractionTrace):
+    self.trace = trace
+    self._parents = {}
+    self._open = {}
+    self._span_ids = {}
+
+  def _parent_span_id(self, parent_run_id: Optional[UUID]) -> Optional[str]:
+    while parent_run_id is not None:
+      if parent_run_id in self._span_ids:
+        return self._span_ids[parent_run_id]
+      parent_run_id = self._parents.get(parent_run_id)
+    return None
+
+  def _start(self, run_id: UUID, parent_run_id: Optional[UUID], kind: str, name: str, attributes: dict = None):
+    # Reserve the span id now so children started before this run ends can point to it
+    span_id = self._span_ids[run_id] = str(uuid.uuid4())
+    self._open[run_id] = (kind, name, time.time(), self._parent_span_id(parent_run_id), attributes or {})
+    # Inline handlers run in the context of the run itself, concurrent branches each have their own copy
+    _current_span_id.set(span_id)
+
+  def _end(self, run_id: UUID, error=None):
+    run = self._open.pop(run_id, None)
+    if run is None:
+      return
+    kind, name, start, parent_id, attributes = run
+    span_id = self._span_ids[run_id]
+    self.trace.add_span(kind, name, start, time.time(), parent_id, attributes, error, span_id=span_id)
+    if _current_span_id.get() == span_id:
+      _current_span_id.set(parent_id)
+
+  def on_chain_start(self, serialized, inputs, *, run_id: UUID, parent_run_id: UUID = None, metadata=None, **kwargs):
+    self._parents[run_id] = parent_run_id
+    node = (metadata or {}).get("langgraph_node")
+    if node and kwargs.get("name") == node:
+      self._start(run_id, parent_run_id, "node", node)
+
+  def on_chain_end(self, outputs, *, run_id: UUID, **kwargs):
+    self._end(run_id)
+
+  def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+    self._end(run_id, None if type(error).__name__.startswith("Graph") else error)
+
+  def on_chat_model_start(self, serialized, messages, *, run_id: UUID, parent_run_id: UUID = None, metadata=None, **kwargs):
+    self._start_llm(run_id, parent_run_id, metadata)
+
+  def on_llm_start(self, serialized, prompts, *, run_id: UUID, parent_run_id: UUID = None, metadata=None, **kwargs):
+    self._start_llm(run_id, parent_run_id, metadata)
+
+  def _start_llm(self, run_id: UUID, parent_run_id: Optional[UUID], metadata: dict):
+    self._parents[run_id] = parent_run_id
+    metadata = metadata or {}
+    deployment = metadata.get("ls_model_name", "unknown")
+    self._start(run_id, parent_run_id, "llm", deployment, {"node": metadata.get("langgraph_node")})
+
+  def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+    self._end(run_id)
+
+  def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+    self._end(run_id, error)
+
+  def on_tool_start(self, serialized, input_str, *, run_id: UUID, parent_run_id: UUID = None, **kwargs):
+    self._parents[run_id] = parent_run_id
+    self._start(run_id, parent_run_id, "tool", kwargs.get("name") or (serialized or {}).get("name", "unknown"))
+
+  def on_tool_end(self, output, *, run_id: UUID, **kwargs):
+    self._end(run_id)
+
+  def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+    self._end(run_id, error)
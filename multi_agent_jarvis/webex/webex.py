@@ -3,7 +3,7 @@
 
 from multi_agent_jarvis.setup_logging import logging as log
 import httpx
-from httpx_sse import connect_sse
+from httpx_sse import SSEError, connect_sse
 from multi_agent_jarvis.models import ChatBotQuestion, Feedback
 import os
 import json
@@ -24,17 +24,6 @@ from multi_agent_jarvis.webex.instance import WebexInstanceManager
 webex_api = None
 
 
-def submit_question(question: ChatBotQuestion, user_email: str):
-  url = "http://localhost:8000/submit_question"
-  headers = {"USER_EMAIL": user_email}
-  with httpx.Client() as client:
-    response = client.post(url, data=question.json(), headers=headers, timeout=5.0)
-    response_data = response.json()
-    log.info(f"response_data: {response_data}")
-    # Assume the response contains a 'chat_id' field
-    return response_data.get("chat_id")
-
-
 def submit_feedback(feedback: Feedback, user_email: str):
   url = "http://localhost:8000/submit_feedback"
   headers = {"USER_EMAIL": user_email}
@@ -64,24 +53,40 @@ def process_event(event, room_id):
   elif event.event == "end":
     good_bad_card = create_good_bad_card(response_type="jarvis_agent")
     send_card(webex_api, room_id, good_bad_card)
+  elif event.event in {"delta", "queue"}:
+    # Webex gets whole messages: partial answers are superseded by the next "data" event, and the user was
+    # already told the question is being worked on
+    log.debug(f"Skipping {event.event} event")
   else:
     log.warning(f"Unknown event type: {event}")
 
 
 def _process_message(room_id, user_email, text, user_files=[]):
-  chat_id = submit_question(ChatBotQuestion(chat_id=room_id, question=text, user_files=user_files), user_email)
+  question = ChatBotQuestion(chat_id=room_id, question=text, user_files=user_files)
 
   webex_api.messages.create(roomId=room_id, text="Working on it...")
 
-  if chat_id != room_id:
-    log.warning("Chat ID not equal to room ID")
-
-  url = f"http://localhost:8000/get_answer_stream/{chat_id}"
-  headers = {"USER_EMAIL": user_email}
-  with httpx.Client() as client:
-    with connect_sse(client, "GET", url, headers=headers, timeout=60.0) as event_source:
-      for event in event_source.iter_sse():
-        process_event(event, room_id)
+  # Submits the question and streams the answer in one request
+  url = "http://localhost:8000/chat/stream"
+  headers = {"USER_EMAIL": user_email, "Content-Type": "application/json"}
+  try:
+    with httpx.Client() as client:
+      with connect_sse(client, "POST", url, headers=headers, content=question.json(), timeout=60.0) as event_source:
+        response = event_source.response
+        if response.status_code == 429:
+          # Not admitted, the rejection is a plain JSON response instead of an event stream
+          retry_after = response.headers.get("Retry-After", "a few")
+          log.warning(f"Question rejected by Jarvis, retry after {retry_after} seconds")
+          webex_api.messages.create(
+            roomId=room_id, text=f"Jarvis is busy right now, please try again in {retry_after} seconds."
+          )
+          return
+        response.raise_for_status()
+        for event in event_source.iter_sse():
+          process_event(event, room_id)
+  except (httpx.HTTPError, SSEError) as e:
+    log.error(f"Error streaming the answer from Jarvis: {type(e).__name__}: {e}")
+    webex_api.messages.create(roomId=room_id, text="Jarvis Agent is not available right now. Please try again later!")
 
 
 def process_message(message_obj):
@@ -0,0 +1,94 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+
+import pytest
+
+from multi_agent_jarvis.admission import AdmissionController, AdmissionRejected
+
+
+def _controller(**kwargs) -> AdmissionController:
+  limits = {"max_in_flight": 1, "max_queue": 3, "user_rate": 100, "user_burst": 100, "user_max_concurrent": 10}
+  return AdmissionController(**{**limits, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_queue_positions_are_renumbered_when_a_queued_ticket_is_cancelled():
+  admission = _controller()
+  positions = {name: [] for name in "abcd"}
+  tickets = {name: admission.admit(name, on_position=positions[name].append) for name in "abcd"}
+  assert [tickets[name].position for name in "abcd"] == [0, 1, 2, 3]
+
+  admission.cancel(tickets["b"])
+  assert [tickets[name].position for name in "cd"] == [1, 2]
+  assert positions == {"a": [], "b": [1], "c": [2, 1], "d": [3, 2]}
+  assert admission._user_active.get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_a_released_slot_goes_to_the_head_of_the_queue():
+  admission = _controller()
+  order = []
+  running = asyncio.Event()
+
+  async def run(name):
+    order.append(name)
+    if name == "a":
+      await running.wait()
+
+  tasks = [asyncio.create_task(admission.run(admission.admit(name), lambda name=name: run(name))) for name in "abc"]
+  await asyncio.sleep(0)
+  assert order == ["a"]
+  running.set()
+  await asyncio.gather(*tasks)
+  assert order == ["a", "b", "c"]
+  assert admission._in_flight == 0
+  assert not admission._queue
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_waiting_run_frees_its_place_and_a_running_one_its_slot():
+  admission = _controller()
+  release = asyncio.Event()
+  holder = admission.admit("a")
+  waiting = admission.admit("b")
+  behind = admission.admit("c")
+  holder_task = asyncio.create_task(admission.run(holder, release.wait))
+  waiting_task = asyncio.create_task(admission.run(waiting, release.wait))
+  await asyncio.sleep(0)
+
+  waiting_task.cancel()
+  await asyncio.gather(waiting_task, return_exceptions=True)
+  assert behind.position == 1
+
+  holder_task.cancel()
+  await asyncio.gather(holder_task, return_exceptions=True)
+  assert behind.position == 0
+  assert admission._in_flight == 1
+  admission.cancel(behind)
+  assert admission._in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_rejections_carry_a_reason_and_retry_after():
+  admission = _controller(max_queue=1)
+  admission.admit("a")
+  admission.admit("b")
+  with pytest.raises(AdmissionRejected) as rejected:
+    admission.admit("c")
+  assert rejected.value.reason == "queue_full"
+  assert rejected.value.retry_after > 0
+
+  admission = _controller(user_max_concurrent=1)
+  admission.admit("a")
+  with pytest.raises(AdmissionRejected) as rejected:
+    admission.admit("a")
+  assert rejected.value.reason == "user_concurrency"
+
+  admission = _controller(user_rate=1, user_burst=1)
+  admission.cancel(admission.admit("a"))
+  with pytest.raises(AdmissionRejected) as rejected:
+    admission.admit("a")
+  assert rejected.value.reason == "user_rate"
+  assert 0 < rejected.value.retry_after <= 1
@@ -0,0 +1,239 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from multi_agent_jarvis.answer_broker import InProcessAnswerBroker, PostgresAnswerBroker
+
+
+async def _read(broker, chat_id, after=0, idle_timeout=1):
+  return [event async for event in broker.subscribe(chat_id, after=after, idle_timeout=idle_timeout)]
+
+
+@pytest.mark.asyncio
+async def test_every_subscriber_follows_the_run_until_it_ends():
+  broker = InProcessAnswerBroker()
+  await broker.reset("chat")
+  readers = [asyncio.create_task(_read(broker, "chat")) for _ in range(3)]
+  await asyncio.sleep(0)
+  await broker.publish("chat", {"answer": "one"})
+  await broker.publish("chat", {"answer": "two"})
+  await broker.publish("chat", {})
+  events = [(1, {"answer": "one"}), (2, {"answer": "two"}), (3, {})]
+  assert await asyncio.gather(*readers) == [events] * 3
+  # A late subscriber replays the whole run
+  assert await _read(broker, "chat") == events
+
+
+@pytest.mark.asyncio
+async def test_resumes_after_the_last_event_id():
+  broker = InProcessAnswerBroker()
+  await broker.reset("chat")
+  for answer in ("one", "two", "three"):
+    await broker.publish("chat", {"answer": answer})
+  await broker.publish("chat", {})
+  assert await _read(broker, "chat", after=2) == [(3, {"answer": "three"}), (4, {})]
+  # Resuming after the end of the run ends right away
+  assert await _read(broker, "chat", after=4) == []
+
+
+@pytest.mark.asyncio
+async def test_skips_the_events_that_left_the_replay_buffer():
+  broker = InProcessAnswerBroker(replay_size=3)
+  await broker.reset("chat")
+  for i in range(5):
+    await broker.publish("chat", {"answer": str(i)})
+  await broker.publish("chat", {})
+  assert await _read(broker, "chat", after=1) == [(4, {"answer": "3"}), (5, {"answer": "4"}), (6, {})]
+  assert await _read(broker, "chat") == [(4, {"answer": "3"}), (5, {"answer": "4"}), (6, {})]
+
+
+@pytest.mark.asyncio
+async def test_reset_ends_the_previous_run_and_old_ids_restart_the_new_one():
+  broker = InProcessAnswerBroker()
+  await broker.reset("chat")
+  await broker.publish("chat", {"answer": "old"})
+  old_reader = asyncio.create_task(_read(broker, "chat"))
+  await asyncio.sleep(0)
+
+  await broker.reset("chat")
+  assert await old_reader == [(1, {"answer": "old"})]
+  new_seq = await broker.publish("chat", {"answer": "new"})
+  await broker.publish("chat", {})
+  # Sequence numbers are never reused, so the id of the previous run can't skip events of the new one
+  assert new_seq == 2
+  assert await _read(broker, "chat", after=1) == [(2, {"answer": "new"}), (3, {})]
+
+
+@pytest.mark.asyncio
+async def test_unknown_chat_and_idle_timeout():
+  broker = InProcessAnswerBroker()
+  assert await _read(broker, "missing") == []
+  await broker.reset("chat")
+  with pytest.raises(asyncio.TimeoutError):
+    await _read(broker, "chat", idle_timeout=0.01)
+
+
+@pytest.mark.asyncio
+async def test_least_recently_reset_chat_is_dropped_beyond_max_chats():
+  broker = InProcessAnswerBroker(max_chats=1)
+  await broker.reset("a")
+  reader = asyncio.create_task(_read(broker, "a"))
+  await asyncio.sleep(0)
+  await broker.reset("b")
+  assert await reader == []
+  assert await _read(broker, "a") == []
+
+
+class _Notify:
+  def __init__(self, payload: str):
+    self.payload = payload
+
+
+class _Cursor:
+  def __init__(self, rows: list):
+    self.rows = rows
+
+  async def fetchone(self):
+    return self.rows[0]
+
+  async def fetchall(self):
+    return self.rows
+
+
+class _FakeDatabase:
+  """Runs the statements of PostgresAnswerBroker on a list, and delivers NOTIFY to the listening connections."""
+
+  def __init__(self):
+    self.rows = []
+    self.listeners = []
+    self.on_read = None
+
+  async def execute(self, sql: str, params: tuple = ()):
+    sql = " ".join(sql.split())
+    if sql.startswith("INSERT INTO jarvis_answer_events"):
+      seq = self.rows[-1][0] + 1 if self.rows else 1
+      self.rows.append((seq, params[0], json.loads(params[1])))
+      return _Cursor([(seq,)])
+    if sql.startswith("SELECT pg_notify"):
+      for listener in self.listeners:
+        if not listener.closed:
+          listener.notifications.put_nowait(_Notify(params[1]))
+      # Lets the broker's listener wake the subscribers
+      await asyncio.sleep(0)
+      return _Cursor([])
+    if sql.startswith("DELETE FROM jarvis_answer_events WHERE chat_id = %s AND seq < %s"):
+      self.rows = [row for row in self.rows if row[1] != params[0] or row[0] >= params[1]]
+      return _Cursor([])
+    if sql.startswith("DELETE FROM jarvis_answer_events WHERE created_at"):
+      return _Cursor([])
+    if sql.startswith("SELECT seq, payload"):
+      rows = [(seq, payload) for seq, chat_id, payload in self.rows if chat_id == params[0] and seq > params[1]]
+      if self.on_read is not None:
+        on_read, self.on_read = self.on_read, None
+        await on_read()
+      return _Cursor(rows)
+    if sql.startswith("SELECT max(seq) FILTER"):
+      run_start, chat_id = json.loads(params[0]), params[1]
+      rows = [row for row in self.rows if row[1] == chat_id]
+      return _Cursor([(
+        max((seq for seq, _, payload in rows if payload == run_start), default=None),
+        max((seq for seq, _, payload in rows if payload == {}), default=None),
+      )])
+    raise NotImplementedError(sql)
+
+  @asynccontextmanager
+  async def connection(self):
+    yield self
+
+  async def close(self):
+    pass
+
+
+class _FakeListenConnection:
+  def __init__(self, database: _FakeDatabase):
+    self.notifications = asyncio.Queue()
+    self.closed = False
+    database.listeners.append(self)
+
+  async def notifies(self):
+    while True:
+      notify = await self.notifications.get()
+      if isinstance(notify, Exception):
+        raise notify
+      yield notify
+
+  async def close(self):
+    self.closed = True
+
+
+async def _postgres_broker(database: _FakeDatabase, poll_interval: float = 10) -> PostgresAnswerBroker:
+  broker = PostgresAnswerBroker("postgresql://fake", poll_interval=poll_interval)
+  broker._pool = database
+
+  async def connect_listener():
+    return _FakeListenConnection(database)
+
+  broker._connect_listener = connect_listener
+  broker._listen_connection = await connect_listener()
+  broker._listener = asyncio.create_task(broker._listen())
+  return broker
+
+
+@pytest.mark.asyncio
+async def test_postgres_subscribers_follow_the_run_and_resume():
+  database = _FakeDatabase()
+  broker = await _postgres_broker(database)
+  try:
+    await broker.reset("chat")
+    reader = asyncio.create_task(_read(broker, "chat"))
+    await asyncio.sleep(0)
+    await broker.publish("chat", {"answer": "one"})
+    await broker.publish("chat", {"answer": "two"})
+    await broker.publish("chat", {})
+    events = [(2, {"answer": "one"}), (3, {"answer": "two"}), (4, {})]
+    # Woken by the notifications, well before the poll interval
+    assert await asyncio.wait_for(reader, 1) == events
+    assert await _read(broker, "chat", after=3) == [(4, {})]
+    # A new run drops the events of the previous one
+    await broker.reset("chat")
+    assert [row[0] for row in database.rows] == [5]
+  finally:
+    await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_postgres_notification_during_a_read_is_not_lost():
+  database = _FakeDatabase()
+  broker = await _postgres_broker(database)
+  try:
+    await broker.reset("chat")
+    reader = asyncio.create_task(_read(broker, "chat"))
+
+    async def publish_during_read():
+      # Committed after the read's snapshot, notified before the read returns
+      await broker.publish("chat", {})
+
+    database.on_read = publish_during_read
+    assert await asyncio.wait_for(reader, 1) == [(2, {})]
+  finally:
+    await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_postgres_listen_reconnect_closes_the_broken_connection():
+  database = _FakeDatabase()
+  broker = await _postgres_broker(database, poll_interval=0.01)
+  try:
+    broken = broker._listen_connection
+    broken.notifications.put_nowait(ConnectionError("server closed the connection"))
+    while broker._listen_connection is broken:
+      await asyncio.sleep(0.01)
+    assert broken.closed
+    assert [listener.closed for listener in database.listeners] == [True, False]
+  finally:
+    await broker.close()
@@ -0,0 +1,95 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+
+import pytest
+
+from multi_agent_jarvis.chat_sessions import COMPLETED, EVICTED, IN_PROGRESS, ChatSessionRegistry
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_prefers_finished_sessions():
+  registry = ChatSessionRegistry(max_sessions=2)
+  running = registry.start("running")
+  finished = registry.start("finished")
+  registry.complete(finished)
+  # The running session is older, but the finished one goes first
+  registry.start("new")
+  assert registry.get("running") is running
+  assert registry.get("finished") is None
+  assert running.status == IN_PROGRESS
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_cuts_a_running_session_short_when_all_are_running():
+  registry = ChatSessionRegistry(max_sessions=2)
+  oldest = registry.start("a")
+  registry.start("b")
+  registry.get("a")
+  registry.get("b")
+  registry.start("c")
+  assert registry.get("a") is None
+  assert oldest.status == EVICTED
+  # Its waiters are released instead of waiting for a run nobody will read
+  assert await registry.wait(oldest, timeout=1) == EVICTED
+  assert len(registry) == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_sweep_keeps_running_sessions():
+  registry = ChatSessionRegistry(idle_ttl=0)
+  running = registry.start("running")
+  finished = registry.start("finished")
+  registry.complete(finished)
+  registry.evict_expired()
+  assert registry.get("finished") is None
+  assert registry._sessions.get("running") is running
+
+
+@pytest.mark.asyncio
+async def test_a_timed_out_waiter_does_not_end_the_run_for_the_others():
+  registry = ChatSessionRegistry()
+  session = registry.start("chat")
+  assert await registry.wait(session, timeout=0.01) is None
+  other = asyncio.create_task(registry.wait(session, timeout=1))
+  await asyncio.sleep(0)
+  registry.complete(session, COMPLETED)
+  assert await other == COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_new_turn_waits_for_the_running_one_and_identical_submissions_join():
+  registry = ChatSessionRegistry()
+  first = registry.start("chat", key="question")
+  assert registry.join("chat", "question") is first
+  assert registry.join("chat", "other question") is None
+  second = registry.start("chat", key="other question")
+  assert second.previous is first
+  registry.record(first, {"answer": "stale"})
+  assert first.responses == []
+  registry.complete(first)
+  registry.complete(second)
+  assert registry.start("chat").previous is None
+
+
+@pytest.mark.asyncio
+async def test_unwatched_run_is_cancelled_after_the_grace_period():
+  registry = ChatSessionRegistry(disconnect_grace=0.01)
+  session = registry.start("chat")
+  registry.attach_run(session, asyncio.create_task(asyncio.sleep(10)))
+  await asyncio.sleep(0.05)
+  assert session.task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_watched_run_is_not_cancelled():
+  registry = ChatSessionRegistry(disconnect_grace=0.01)
+  session = registry.start("chat")
+  registry.attach_run(session, asyncio.create_task(asyncio.sleep(10)))
+  with registry.watching(session):
+    await asyncio.sleep(0.05)
+    assert not session.task.done()
+  # Disconnected readers arm the grace period again
+  await asyncio.sleep(0.05)
+  assert session.task.cancelled()
@@ -0,0 +1,33 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import os
+
+from langchain_core.messages import HumanMessage
+
+from multi_agent_jarvis.fast_router import FastRouter, load_routing_dataset
+
+EVAL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "eval")
+ROUTING_DATASET = os.path.join(EVAL_DIR, "routing", "routing_dataset.yaml")
+STRICT_MATCH_DATASET = os.path.join(EVAL_DIR, "strict_match", "strict_match_dataset.yaml")
+
+
+def test_routes_held_out_questions_accurately():
+  questions, actions = load_routing_dataset(ROUTING_DATASET)
+  # Every fifth question of each action is held out
+  held_out = [i for i in range(len(questions)) if i % 5 == 0]
+  router = FastRouter(
+    [q for i, q in enumerate(questions) if i % 5], [a for i, a in enumerate(actions) if i % 5], threshold=0.85
+  )
+  routed = {i: router.route([HumanMessage(questions[i])]) for i in held_out}
+  routed = {i: action for i, action in routed.items() if action is not None}
+  assert len(routed) >= 0.4 * len(held_out)
+  assert sum(action == actions[i] for i, action in routed.items()) >= 0.95 * len(routed)
+
+
+def test_from_env_needs_enough_examples_of_every_action(monkeypatch):
+  monkeypatch.setenv("JARVIS_FAST_ROUTER_ENABLED", "true")
+  monkeypatch.setenv("JARVIS_FAST_ROUTER_DATASET", STRICT_MATCH_DATASET)
+  assert FastRouter.from_env() is None
+  monkeypatch.setenv("JARVIS_FAST_ROUTER_DATASET", ROUTING_DATASET)
+  assert FastRouter.from_env() is not None
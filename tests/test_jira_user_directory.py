@@ -0,0 +1,95 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+
+import pytest
+
+from multi_agent_jarvis.agents.jira_agent.tools.jira_user_directory import JiraUserDirectory
+
+USER = {"accountId": "abc", "displayName": "Jane Doe", "emailAddress": "jane@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_request():
+  directory = JiraUserDirectory()
+  calls = []
+
+  async def fetch():
+    calls.append(1)
+    await asyncio.sleep(0.01)
+    return directory.remember(USER, complete=True)
+
+  key = ("account_id", "abc")
+
+  def cached():
+    return directory._cached("abc", False)
+
+  users = await asyncio.gather(*(directory._lookup(key, cached, fetch) for _ in range(5)))
+  assert len(calls) == 1
+  assert {user.account_id for user in users} == {"abc"}
+
+
+@pytest.mark.asyncio
+async def test_waiters_make_their_own_lookup_when_the_owner_is_cancelled():
+  directory = JiraUserDirectory()
+  started = asyncio.Event()
+  calls = []
+
+  async def fetch():
+    calls.append(1)
+    started.set()
+    await asyncio.sleep(0.05)
+    return directory.remember(USER, complete=True)
+
+  key = ("account_id", "abc")
+
+  def cached():
+    return directory._cached("abc", False)
+
+  owner = asyncio.create_task(directory._lookup(key, cached, fetch))
+  await started.wait()
+  waiter = asyncio.create_task(directory._lookup(key, cached, fetch))
+  await asyncio.sleep(0)
+  owner.cancel()
+
+  user = await waiter
+  assert owner.cancelled()
+  assert user.account_id == "abc"
+  assert len(calls) == 2
+  assert not directory._inflight
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_the_waiters_and_are_not_cached():
+  directory = JiraUserDirectory()
+
+  async def failing_fetch():
+    await asyncio.sleep(0.01)
+    raise RuntimeError("Jira is down")
+
+  key = ("email", "jane@example.com")
+
+  def cached():
+    return None
+
+  results = await asyncio.gather(
+    *(directory._lookup(key, cached, failing_fetch) for _ in range(3)), return_exceptions=True
+  )
+  assert all(isinstance(result, RuntimeError) for result in results)
+  assert key not in directory._not_found
+
+
+@pytest.mark.asyncio
+async def test_assignee_resolved_from_warmed_directory(monkeypatch):
+  from multi_agent_jarvis.agents.jira_agent.tools import jira_user
+
+  directory = JiraUserDirectory()
+  directory.warm({"issue": {"fields": {"assignee": {"accountId": "abc", "displayName": "Jane Doe"}}}})
+  monkeypatch.setattr(JiraUserDirectory, "_instance", directory)
+
+  async def no_client():
+    raise AssertionError("the issue should not be fetched")
+
+  monkeypatch.setattr(jira_user.JiraInstanceManager, "get_async_client", no_client)
+  assert await jira_user._get_jira_assignee("PROJ-1", "abc") == "Jane Doe"
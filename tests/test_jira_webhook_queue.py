@@ -0,0 +1,128 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+
+import pytest
+
+from multi_agent_jarvis.jira_webhook_queue import JiraWebhookQueue, WebhookRejected
+
+
+class _Recorder:
+  def __init__(self, delay: float = 0.01):
+    self.delay = delay
+    self.batches = []
+    self.running = set()
+    self.overlaps = []
+    self.done = asyncio.Event()
+
+  async def __call__(self, payloads: list):
+    issue = payloads[0]["issue"]
+    if issue in self.running:
+      self.overlaps.append(issue)
+    self.running.add(issue)
+    await asyncio.sleep(self.delay)
+    self.running.discard(issue)
+    self.batches.append([payload["id"] for payload in payloads])
+    self.done.set()
+
+  async def wait_for(self, count: int):
+    while sum(len(batch) for batch in self.batches) < count:
+      self.done.clear()
+      await asyncio.wait_for(self.done.wait(), 1)
+
+
+def _payload(issue: str, event_id: str, comment: bool = False) -> dict:
+  return {"issue": issue, "id": event_id, "webhookEvent": "comment_created" if comment else "jira:issue_updated"}
+
+
+async def _queue(recorder: _Recorder, **kwargs) -> JiraWebhookQueue:
+  queue = JiraWebhookQueue(
+    recorder, debounce=lambda payload: payload["webhookEvent"] == "comment_created", **kwargs
+  )
+  await queue.start()
+  return queue
+
+
+@pytest.mark.asyncio
+async def test_events_of_an_issue_run_one_at_a_time_in_order():
+  recorder = _Recorder()
+  queue = await _queue(recorder, workers=4)
+  try:
+    for event_id in ("a1", "b1", "a2", "a3", "b2"):
+      await queue.submit(event_id, event_id[0], _payload(event_id[0], event_id))
+    await recorder.wait_for(5)
+  finally:
+    await queue.close()
+  assert recorder.overlaps == []
+  order = [batch[0] for batch in recorder.batches]
+  assert [e for e in order if e[0] == "a"] == ["a1", "a2", "a3"]
+  assert [e for e in order if e[0] == "b"] == ["b1", "b2"]
+  assert not queue._pending and queue._depth == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicate_deliveries_are_dropped_and_a_full_queue_rejects():
+  recorder = _Recorder(delay=0.05)
+  queue = JiraWebhookQueue(recorder, max_pending=2)
+  with pytest.raises(WebhookRejected):
+    await queue.submit("d1", "A", _payload("A", "d1"))
+  await queue.start()
+  try:
+    assert await queue.submit("d1", "A", _payload("A", "d1"))
+    assert not await queue.submit("d1", "A", _payload("A", "d1"))
+    assert await queue.submit("d2", "A", _payload("A", "d2"))
+    with pytest.raises(WebhookRejected) as rejected:
+      await queue.submit("d3", "A", _payload("A", "d3"))
+    assert rejected.value.reason == "queue_full"
+    await recorder.wait_for(2)
+  finally:
+    await queue.close()
+  assert recorder.batches == [["d1"], ["d2"]]
+
+
+@pytest.mark.asyncio
+async def test_a_burst_of_comments_is_processed_together():
+  recorder = _Recorder()
+  queue = await _queue(recorder, debounce_seconds=0.05)
+  try:
+    for event_id in ("c1", "c2", "c3"):
+      await queue.submit(event_id, "A", _payload("A", event_id, comment=True))
+      await asyncio.sleep(0.01)
+    await queue.submit("b1", "B", _payload("B", "b1"))
+    await recorder.wait_for(4)
+  finally:
+    await queue.close()
+  # Other issues are not held up by the debounce window
+  assert recorder.batches == [["b1"], ["c1", "c2", "c3"]]
+
+
+@pytest.mark.asyncio
+async def test_debounce_merges_keep_the_order_of_other_events_of_the_issue():
+  recorder = _Recorder()
+  queue = await _queue(recorder, debounce_seconds=0.05)
+  try:
+    await queue.submit("c1", "A", _payload("A", "c1", comment=True))
+    await queue.submit("u1", "A", _payload("A", "u1"))
+    await queue.submit("c2", "A", _payload("A", "c2", comment=True))
+    await queue.submit("c3", "A", _payload("A", "c3", comment=True))
+    await recorder.wait_for(4)
+  finally:
+    await queue.close()
+  # Comments are only merged with the comments next to them, never moved past the update
+  assert recorder.batches == [["c1"], ["u1"], ["c2", "c3"]]
+
+
+@pytest.mark.asyncio
+async def test_debounce_waits_at_most_debounce_max_seconds():
+  recorder = _Recorder(delay=0)
+  queue = await _queue(recorder, debounce_seconds=0.05, debounce_max_seconds=0.08)
+  try:
+    for i in range(10):
+      await queue.submit(f"c{i}", "A", _payload("A", f"c{i}", comment=True))
+      await asyncio.sleep(0.02)
+    await recorder.wait_for(10)
+  finally:
+    await queue.close()
+  assert len(recorder.batches) > 1
+  assert [e for batch in recorder.batches for e in batch] == [f"c{i}" for i in range(10)]
@@ -0,0 +1,34 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+import pytest
+
+from multi_agent_jarvis.json_answer_stream import AnswerFieldStream
+
+
+def _feed_in_fragments(document: str, size: int) -> str:
+  stream = AnswerFieldStream()
+  return "".join(stream.feed(document[i : i + size]) for i in range(0, len(document), size))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_extracts_answer_text_across_fragment_boundaries(size):
+  answer = 'Line "one"\nTab\there \\ back/slash and unicode é 😀'
+  document = json.dumps({"answer": answer, "metadata": {"user_input": False, "input_fields": []}})
+  assert _feed_in_fragments(document, size) == answer
+  assert _feed_in_fragments(json.dumps({"answer": answer}, ensure_ascii=False), size) == answer
+
+
+def test_ignores_other_fields_and_nested_answer_keys():
+  document = json.dumps({"metadata": {"answer": "nested", "input_fields": ["answer"]}, "note": "x", "answer": "top"})
+  assert _feed_in_fragments(document, 4) == "top"
+
+
+def test_returns_nothing_until_the_answer_value_starts():
+  stream = AnswerFieldStream()
+  assert stream.feed('{"ans') == ""
+  assert stream.feed('wer": ') == ""
+  assert stream.feed('"Th') == "Th"
+  assert stream.feed('e end"}') == "e end"
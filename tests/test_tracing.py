@@ -0,0 +1,49 @@
+# Copyright 2025 CNOE
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+from multi_agent_jarvis.tracing import HTTPX_EVENT_HOOKS, TraceCallbackHandler, end_trace, start_trace
+
+
+async def _http_call(url: str):
+  request = httpx.Request("GET", url)
+  for hook in HTTPX_EVENT_HOOKS["request"]:
+    await hook(request)
+  response = httpx.Response(200, request=request)
+  for hook in HTTPX_EVENT_HOOKS["response"]:
+    await hook(response)
+
+
+@pytest.mark.asyncio
+async def test_http_spans_are_children_of_the_run_that_made_them():
+  trace = start_trace("thread")
+  handler = TraceCallbackHandler(trace)
+  node_run, tool_run = uuid.uuid4(), uuid.uuid4()
+  try:
+    handler.on_chain_start({}, {}, run_id=node_run, name="jira_agent", metadata={"langgraph_node": "jira_agent"})
+    await _http_call("https://llm.example.com/chat/completions")
+
+    async def tool():
+      handler.on_tool_start({}, "", run_id=tool_run, parent_run_id=node_run, name="get_jira_issue_details")
+      await _http_call("https://jira.example.com/rest/api/2/issue/OPENSD-1")
+      handler.on_tool_end("", run_id=tool_run)
+
+    # Other tasks started by the node don't see the tool's span
+    await asyncio.gather(tool(), _http_call("https://other.example.com/"))
+    handler.on_chain_end({}, run_id=node_run)
+    await _http_call("https://after.example.com/")
+  finally:
+    end_trace()
+
+  spans = {span["name"]: span for span in trace.to_dict(trace.start + 1)["spans"]}
+  node_id = spans["jira_agent"]["span_id"]
+  assert spans["GET llm.example.com/chat/completions"]["parent_id"] == node_id
+  assert spans["GET other.example.com/"]["parent_id"] == node_id
+  assert spans["get_jira_issue_details"]["parent_id"] == node_id
+  assert spans["GET jira.example.com/rest/api/2/issue/OPENSD-1"]["parent_id"] == spans["get_jira_issue_details"]["span_id"]
+  assert spans["GET after.example.com/"]["parent_id"] == trace.root_id